@@ -0,0 +1,93 @@
+"""
+Mede o tempo de partida a frio de `python main.py service`: do início do processo até o serviço
+responder ao primeiro PING. Cada execução inicia um processo novo, como um container reiniciado.
+
+Uso (no diretório python/):
+    python benchmarks/startup.py [--runs=N] [--port=P] [--max-ms=M] [-- opções do service...]
+
+Exemplo:
+    python benchmarks/startup.py --runs=20 --max-ms=500 -- --workload=cpu --servers=2
+"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.protocol import FrameReader, MessageType, send_frame  # noqa: E402
+
+READY_TIMEOUT = 30
+
+
+def ping(port: int) -> bool:
+    """
+    Envia um PING ao serviço e indica se ele respondeu.
+
+    Args:
+        port (int): Porta do serviço.
+    Returns:
+        bool: True se o serviço respondeu ao PING.
+    """
+    try:
+        with socket.create_connection(("localhost", port), timeout=1) as sock:
+            send_frame(sock, MessageType.PING, "ping")
+            return FrameReader(sock).read_frame() is not None
+    except OSError:
+        return False
+
+
+def measure(port: int, service_args: list[str]) -> float:
+    """
+    Inicia um serviço e mede o tempo até a primeira resposta a um PING.
+
+    Args:
+        port (int): Porta do serviço.
+        service_args (list[str]): Opções adicionais do service.
+    Returns:
+        float: Tempo de partida, em milissegundos.
+    """
+    command = [sys.executable, "main.py", "service", str(port), "1", *service_args]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while not ping(port):
+            if process.poll() is not None:
+                raise RuntimeError(f"O serviço terminou com código {process.returncode}: {' '.join(command)}")
+            if time.perf_counter() - started > READY_TIMEOUT:
+                raise TimeoutError(f"O serviço não respondeu em {READY_TIMEOUT} s")
+            time.sleep(0.002)
+        return (time.perf_counter() - started) * 1000
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(args: list[str]) -> int:
+    service_args = []
+    if "--" in args:
+        service_args = args[args.index("--") + 1:]
+        args = args[:args.index("--")]
+    options = dict(arg[2:].partition("=")[::2] for arg in args if arg.startswith("--"))
+    runs = int(options.get("runs", 10))
+    port = int(options.get("port", 4999))
+    max_ms = float(options["max-ms"]) if "max-ms" in options else None
+
+    samples = sorted(measure(port, service_args) for _ in range(runs))
+    median = statistics.median(samples)
+    p90 = samples[min(len(samples) - 1, int(0.9 * len(samples)))]
+    print(
+        f"service startup ({runs} execuções): min={samples[0]:.1f} ms median={median:.1f} ms "
+        f"p90={p90:.1f} ms max={samples[-1]:.1f} ms"
+    )
+    if max_ms is not None and median > max_ms:
+        print(f"Mediana acima do limite de {max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,61 @@
+import signal
 import sys
 
-
-from src.config import load_config
-from src.load_balance import LoadBalancer
+from src.async_load_balance import AsyncLoadBalancer
+from src.async_service import AsyncService
+from src.config import get_loadbalancer_config, get_service_config, load_config
+from src.load_balance import QUEUE_TIMEOUT, LoadBalancer
+from src.logger import parse_level, set_log_level
 from src.source import Source
+from src.worker_load_balance import LoadBalancerWorkers
+from src.workload import create_workload
 from src.service import Service
 
+def parse_options(args: list[str]) -> tuple[list[str], dict[str, str]]:
+    """
+    Separa os argumentos posicionais das opções no formato --chave=valor.
+
+    Args:
+        args (list[str]): Argumentos da linha de comando.
+    Returns:
+        tuple[list[str], dict[str, str]]: Argumentos posicionais e dicionário de opções.
+    """
+    positional = []
+    options = {}
+    for arg in args:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key.replace("-", "_")] = value or "true"
+        else:
+            positional.append(arg)
+    return positional, options
+
+def parse_bool(value: str) -> bool:
+    """
+    Converte o valor de uma opção da linha de comando em booleano.
+
+    Args:
+        value (str): Valor da opção, como "on", "off", "true" ou "false".
+    Returns:
+        bool: O valor convertido.
+    """
+    return value.lower() in ("1", "true", "on", "yes", "sim")
+
+def parse_addresses(value: str) -> list[tuple[str, int]]:
+    """
+    Converte uma lista de endereços no formato host:porta separados por vírgula.
+
+    Args:
+        value (str): Endereços, por exemplo "service1:3001,service2:3002".
+    Returns:
+        list[tuple[str, int]]: Os endereços como tuplas (host, porta).
+    """
+    addresses = []
+    for address in value.split(","):
+        host, port = address.split(":")
+        addresses.append((host, int(port)))
+    return addresses
+
 def start_source():
     """
     Inicia o serviço de origem que lê dados de um arquivo de configuração
@@ -32,7 +82,20 @@ def start_load_balance(
     service_addresses: list[tuple[str, int]] = [
         ("localhost", 3000), 
         ("localhost", 3001)
-    ]
+    ],
+    pooling: bool = True,
+    multiplexing: bool = False,
+    engine: str = "threads",
+    service_capacity: int = 10,
+    probe_interval: float = 0,
+    policy: str = "round_robin",
+    weights: list[int] | None = None,
+    queue_max_size: int = 0,
+    queue_timeout: float = QUEUE_TIMEOUT,
+    batch_size: int = 1,
+    batch_linger_us: int = 200,
+    workers: int = 1,
+    forward_config: bool = False
 ):
     """
     Inicia o balanceador de carga que escuta em uma porta específica
@@ -41,57 +104,322 @@ def start_load_balance(
     e encaminhá-las para os serviços disponíveis, garantindo que as mensagens sejam
     processadas de forma eficiente e balanceada entre os serviços.
     Args:
-        None
+        listen_port (int): Porta na qual o balanceador irá escutar.
+        service_addresses (list[tuple[str, int]]): Endereços dos serviços.
+        pooling (bool): Se True, reaproveita as conexões com os serviços.
+        multiplexing (bool): Se True, usa uma única conexão multiplexada por serviço.
+        engine (str): "threads" para uma thread por conexão ou "async" para o AsyncLoadBalancer.
+        service_capacity (int): Número máximo de pedidos em andamento por serviço.
+        probe_interval (float): Intervalo, em segundos, da verificação de saúde dos serviços (0 desativa).
+        policy (str): Política de escolha de serviço.
+        weights (list[int] | None): Pesos dos serviços para a política "weighted".
+        queue_max_size (int): Número máximo de mensagens aguardando um serviço livre.
+        queue_timeout (float): Espera máxima, em segundos, de uma mensagem na fila (0 sem limite).
+        batch_size (int): Número máximo de mensagens por lote enviado a um serviço (1 desativa o agrupamento).
+        batch_linger_us (int): Espera máxima, em microssegundos, para um lote encher.
+        workers (int): Número de processos do balanceador escutando na mesma porta (SO_REUSEPORT).
+        forward_config (bool): Se True, repassa as mensagens CONFIG aos destinos (LoadBalancer intermediário de uma cadeia).
     Returns:
         None
     """
 
-    lb = LoadBalancer(listen_port=listen_port, service_addresses=service_addresses)
+    if engine == "async":
+        lb_class = AsyncLoadBalancer
+    elif engine == "threads":
+        lb_class = LoadBalancer
+    else:
+        raise ValueError(f"Engine desconhecida: {engine}. Use 'threads' ou 'async'.")
+    lb_kwargs = dict(
+        listen_port=listen_port,
+        service_addresses=service_addresses,
+        pooling=pooling,
+        multiplexing=multiplexing,
+        service_capacity=service_capacity,
+        probe_interval=probe_interval,
+        policy=policy,
+        weights=weights,
+        queue_max_size=queue_max_size,
+        queue_timeout=queue_timeout,
+        batch_size=batch_size,
+        batch_linger_us=batch_linger_us,
+        forward_config=forward_config
+    )
+    if workers > 1:
+        lb = LoadBalancerWorkers(workers, lb_class, **lb_kwargs)
+    else:
+        lb = lb_class(**lb_kwargs)
     lb.sys_log(f"LoadBalancer starting on port {listen_port} with services {service_addresses}")
     lb.start()
 
-def start_service(port, service_time_ms):
-    
-    service = Service(listen_port=port, service_time_ms=service_time_ms)
-    service.sys_log(f"Service starting on port {port} with service time {service_time_ms} ms")
+def build_distribution(
+    port: int,
+    mean_ms: float,
+    distribution: str,
+    sdv_ms: float | None = None,
+    erlang_k: int = 2,
+    samples_file: str | None = None,
+    seed: int | None = None
+):
+    """
+    Cria a distribuição de tempos de um serviço (ou das latências do MockLLMServer).
+    O NumPy só é carregado aqui, quando os tempos são aleatórios.
+
+    Args:
+        port (int): Porta do componente, combinada com a semente para que cada um tenha a sua sequência.
+        mean_ms (float): Média dos tempos, em milissegundos.
+        distribution (str): deterministic, exponential, erlang, lognormal ou empirical.
+        sdv_ms (float | None): Desvio padrão da distribuição lognormal (padrão: igual à média).
+        erlang_k (int): Número de fases da distribuição erlang.
+        samples_file (str | None): Arquivo com tempos medidos, um por linha, para a distribuição empirical.
+        seed (int | None): Semente do gerador; None usa uma semente aleatória.
+    Returns:
+        ServiceTimeDistribution: A distribuição.
+    """
+    from src.distributions import create_distribution
+
+    return create_distribution(
+        distribution,
+        mean_ms,
+        seed=None if seed is None else [seed, port],
+        sdv_ms=sdv_ms,
+        erlang_k=erlang_k,
+        samples_file=samples_file,
+    )
+
+def distribution_options(options: dict[str, str], defaults: dict) -> dict:
+    """
+    Lê as opções de distribuição da linha de comando, com precedência sobre as configurações.
+
+    Args:
+        options (dict[str, str]): Opções da linha de comando.
+        defaults (dict): Configurações do componente em src/config.py.
+    Returns:
+        dict: Argumentos distribution, sdv_ms, erlang_k, samples_file e seed.
+    """
+    return {
+        "distribution": options.get("distribution", defaults.get("distribution") or "deterministic"),
+        "sdv_ms": float(options["sdv_ms"]) if "sdv_ms" in options else defaults.get("sdv_ms"),
+        "erlang_k": int(options.get("erlang_k", defaults.get("erlang_k") or 2)),
+        "samples_file": options.get("samples_file", defaults.get("samples_file")),
+        "seed": int(options["seed"]) if "seed" in options else defaults.get("seed"),
+    }
+
+def start_mock_llm(
+    port: int,
+    latency_ms: float = 500.0,
+    distribution: str = "deterministic",
+    sdv_ms: float | None = None,
+    erlang_k: int = 2,
+    samples_file: str | None = None,
+    seed: int | None = None,
+    max_concurrency: int = 0,
+    max_rps: float = 0
+):
+    """
+    Inicia o servidor simulado do modelo de IA, que responde à API de chat-completions do Groq.
+
+    Args:
+        port (int): Porta na qual o servidor irá escutar.
+        latency_ms (float): Latência média de cada resposta, em milissegundos.
+        distribution (str): Distribuição das latências: deterministic, exponential, erlang, lognormal ou empirical.
+        sdv_ms (float | None): Desvio padrão da distribuição lognormal (padrão: igual à média).
+        erlang_k (int): Número de fases da distribuição erlang.
+        samples_file (str | None): Arquivo com latências medidas, uma por linha, para a distribuição empirical.
+        seed (int | None): Semente do gerador de latências.
+        max_concurrency (int): Pedidos processados ao mesmo tempo; 0 para nenhum limite.
+        max_rps (float): Pedidos iniciados por segundo; 0 para nenhum limite.
+    Returns:
+        None
+    """
+    from src.mock_llm import MockLLMServer
+
+    server = MockLLMServer(
+        port,
+        latency_ms=latency_ms,
+        distribution=None if distribution == "deterministic" else build_distribution(
+            port, latency_ms, distribution, sdv_ms, erlang_k, samples_file, seed
+        ),
+        max_concurrency=max_concurrency,
+        max_rps=max_rps,
+    )
+    server.start()
+
+def start_service(
+    port,
+    service_time_ms,
+    max_queue_size: int = 10,
+    servers: int = 1,
+    engine: str = "threads",
+    next_hops: list[tuple[str, int]] | None = None,
+    workload: str = "sleep",
+    io_block_kb: int = 64,
+    distribution: str = "deterministic",
+    sdv_ms: float | None = None,
+    erlang_k: int = 2,
+    samples_file: str | None = None,
+    seed: int | None = None,
+    ia_cache_size: int = 1024,
+    ia_cache_ttl: float = 300.0,
+    ia_cache_path: str | None = None,
+    llm_base_url: str | None = None,
+    llm_model: str | None = None,
+    llm_max_concurrency: int = 0
+):
+    """
+    Inicia um serviço que processa as mensagens encaminhadas pelo balanceador de carga.
+
+    Args:
+        port (int): Porta na qual o serviço irá escutar.
+        service_time_ms (float): Tempo de serviço em milissegundos.
+        max_queue_size (int): Número máximo de mensagens aguardando atendimento.
+        servers (int): Número de servidores que atendem mensagens em paralelo, cada um por service_time_ms.
+        engine (str): "threads" para uma thread por conexão ou "async" para o AsyncService.
+        next_hops (list[tuple[str, int]] | None): Próximo estágio do pipeline, para onde as mensagens processadas são encaminhadas.
+        workload (str): Carga de trabalho de cada atendimento: sleep, cpu, io ou llm.
+        io_block_kb (int): Tamanho, em KB, do bloco gravado em cada atendimento da carga io.
+        distribution (str): Distribuição dos tempos de serviço, com média service_time_ms:
+            deterministic, exponential, erlang, lognormal ou empirical.
+        sdv_ms (float | None): Desvio padrão da distribuição lognormal (padrão: igual à média).
+        erlang_k (int): Número de fases da distribuição erlang.
+        samples_file (str | None): Arquivo com tempos de serviço medidos, um por linha, para a distribuição empirical.
+        seed (int | None): Semente do gerador; combinada com a porta, cada serviço tem a sua sequência reproduzível.
+        ia_cache_size (int): Respostas do modelo de IA mantidas em memória; 0 desativa o cache.
+        ia_cache_ttl (float): Validade, em segundos, de uma resposta em cache.
+        ia_cache_path (str | None): Arquivo SQLite do cache compartilhado entre os serviços do mesmo host.
+        llm_base_url (str | None): Endereço do serviço de chat-completions (por exemplo, o MockLLMServer); None usa o Groq.
+        llm_model (str | None): Modelo consultado pela carga llm; None usa o modelo padrão.
+        llm_max_concurrency (int): Número máximo de consultas ao modelo em andamento; 0 para nenhum limite.
+    Returns:
+        None
+    """
+    if engine == "async":
+        service_class = AsyncService
+    elif engine == "threads":
+        service_class = Service
+    else:
+        raise ValueError(f"Engine desconhecida: {engine}. Use 'threads' ou 'async'.")
+    workload_kwargs = {}
+    if distribution != "deterministic":
+        workload_kwargs["distribution"] = build_distribution(
+            port, service_time_ms, distribution, sdv_ms, erlang_k, samples_file, seed
+        )
+    if workload == "io":
+        workload_kwargs["block_kb"] = io_block_kb
+    elif workload == "llm":
+        workload_kwargs["base_url"] = llm_base_url
+        workload_kwargs["model"] = llm_model
+        workload_kwargs["max_concurrency"] = llm_max_concurrency
+        if ia_cache_size > 0:
+            from src.ia import ResponseCache
+
+            workload_kwargs["cache"] = ResponseCache(max_entries=ia_cache_size, ttl=ia_cache_ttl, path=ia_cache_path)
+    service = service_class(
+        listen_port=port,
+        service_time_ms=service_time_ms,
+        max_queue_size=max_queue_size,
+        servers=servers,
+        next_hops=next_hops,
+        workload=create_workload(workload, service_time_ms, servers, **workload_kwargs)
+    )
+    service.sys_log(f"Service starting on port {port} with service time {service_time_ms} ms ({distribution})")
     service.start()
 
 if __name__ == "__main__":
     
     from src.abstract_proxy import AbstractProxy
 
+    argv, options = parse_options(sys.argv)
+    if "log_level" in options:
+        set_log_level(parse_level(options["log_level"]))
+
+    # Encerra com SystemExit no SIGTERM (docker stop) para gravar os logs pendentes
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
     proxy = AbstractProxy()
 
-    if len(sys.argv) < 2:
-        proxy.sys_log("Uso: python main.py [source|load_balance|service] [args...]")
+    if len(argv) < 2:
+        proxy.sys_log("Uso: python main.py [source|load_balance|service|mock_llm] [args...] [--opcao=valor...]")
         sys.exit(1)
 
-    role = sys.argv[1]
+    role = argv[1]
 
     if role == "source":
         start_source()
     elif role == "load_balance":
         proxy.sys_log("Iniciando Load Balancer")
-        listen_port = int(sys.argv[2])
+        listen_port = int(argv[2])
+        # Opções da linha de comando têm precedência sobre src/config.py
+        lb_config = get_loadbalancer_config(listen_port)
         services = []
-        if len(sys.argv) > 3:
-            for s in sys.argv[3].split(","):
-                host, port = s.split(":")
-                services.append((host, int(port)))
+        if len(argv) > 3:
+            services = parse_addresses(argv[3])
+        elif lb_config.get("forward_to"):
+            # Próximo salto da cadeia declarado em src/config.py
+            services = parse_addresses(",".join(lb_config["forward_to"]))
         if not services:
             raise ValueError("Nenhum serviço fornecido. Use o formato host:port,host:port,...")
+        weights = lb_config.get("weights")
+        if "weights" in options:
+            weights = [int(weight) for weight in options["weights"].split(",")]
         start_load_balance(
             listen_port=listen_port,
-            service_addresses=services
+            service_addresses=services,
+            pooling=parse_bool(options.get("pooling", "on")),
+            multiplexing=parse_bool(options.get("multiplex", "off")),
+            engine=options.get("engine", "threads"),
+            service_capacity=int(options.get("service_capacity", 10)),
+            probe_interval=float(options.get("probe_interval", 0)),
+            policy=options.get("policy", lb_config.get("policy", "round_robin")),
+            weights=weights,
+            queue_max_size=int(options.get("queue_max_size", lb_config.get("queue_max_size", 0))),
+            queue_timeout=float(options.get("queue_timeout", lb_config.get("queue_timeout", QUEUE_TIMEOUT))),
+            batch_size=int(options.get("batch_size", 1)),
+            batch_linger_us=int(options.get("batch_linger_us", 200)),
+            workers=int(options.get("workers", 1)),
+            forward_config=parse_bool(options.get("forward_config", str(lb_config.get("forward_config", False))))
             )
     elif role == "service":
         proxy.sys_log("Iniciando Service")
-        if len(sys.argv) < 4:
+        if len(argv) < 4:
             print("Uso para service: python main.py service <porta> <service_time_ms>")
-            Source().sys_log("Erro: Parâmetros insuficientes para iniciar o serviço." + str(sys.argv))
+            proxy.sys_log("Erro: Parâmetros insuficientes para iniciar o serviço." + str(sys.argv))
+            sys.exit(1)
+        port = int(argv[2])
+        service_time_ms = float(argv[3])
+        service_config = get_service_config(port)
+        workload = options.get("workload", service_config.get("workload", "sleep"))
+        if parse_bool(options.get("ia", "off")):
+            # --ia=on equivale a --workload=llm
+            workload = "llm"
+        start_service(
+            port,
+            service_time_ms,
+            max_queue_size=int(options.get("queue_size", 10)),
+            servers=int(options.get("servers", 1)),
+            engine=options.get("engine", "threads"),
+            next_hops=parse_addresses(options["next"]) if "next" in options else None,
+            workload=workload,
+            io_block_kb=int(options.get("io_block_kb", service_config.get("io_block_kb", 64))),
+            **distribution_options(options, service_config),
+            ia_cache_size=int(options.get("ia_cache_size", 1024)),
+            ia_cache_ttl=float(options.get("ia_cache_ttl", 300)),
+            ia_cache_path=options.get("ia_cache_path"),
+            llm_base_url=options.get("llm_base_url", load_config().get("llm_base_url")),
+            llm_model=options.get("llm_model", load_config().get("llm_model")),
+            llm_max_concurrency=int(options.get("llm_max_concurrency", 0))
+        )
+    elif role == "mock_llm":
+        proxy.sys_log("Iniciando Mock LLM")
+        if len(argv) < 3:
+            print("Uso para mock_llm: python main.py mock_llm <porta> [latency_ms]")
             sys.exit(1)
-        port = int(sys.argv[2])
-        service_time_ms = float(sys.argv[3])
-        start_service(port, service_time_ms)
+        mock_config = load_config().get("mock_llm", {})
+        start_mock_llm(
+            int(argv[2]),
+            latency_ms=float(argv[3]) if len(argv) > 3 else mock_config.get("latency_ms", 500),
+            **distribution_options(options, mock_config),
+            max_concurrency=int(options.get("max_concurrency", mock_config.get("max_concurrency", 0))),
+            max_rps=float(options.get("max_rps", mock_config.get("max_rps", 0)))
+        )
     else:
         print("Opção desconhecida:", role)
\ No newline at end of file
@@ -1,35 +1,342 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from src.logger import DEBUG, INFO, get_writer, log_enabled
+from src.multiplex import AsyncMultiplexedClient, MultiplexedClient
+from src.pool import AsyncConnectionPool, ConnectionPool
+from src.protocol import Frame, FrameReader, MessageType, read_frame_async, send_frame, write_frame
+
+# Threads que tratam os pedidos das conexões multiplexadas de entrada, compartilhadas por todas as conexões
+MUX_WORKERS = 64
+# Pedidos multiplexados aguardando uma dessas threads; além deles, os pedidos são respondidos com "busy"
+MUX_BACKLOG = 1024
+
 class AbstractProxy:
     """
     Classe base para proxies que implementam funcionalidades de log e controle de tempo.
     Esta classe fornece métodos para inicializar um arquivo de log, registrar mensagens e obter o tempo atual em milissegundos.
     O arquivo de log é utilizado para registrar as mensagens enviadas e recebidas.
+    As escritas nos arquivos de log são feitas em lote por uma thread dedicada (`src.logger`),
+    e as mensagens de `sys_log` abaixo do nível configurado são descartadas.
+    As conexões de saída são obtidas de um pool de conexões persistentes, compartilhado por todas as threads do proxy,
+    ou, no modo multiplexado, de uma única conexão por destino com vários pedidos em andamento.
+    As conexões de entrada são atendidas por `handle_client`, que delega cada mensagem a `handle_message`.
+    Os pedidos das conexões multiplexadas de entrada são tratados por um pool de `mux_workers` threads,
+    com no máximo `mux_backlog` pedidos aguardando; os excedentes são respondidos com "busy".
 
     Args:
-        log_file (str): O caminho do arquivo de log. Padrão é "log.txt".
-    
+        pooling (bool): Se True, reaproveita conexões entre pedidos; se False, abre uma conexão por pedido.
+        multiplexing (bool): Se True, envia todos os pedidos a um destino por uma única conexão multiplexada.
+
     Attributes:
         log_file (str): O caminho do arquivo de log onde as mensagens serão registradas.
-        
+        pool (ConnectionPool): Pool de conexões de saída do proxy.
+        mux (Optional[MultiplexedClient]): Conexões multiplexadas de saída, se o modo estiver ativo.
+        async_pool (AsyncConnectionPool): Pool de conexões de saída das variantes asyncio.
+        async_mux (Optional[AsyncMultiplexedClient]): Conexões multiplexadas de saída das variantes asyncio.
+        mux_workers (int): Threads que tratam os pedidos das conexões multiplexadas de entrada.
+        mux_backlog (int): Pedidos multiplexados de entrada que podem aguardar uma thread livre.
+
     Methods:
         init_log_file(): Inicializa o arquivo de log, limpando seu conteúdo.
-        log(message: str): Registra uma mensagem no log e no console.
+        log(message: str): Registra uma mensagem no log de resultados.
+        sys_log(message: str, level: int): Registra uma mensagem no log do sistema.
+        log_enabled(level: int): Indica se mensagens do nível informado serão registradas.
+        request(ip: str, port: int, msg: str): Envia uma mensagem e aguarda a resposta.
+        request_async(ip: str, port: int, msg: str): Versão assíncrona de `request`, com o pool ou a conexão multiplexada assíncronos.
+        listen(port: int): Cria o socket de escuta do proxy.
+        handle_client(client_sock: socket.socket): Atende uma conexão de entrada.
+        dispatch(client_sock: socket.socket, send_lock: threading.Lock, frame: Frame): Entrega um pedido multiplexado ao pool de threads.
+        handle_message(frame: Frame): Trata uma mensagem recebida e retorna a resposta.
+        handle_connection(reader, writer): Versão assíncrona de `handle_client`, usada pelas variantes asyncio.
     """
-    def __init__(self):
+    def __init__(self, pooling: bool = True, multiplexing: bool = False):
         self.log_file = "log.txt"
         self.sys_log_file = "sys_log.txt"
+        self.pool = ConnectionPool(enabled=pooling)
+        self.mux = MultiplexedClient() if multiplexing else None
+        # Versões assíncronas, usadas por `request_async` dentro de um único event loop
+        self.async_pool = AsyncConnectionPool(enabled=pooling)
+        self.async_mux = AsyncMultiplexedClient() if multiplexing else None
+        # Pool dos pedidos multiplexados de entrada, criado no primeiro deles com o tamanho configurado até lá
+        self.mux_workers = MUX_WORKERS
+        self.mux_backlog = MUX_BACKLOG
+        self._mux_executor: Optional[ThreadPoolExecutor] = None
+        self._mux_slots: Optional[threading.BoundedSemaphore] = None
+        self._mux_lock = threading.Lock()
         self.init_log_file()
 
     def init_log_file(self):
-        with open(self.log_file, 'w') as f:
-            f.write("")
-        
-        with open(self.sys_log_file, 'w') as f:
-            f.write("")
+        get_writer(self.log_file).truncate()
+        get_writer(self.sys_log_file).truncate()
 
     def log(self, message: str):
-        with open(self.log_file, 'a') as f:
-            f.write(message + "\n")
+        get_writer(self.log_file).write(message)
+
+    def sys_log(self, message: str, level: int = INFO):
+        if log_enabled(level):
+            get_writer(self.sys_log_file).write(message)
+
+    def log_enabled(self, level: int = DEBUG) -> bool:
+        return log_enabled(level)
+
+    def request(self, ip: str, port: int, msg: str, kind: MessageType = MessageType.DATA, epoch: int = 0) -> str:
+        """
+        Envia uma mensagem para o destino e aguarda a resposta, usando uma conexão do pool
+        ou a conexão multiplexada do destino, se o modo multiplexado estiver ativo.
+        As mensagens são enquadradas pelo protocolo de `src.protocol`, então podem ter qualquer tamanho.
+        Se uma conexão reaproveitada tiver sido fechada pelo destino, ela é descartada
+        e o pedido é repetido em outra conexão.
+
+        Args:
+            ip (str): Endereço IP do destino.
+            port (int): Porta do destino.
+            msg (str): Mensagem a ser enviada.
+            kind (MessageType): Tipo da mensagem.
+            epoch (int): Época da configuração de serviços com que o destino deve tratar a mensagem.
+        Returns:
+            str: Conteúdo da resposta recebida do destino.
+        """
+        if self.mux is not None:
+            return self.mux.request(ip, port, msg, kind, epoch)
+        while True:
+            conn = self.pool.acquire(ip, port)
+            try:
+                conn.send_frame(kind, msg, epoch)
+                response = conn.read_frame()
+            except OSError:
+                self.pool.release(conn, discard=True)
+                if not conn.reused:
+                    raise
+                continue
+            if response is not None:
+                self.pool.release(conn)
+                return response.payload
+            # Conexão fechada pelo destino: se era reaproveitada, tenta em uma nova
+            self.pool.release(conn, discard=True)
+            if not conn.reused:
+                raise ConnectionError(f"Conexão encerrada por {ip}:{port} sem resposta")
+
+    async def request_async(
+        self, ip: str, port: int, msg: str, kind: MessageType = MessageType.DATA, epoch: int = 0
+    ) -> str:
+        """
+        Envia uma mensagem para o destino e aguarda a resposta, usando uma conexão do pool assíncrono
+        ou a conexão multiplexada do destino, se o modo multiplexado estiver ativo.
+        Se uma conexão reaproveitada tiver sido fechada pelo destino, ela é descartada
+        e o pedido é repetido em outra conexão.
+
+        Args:
+            ip (str): Endereço IP do destino.
+            port (int): Porta do destino.
+            msg (str): Mensagem a ser enviada.
+            kind (MessageType): Tipo da mensagem.
+            epoch (int): Época da configuração de serviços com que o destino deve tratar a mensagem.
+        Returns:
+            str: Conteúdo da resposta recebida do destino.
+        """
+        if self.async_mux is not None:
+            return await self.async_mux.request(ip, port, msg, kind, epoch)
+        while True:
+            conn = await self.async_pool.acquire(ip, port)
+            try:
+                await conn.send_frame(kind, msg, epoch)
+                response = await conn.read_frame()
+            except OSError:
+                self.async_pool.release(conn, discard=True)
+                if not conn.reused:
+                    raise
+                continue
+            except BaseException:
+                self.async_pool.release(conn, discard=True)
+                raise
+            if response is not None:
+                self.async_pool.release(conn)
+                return response.payload
+            # Conexão fechada pelo destino: se era reaproveitada, tenta em uma nova
+            self.async_pool.release(conn, discard=True)
+            if not conn.reused:
+                raise ConnectionError(f"Conexão encerrada por {ip}:{port} sem resposta")
+
+    def listen(self, port: int, reuse_port: bool = False) -> socket.socket:
+        """
+        Cria o socket de escuta do proxy na porta informada.
+        Com SO_REUSEADDR o proxy pode ser reiniciado sem esperar as conexões anteriores saírem de TIME_WAIT;
+        com SO_REUSEPORT vários processos podem escutar na mesma porta, com o kernel dividindo as conexões entre eles.
+
+        Args:
+            port (int): Porta de escuta.
+            reuse_port (bool): Se True, habilita SO_REUSEPORT.
+        Returns:
+            socket.socket: O socket de escuta.
+        """
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        server.bind(('0.0.0.0', port))
+        server.listen()
+        return server
+
+    def handle_client(self, client_sock: socket.socket):
+        """
+        Atende a conexão de um cliente.
+        A conexão é mantida aberta até que o cliente a encerre e cada mensagem recebida é entregue a `handle_message`.
+        As respostas são enviadas como mensagens do tipo REPLY, com o mesmo identificador do pedido.
+        Pedidos sem identificador são tratados em sequência; pedidos com identificador (conexão multiplexada)
+        são tratados em paralelo por `dispatch` e respondidos na ordem em que terminarem.
+
+        Args:
+            client_sock (socket.socket): O socket do cliente conectado.
+        Returns:
+            None
+        """
+        reader = FrameReader(client_sock)
+        send_lock = threading.Lock()
+        try:
+            while True:
+                frame = reader.read_frame()
+                if frame is None:
+                    break
+                if frame.request_id:
+                    self.dispatch(client_sock, send_lock, frame)
+                else:
+                    response = self.handle_message(frame)
+                    with send_lock:
+                        send_frame(client_sock, MessageType.REPLY, response)
+        except Exception as e:
+            print(f"Erro no {type(self).__name__}: {e}")
+        finally:
+            client_sock.close()
+
+    def mux_executor(self) -> Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+        with self._mux_lock:
+            if self._mux_executor is None:
+                self._mux_executor = ThreadPoolExecutor(
+                    max_workers=self.mux_workers, thread_name_prefix=f"{type(self).__name__}-mux"
+                )
+                self._mux_slots = threading.BoundedSemaphore(self.mux_workers + self.mux_backlog)
+            return self._mux_executor, self._mux_slots
+
+    def dispatch(self, client_sock: socket.socket, send_lock: threading.Lock, frame: Frame):
+        """
+        Entrega um pedido de uma conexão multiplexada ao pool de threads, que o trata com `reply`.
+        Se já houver `mux_workers + mux_backlog` pedidos em andamento ou aguardando, responde "busy" imediatamente,
+        de modo que uma conexão com muitos pedidos em andamento não cria threads nem filas sem limite.
+
+        Args:
+            client_sock (socket.socket): O socket do cliente conectado.
+            send_lock (threading.Lock): Lock que serializa as escritas no socket.
+            frame (Frame): O pedido recebido.
+        Returns:
+            None
+        """
+        executor, slots = self.mux_executor()
+        if not slots.acquire(blocking=False):
+            with send_lock:
+                send_frame(client_sock, MessageType.REPLY, "busy", frame.request_id)
+            return
+        future = executor.submit(self.reply, client_sock, send_lock, frame)
+        future.add_done_callback(lambda _: slots.release())
+
+    def reply(self, client_sock: socket.socket, send_lock: threading.Lock, frame: Frame):
+        """
+        Trata um pedido de uma conexão multiplexada e envia a resposta com o mesmo identificador.
+        Se o tratamento falhar, responde "error" para não deixar o pedido sem resposta.
+
+        Args:
+            client_sock (socket.socket): O socket do cliente conectado.
+            send_lock (threading.Lock): Lock que serializa as escritas no socket.
+            frame (Frame): O pedido recebido.
+        Returns:
+            None
+        """
+        try:
+            response = self.handle_message(frame)
+        except Exception as e:
+            print(f"Erro no {type(self).__name__}: {e}")
+            response = "error"
+        try:
+            with send_lock:
+                send_frame(client_sock, MessageType.REPLY, response, frame.request_id)
+        except OSError:
+            pass
+
+    def handle_message(self, frame: Frame) -> str:
+        """
+        Trata uma mensagem recebida e retorna a resposta a ser enviada. Implementado pelas subclasses.
+
+        Args:
+            frame (Frame): A mensagem recebida.
+        Returns:
+            str: A resposta para o cliente.
+        """
+        raise NotImplementedError
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Corrotina que atende uma conexão de cliente nas variantes asyncio dos proxies.
+        Mesma semântica de `handle_client`: pedidos sem identificador são tratados em sequência
+        e pedidos com identificador são tratados concorrentemente, cada um em sua própria tarefa.
+        As mensagens são entregues a `handle_message_async`.
+
+        Args:
+            reader (asyncio.StreamReader): Stream de leitura do cliente.
+            writer (asyncio.StreamWriter): Stream de escrita do cliente.
+        Returns:
+            None
+        """
+        tasks = set()
+        try:
+            while True:
+                frame = await read_frame_async(reader)
+                if frame is None:
+                    break
+                if frame.request_id:
+                    task = asyncio.create_task(self.reply_async(writer, frame))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                else:
+                    write_frame(writer, MessageType.REPLY, await self.handle_message_async(frame))
+                    await writer.drain()
+        except Exception as e:
+            print(f"Erro no {type(self).__name__}: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def reply_async(self, writer: asyncio.StreamWriter, frame: Frame):
+        """
+        Versão assíncrona de `reply`.
+
+        Args:
+            writer (asyncio.StreamWriter): Stream de escrita do cliente.
+            frame (Frame): O pedido recebido.
+        Returns:
+            None
+        """
+        try:
+            response = await self.handle_message_async(frame)
+        except Exception as e:
+            print(f"Erro no {type(self).__name__}: {e}")
+            response = "error"
+        try:
+            write_frame(writer, MessageType.REPLY, response, frame.request_id)
+            await writer.drain()
+        except OSError:
+            pass
+
+    async def handle_message_async(self, frame: Frame) -> str:
+        """
+        Versão assíncrona de `handle_message`. Implementado pelas variantes asyncio.
 
-    def sys_log(self, message: str):
-        with open(self.sys_log_file, 'a') as f:
-            f.write(message + "\n")
+        Args:
+            frame (Frame): A mensagem recebida.
+        Returns:
+            str: A resposta para o cliente.
+        """
+        raise NotImplementedError
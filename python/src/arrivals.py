@@ -0,0 +1,174 @@
+import asyncio
+import itertools
+import random
+import time
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+# Processos de chegada suportados pelo Source
+ARRIVAL_PROCESSES = ("deterministic", "poisson", "trace")
+
+
+def deterministic_arrivals(rate: float) -> Iterator[float]:
+    """
+    Chegadas a intervalos fixos de 1 / rate segundos.
+
+    Args:
+        rate (float): Taxa de chegada, em mensagens por segundo.
+    Returns:
+        Iterator[float]: Instantes de chegada, em segundos desde o início.
+    """
+    interval = 1 / rate
+    return (index * interval for index in itertools.count())
+
+
+def poisson_arrivals(rate: float, seed: Optional[int] = None) -> Iterator[float]:
+    """
+    Chegadas de Poisson: intervalos exponenciais independentes, com média 1 / rate segundos.
+
+    Args:
+        rate (float): Taxa de chegada, em mensagens por segundo.
+        seed (Optional[int]): Semente do gerador; None usa uma semente aleatória.
+    Returns:
+        Iterator[float]: Instantes de chegada, em segundos desde o início.
+    """
+    rng = random.Random(seed)
+    offset = 0.0
+    while True:
+        yield offset
+        offset += rng.expovariate(rate)
+
+
+def trace_arrivals(path: str) -> Iterator[float]:
+    """
+    Chegadas lidas de um arquivo com um instante de chegada por linha, em segundos e em ordem crescente.
+    Os instantes são deslocados para que a primeira chegada ocorra no início (aceita timestamps absolutos).
+
+    Args:
+        path (str): Caminho do arquivo.
+    Returns:
+        Iterator[float]: Instantes de chegada, em segundos desde o início.
+    """
+    with open(path) as file:
+        instants = [float(line) for line in file if line.strip()]
+    if not instants:
+        raise ValueError(f"Arquivo de chegadas vazio: {path}")
+    return (instant - instants[0] for instant in instants)
+
+
+def create_arrivals(
+    process: str, rate: float, seed: Optional[int] = None, trace: Optional[str] = None
+) -> Iterator[float]:
+    """
+    Cria os instantes de chegada de um ciclo pelo nome do processo.
+
+    Args:
+        process (str): deterministic, poisson ou trace.
+        rate (float): Taxa de chegada, em mensagens por segundo; deve ser positiva, exceto para trace, que a ignora.
+        seed (Optional[int]): Semente do processo de Poisson.
+        trace (Optional[str]): Arquivo de chegadas, para trace.
+    Returns:
+        Iterator[float]: Instantes de chegada, em segundos desde o início.
+    """
+    if process in ("deterministic", "poisson") and rate <= 0:
+        raise ValueError(
+            f"O processo de chegada {process} exige uma taxa positiva (arrival_rate ou arrival_delay): {rate}."
+        )
+    if process == "deterministic":
+        return deterministic_arrivals(rate)
+    if process == "poisson":
+        return poisson_arrivals(rate, seed)
+    if process == "trace":
+        if trace is None:
+            raise ValueError("O processo de chegada trace exige um arquivo de chegadas.")
+        return trace_arrivals(trace)
+    raise ValueError(f"Processo de chegada desconhecido: {process}. Use {', '.join(ARRIVAL_PROCESSES)}.")
+
+
+class ArrivalReport(NamedTuple):
+    """
+    Resultado de uma sequência de envios em malha aberta.
+
+    Attributes:
+        sent (int): Número de mensagens enviadas.
+        duration (float): Tempo entre o primeiro e o último envio, em segundos.
+        target_rate (float): Taxa pedida pelos instantes de chegada, em mensagens por segundo.
+        achieved_rate (float): Taxa efetivamente alcançada, em mensagens por segundo.
+        mean_lag_ms (float): Atraso médio de cada envio em relação ao seu instante agendado.
+        p99_lag_ms (float): Percentil 99 do atraso de envio.
+        max_lag_ms (float): Maior atraso de envio.
+    """
+    sent: int
+    duration: float
+    target_rate: float
+    achieved_rate: float
+    mean_lag_ms: float
+    p99_lag_ms: float
+    max_lag_ms: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.sent} mensagens em {self.duration:.3f} s; taxa alvo {self.target_rate:.1f}/s, "
+            f"alcançada {self.achieved_rate:.1f}/s; atraso de envio médio {self.mean_lag_ms:.3f} ms, "
+            f"p99 {self.p99_lag_ms:.3f} ms, máximo {self.max_lag_ms:.3f} ms"
+        )
+
+
+async def run_open_loop_async(arrivals: Iterator[float], count: int, send: Callable[[int], None]) -> ArrivalReport:
+    """
+    Executa envios em malha aberta: cada mensagem é enviada no seu instante de chegada,
+    independentemente das respostas às anteriores.
+    Os instantes são contados de um início fixo no relógio monotônico, e não do envio anterior,
+    então o tempo gasto por `send` e os atrasos do escalonador não se acumulam: um envio atrasado
+    é feito imediatamente e os seguintes voltam ao horário.
+    Cada instante é esperado com `asyncio.sleep`, de modo que as respostas dos envios anteriores
+    continuam sendo tratadas durante a espera. `send` deve apenas criar a tarefa do envio e retornar.
+
+    Args:
+        arrivals (Iterator[float]): Instantes de chegada, em segundos desde o início.
+        count (int): Número máximo de mensagens; termina antes se os instantes acabarem.
+        send (Callable[[int], None]): Dispara o envio da mensagem de índice informado.
+    Returns:
+        ArrivalReport: Taxas alvo e alcançada e atrasos de envio.
+    """
+    lags: List[float] = []
+    last_offset = 0.0
+    started = time.monotonic()
+    first_sent = last_sent = started
+    for index, offset in enumerate(itertools.islice(arrivals, count)):
+        target = started + offset
+        now = time.monotonic()
+        if target > now:
+            await asyncio.sleep(target - now)
+            now = time.monotonic()
+        send(index)
+        lags.append(now - target)
+        last_offset = offset
+        if index == 0:
+            first_sent = now
+        last_sent = now
+    return summarize(lags, last_offset, last_sent - first_sent)
+
+
+def summarize(lags: List[float], span: float, duration: float) -> ArrivalReport:
+    """
+    Monta o relatório de uma sequência de envios.
+
+    Args:
+        lags (List[float]): Atraso de cada envio em relação ao seu instante agendado, em segundos.
+        span (float): Intervalo entre o primeiro e o último instante agendado, em segundos.
+        duration (float): Intervalo entre o primeiro e o último envio efetivo, em segundos.
+    Returns:
+        ArrivalReport: O relatório.
+    """
+    sent = len(lags)
+    intervals = sent - 1
+    ordered = sorted(lags)
+    return ArrivalReport(
+        sent=sent,
+        duration=duration,
+        target_rate=intervals / span if span > 0 else 0.0,
+        achieved_rate=intervals / duration if duration > 0 else 0.0,
+        mean_lag_ms=sum(lags) / sent * 1000 if sent else 0.0,
+        p99_lag_ms=ordered[min(sent - 1, int(0.99 * sent))] * 1000 if sent else 0.0,
+        max_lag_ms=ordered[-1] * 1000 if sent else 0.0,
+    )
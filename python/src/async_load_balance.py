@@ -0,0 +1,174 @@
+import asyncio
+
+from src.batching import AsyncBatchSender
+from src.dispatch import AsyncWaiter
+from src.load_balance import LoadBalancer
+from src.protocol import Frame, MessageType, decode_batch, encode_batch
+from src.utils import add_timestamp_to_message
+
+class AsyncLoadBalancer(LoadBalancer):
+    """
+    Versão do LoadBalancer baseada em asyncio.
+    Todas as conexões, de entrada e de saída, são tratadas por corrotinas em um único event loop,
+    em vez de uma thread por conexão. A semântica é a mesma do LoadBalancer: escolha do serviço livre pela
+    política configurada a partir do estado local, fila de espera limitada, resposta "busy" quando ela está cheia,
+    verificação de saúde opcional em segundo plano e os mesmos timestamps adicionados à mensagem.
+
+    Args:
+        *args: Argumentos posicionais repassados ao LoadBalancer.
+        backlog (int): Tamanho da fila de conexões pendentes do socket de escuta.
+        **kwargs: Argumentos nomeados repassados ao LoadBalancer (pooling, service_capacity, policy, ...).
+    Returns:
+        None
+    """
+    def __init__(self, *args, backlog: int = 4096, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.async_batcher = (
+            AsyncBatchSender(self.send_batch_async, self.batch_size, self.batch_linger_us)
+            if self.batcher is not None else None
+        )
+        self.backlog = backlog
+
+    def start(self):
+        """
+        Inicia o event loop do LoadBalancer e aguarda conexões indefinidamente.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        """
+        Cria o servidor asyncio na porta especificada e atende conexões até ser cancelado.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        server = await asyncio.start_server(
+            self.handle_connection, '0.0.0.0', self.listen_port, backlog=self.backlog,
+            reuse_address=True, reuse_port=self.reuse_port or None
+        )
+        self.sys_log(f"AsyncLoadBalancer listening on port {self.listen_port} with policy {self.tracker.policy.name}")
+        probe = asyncio.create_task(self.probe_loop_async()) if self.probe_interval > 0 else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if probe is not None:
+                probe.cancel()
+            self.async_pool.close()
+            if self.async_mux is not None:
+                self.async_mux.close()
+
+    async def handle_message_async(self, frame: Frame) -> str:
+        """
+        Versão assíncrona de `LoadBalancer.handle_message`.
+
+        Args:
+            frame (Frame): A mensagem recebida.
+        Returns:
+            str: A resposta para o cliente.
+        """
+        if frame.kind == MessageType.CONFIG:
+            if self.forward_config:
+                return await self.forward_configuration_async(frame.payload)
+            return self.configure(frame.payload)
+        if frame.kind == MessageType.PING:
+            return "free" if self.tracker.has_capacity() else "busy"
+        if frame.kind == MessageType.BATCH:
+            replies = await asyncio.gather(
+                *[self.handle_message_async(Frame(MessageType.DATA, data, epoch=frame.epoch))
+                  for data in decode_batch(frame.payload)],
+                return_exceptions=True,
+            )
+            return encode_batch([reply if isinstance(reply, str) else "error" for reply in replies])
+        if frame.epoch > self.epoch and not self.forward_config:
+            self.activate(frame.epoch)
+
+        # Adiciona timestamp de chegada à mensagem
+        data = add_timestamp_to_message(frame.payload)
+
+        # Escolhe um service livre, segundo a política, a partir do estado local
+        waiter = AsyncWaiter(asyncio.get_running_loop().create_future())
+        state = self.tracker.acquire(waiter)
+        if state is None:
+            if not waiter.queued:
+                # Nenhum service está livre e a fila está cheia
+                return "busy"
+            try:
+                state = await asyncio.wait_for(waiter.future, self.queue_timeout or None)
+            except asyncio.TimeoutError:
+                # Nenhum serviço ficou livre no prazo; o future cancelado recusa os serviços liberados depois
+                self.tracker.cancel(waiter, expired=True)
+                return "busy"
+            except asyncio.CancelledError:
+                self.tracker.cancel(waiter)
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # O serviço foi reservado antes do cancelamento: devolve a vaga
+                    self.tracker.release(waiter.future.result())
+                raise
+
+        # Adiciona timestamp de despacho (saída da fila) à mensagem
+        data = add_timestamp_to_message(data)
+        failed = False
+        try:
+            if self.async_batcher is not None:
+                return await self.async_batcher.submit(state.address, data, frame.epoch)
+            return await self.request_async(*state.address, data, epoch=frame.epoch)
+        except Exception:
+            failed = True
+            if self.probe_interval > 0:
+                self.tracker.mark(state.address, healthy=False)
+            raise
+        finally:
+            self.tracker.release(state, failed)
+
+    async def send_batch_async(self, address: tuple, payload: str, epoch: int = 0) -> str:
+        """
+        Versão assíncrona de `LoadBalancer.send_batch`.
+
+        Args:
+            address (tuple): Endereço (ip, porta) do serviço.
+            payload (str): As mensagens agrupadas.
+            epoch (int): Época da configuração de serviços do lote.
+        Returns:
+            str: As respostas agrupadas, na mesma ordem.
+        """
+        return await self.request_async(*address, payload, MessageType.BATCH, epoch)
+
+    async def forward_configuration_async(self, data: str) -> str:
+        """
+        Versão assíncrona de `LoadBalancer.forward_configuration`.
+
+        Args:
+            data (str): O conteúdo da mensagem CONFIG.
+        Returns:
+            str: A confirmação comum dos destinos, ou "error" se eles responderem de formas diferentes.
+        """
+        responses = set(await asyncio.gather(
+            *[self.request_async(ip, port, data, MessageType.CONFIG) for ip, port in self.tracker.addresses]
+        ))
+        return responses.pop() if len(responses) == 1 else "error"
+
+    async def probe_loop_async(self):
+        """
+        Versão assíncrona de `LoadBalancer.probe_loop`.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        while True:
+            for ip, port in self.tracker.addresses:
+                try:
+                    status = await self.request_async(ip, port, "", MessageType.PING)
+                    self.tracker.mark((ip, port), healthy=True, busy=status == "busy")
+                except Exception:
+                    self.tracker.mark((ip, port), healthy=False)
+            await asyncio.sleep(self.probe_interval)
@@ -0,0 +1,134 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from src.protocol import Frame, MessageType, decode_batch, encode_batch
+from src.service import Service
+from src.utils import add_timestamp_to_message
+
+class AsyncService(Service):
+    """
+    Versão do Service baseada em asyncio, organizada como uma estação de filas.
+    As conexões são aceitas e lidas por corrotinas em um único event loop.
+    Cada mensagem de dados recebe o timestamp de chegada e entra em uma fila limitada a `max_queue_size`;
+    se a fila estiver cheia, o serviço responde "busy". Um número fixo de `servers` workers consome a fila,
+    executando o trabalho do serviço em um pool de threads, de modo que no máximo `servers` mensagens
+    são processadas ao mesmo tempo e as demais aguardam na fila.
+    Mensagens STATS são respondidas com a ocupação dos workers e da fila.
+
+    Args:
+        listen_port (int): A porta na qual o serviço irá escutar.
+        service_time_ms (float): O tempo de serviço simulado em milissegundos.
+        max_queue_size (int): Número máximo de mensagens aguardando atendimento.
+        servers (int): Número de workers que consomem a fila.
+        **kwargs: Argumentos nomeados repassados ao Service (next_hops, workload).
+    Returns:
+        None
+    """
+    def __init__(self, listen_port: int, service_time_ms: float, max_queue_size: int = 10, servers: int = 1, **kwargs):
+        super().__init__(listen_port, service_time_ms, max_queue_size=max_queue_size, servers=servers, **kwargs)
+        self.async_queue: Optional[asyncio.Queue] = None
+        self.executor = ThreadPoolExecutor(max_workers=servers, thread_name_prefix="service-worker")
+
+    def start(self):
+        """
+        Inicia o event loop do serviço e aguarda conexões indefinidamente.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.workload.start()
+        try:
+            asyncio.run(self.serve())
+        finally:
+            self.workload.close()
+
+    async def serve(self):
+        """
+        Cria a fila, os workers e o servidor asyncio, atendendo conexões até ser cancelado.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self.async_queue = asyncio.Queue(maxsize=self.max_queue_size)
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.servers)]
+        server = await asyncio.start_server(self.handle_connection, '0.0.0.0', self.listen_port, reuse_address=True)
+        self.sys_log(f"AsyncService listening on port {self.listen_port} with {self.servers} servers ({self.workload.name})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.executor.shutdown(wait=False)
+
+    async def worker(self):
+        """
+        Worker que retira mensagens da fila e executa o trabalho do serviço em uma thread do pool.
+        O resultado é entregue à conexão que aguarda a resposta.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            data, future = await self.async_queue.get()
+            try:
+                result = await loop.run_in_executor(self.executor, self.process, data)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.async_queue.task_done()
+
+    async def handle_message_async(self, frame: Frame) -> str:
+        """
+        Trata uma mensagem recebida e retorna a resposta a ser enviada.
+        Mensagens PING são respondidas com "free" ou "busy" conforme a ocupação da fila.
+        Mensagens de dados entram na fila e a resposta é enviada quando um worker termina de processá-las.
+        As mensagens de um BATCH entram na fila individualmente e são processadas em paralelo pelos workers.
+
+        Args:
+            frame (Frame): A mensagem recebida.
+        Returns:
+            str: A resposta para o cliente.
+        """
+        if frame.kind == MessageType.PING:
+            return "busy" if self.async_queue.full() else "free"
+        if frame.kind == MessageType.STATS:
+            return self.stats(self.async_queue.qsize())
+        if frame.kind == MessageType.BATCH:
+            replies = await asyncio.gather(
+                *[self.enqueue_async(data, frame.epoch) for data in decode_batch(frame.payload)]
+            )
+            return encode_batch(replies)
+        return await self.enqueue_async(frame.payload, frame.epoch)
+
+    async def enqueue_async(self, data: str, epoch: int = 0) -> str:
+        """
+        Coloca uma mensagem de dados na fila e aguarda o seu processamento.
+
+        Args:
+            data (str): A mensagem de dados.
+            epoch (int): Época da configuração de serviços indicada na mensagem, repassada ao próximo estágio.
+        Returns:
+            str: A mensagem com os timestamps do serviço, ou "busy" se a fila estiver cheia.
+        """
+        if self.async_queue.full():
+            return "busy"
+        future = asyncio.get_running_loop().create_future()
+        # Adiciona timestamp de chegada à mensagem antes da espera na fila
+        self.async_queue.put_nowait((add_timestamp_to_message(data), future))
+        result = await future
+        if self.next_hops:
+            # O encaminhamento ao próximo estágio não ocupa um worker do serviço
+            result = await asyncio.get_running_loop().run_in_executor(None, self.forward, result, epoch)
+        return result
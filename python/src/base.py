@@ -1,6 +1,8 @@
-import socket
 from typing import Optional
 
+from src.pool import ConnectionPool
+from src.protocol import MessageType
+
 class AbstractProxy:
     """
     Classe abstrata que define a interface para um proxy de comunicação.
@@ -9,11 +11,13 @@ class AbstractProxy:
 
     Args:
         log_file (Optional[str]): Caminho do arquivo de log. Se não for fornecido, usa "log.txt".
+        pooling (bool): Se True, reaproveita as conexões entre envios; se False, abre uma conexão por envio.
     Returns:
         None
     """
-    def __init__(self, log_file: Optional[str] = None):
+    def __init__(self, log_file: Optional[str] = None, pooling: bool = True):
         self.log_file = log_file or "log.txt"
+        self.pool = ConnectionPool(enabled=pooling)
         self.init_log_file()
 
     def init_log_file(self):
@@ -46,7 +50,8 @@ class AbstractProxy:
     def send(self, ip: str, port: int, msg: str) -> None:
         """
         Método para enviar uma mensagem para um endereço IP e porta específicos.
-        Este método cria um socket, conecta-se ao endereço especificado e envia a mensagem.
+        Este método obtém uma conexão do pool para o endereço especificado e envia a mensagem.
+        A resposta é lida e descartada antes de a conexão voltar ao pool, para que não seja entregue ao próximo envio.
         Args:
             ip (str): Endereço IP do destino.
             port (int): Porta do destino.
@@ -55,16 +60,17 @@ class AbstractProxy:
             None
         """
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((ip, port))
-                s.sendall(msg.encode())
+            with self.pool.connection(ip, port) as conn:
+                conn.send_frame(MessageType.DATA, msg)
+                if conn.read_frame() is None:
+                    raise ConnectionError(f"Conexão encerrada por {ip}:{port} sem resposta")
         except Exception as e:
             self.log(f"Erro ao enviar mensagem: {e}")
 
     def send_and_receive(self, ip: str, port: int, msg: str) -> str:
         """
         Método para enviar uma mensagem e receber uma resposta do servidor.
-        Este método cria um socket, conecta-se ao endereço especificado, envia a mensagem
+        Este método obtém uma conexão do pool para o endereço especificado, envia a mensagem
         e aguarda uma resposta do servidor. Se ocorrer algum erro, registra a mensagem de erro no log.
         Args:
             ip (str): Endereço IP do destino.
@@ -74,11 +80,12 @@ class AbstractProxy:
             str: Resposta recebida do servidor, ou uma string vazia em caso de erro.
         """
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((ip, port))
-                s.sendall(msg.encode())
-                response = s.recv(1024).decode()
-                return response
+            with self.pool.connection(ip, port) as conn:
+                conn.send_frame(MessageType.DATA, msg)
+                response = conn.read_frame()
+                if response is None:
+                    raise ConnectionError(f"Conexão encerrada por {ip}:{port} sem resposta")
+                return response.payload
         except Exception as e:
             self.log(f"Erro ao enviar/receber mensagem: {e}")
             return ""
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from src.protocol import decode_batch, encode_batch
+
+Address = Tuple[str, int]
+
+
+class BatchSender:
+    """
+    Agrupa mensagens destinadas ao mesmo serviço em lotes, enviados como uma única mensagem BATCH.
+    Um lote é enviado quando atinge `max_size` mensagens ou quando a primeira mensagem do lote
+    completa `linger_us` microssegundos de espera, o que ocorrer primeiro.
+    A thread que abre o lote é a responsável por enviá-lo; as demais aguardam apenas a sua própria resposta,
+    então nenhuma thread adicional é criada.
+    O lote é enviado com a maior época de configuração entre as das suas mensagens.
+
+    Args:
+        send (Callable[[Address, str, int], str]): Envia o conteúdo e a época de um lote ao serviço e retorna o conteúdo da resposta.
+        max_size (int): Número máximo de mensagens por lote.
+        linger_us (int): Tempo máximo, em microssegundos, que a primeira mensagem aguarda o lote encher.
+    Returns:
+        None
+    """
+    def __init__(self, send: Callable[[Address, str, int], str], max_size: int = 16, linger_us: int = 200):
+        self.send = send
+        self.max_size = max_size
+        self.linger = linger_us / 1_000_000
+        self._open: Dict[Address, List[Tuple[str, int, Future]]] = {}
+        self._cond = threading.Condition()
+
+    def submit(self, address: Address, data: str, epoch: int = 0) -> str:
+        """
+        Adiciona uma mensagem ao lote do serviço e aguarda a resposta correspondente.
+
+        Args:
+            address (Address): Endereço (ip, porta) do serviço.
+            data (str): Mensagem a ser enviada.
+            epoch (int): Época da configuração de serviços da mensagem.
+        Returns:
+            str: A resposta do serviço para esta mensagem.
+        """
+        future: Future = Future()
+        with self._cond:
+            batch = self._open.get(address)
+            leader = batch is None
+            if leader:
+                batch = []
+                self._open[address] = batch
+            batch.append((data, epoch, future))
+            if len(batch) >= self.max_size:
+                # Lote cheio: fecha o lote e acorda quem o abriu
+                del self._open[address]
+                self._cond.notify_all()
+            if leader:
+                deadline = time.monotonic() + self.linger
+                while self._open.get(address) is batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        del self._open[address]
+                        break
+                    self._cond.wait(remaining)
+        if leader:
+            self._flush(address, batch)
+        return future.result()
+
+    def _flush(self, address: Address, batch: List[Tuple[str, int, Future]]) -> None:
+        try:
+            payload = encode_batch([data for data, _, _ in batch])
+            replies = decode_batch(self.send(address, payload, max(epoch for _, epoch, _ in batch)))
+            if len(replies) != len(batch):
+                raise ConnectionError(f"Lote de {len(batch)} mensagens respondido com {len(replies)} respostas")
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), reply in zip(batch, replies):
+            future.set_result(reply)
+
+
+class AsyncBatchSender:
+    """
+    Versão assíncrona do `BatchSender`, para uso dentro de um único event loop.
+    A corrotina que abre o lote aguarda até ele encher ou até o fim da espera e então dispara o seu envio.
+
+    Args:
+        send (Callable[[Address, str, int], Awaitable[str]]): Envia o conteúdo e a época de um lote ao serviço e retorna o conteúdo da resposta.
+        max_size (int): Número máximo de mensagens por lote.
+        linger_us (int): Tempo máximo, em microssegundos, que a primeira mensagem aguarda o lote encher.
+    Returns:
+        None
+    """
+    def __init__(self, send: Callable[[Address, str, int], Awaitable[str]], max_size: int = 16, linger_us: int = 200):
+        self.send = send
+        self.max_size = max_size
+        self.linger = linger_us / 1_000_000
+        self._open: Dict[Address, Tuple[List[Tuple[str, int, asyncio.Future]], asyncio.Event]] = {}
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, address: Address, data: str, epoch: int = 0) -> str:
+        """
+        Adiciona uma mensagem ao lote do serviço e aguarda a resposta correspondente.
+
+        Args:
+            address (Address): Endereço (ip, porta) do serviço.
+            data (str): Mensagem a ser enviada.
+            epoch (int): Época da configuração de serviços da mensagem.
+        Returns:
+            str: A resposta do serviço para esta mensagem.
+        """
+        future = asyncio.get_running_loop().create_future()
+        opened = self._open.get(address)
+        if opened is not None:
+            batch, full = opened
+            batch.append((data, epoch, future))
+            if len(batch) >= self.max_size:
+                del self._open[address]
+                full.set()
+            return await future
+
+        batch, full = [(data, epoch, future)], asyncio.Event()
+        self._open[address] = (batch, full)
+        try:
+            await asyncio.wait_for(full.wait(), self.linger)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if self._open.get(address, (None,))[0] is batch:
+                del self._open[address]
+            # O envio roda em uma tarefa própria: se quem abriu o lote for cancelado, as demais mensagens seguem
+            flush = asyncio.ensure_future(self._flush(address, batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+        return await future
+
+    async def _flush(self, address: Address, batch: List[Tuple[str, int, asyncio.Future]]) -> None:
+        try:
+            payload = encode_batch([data for data, _, _ in batch])
+            replies = decode_batch(await self.send(address, payload, max(epoch for _, epoch, _ in batch)))
+            if len(replies) != len(batch):
+                raise ConnectionError(f"Lote de {len(batch)} mensagens respondido com {len(replies)} respostas")
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), reply in zip(batch, replies):
+            if not future.done():
+                future.set_result(reply)
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List, NamedTuple, Optional, Tuple
+
+
+class ClosedLoopReport(NamedTuple):
+    """
+    Resultado de uma rodada em malha fechada com um número fixo de clientes.
+
+    Attributes:
+        users (int): Número de clientes virtuais.
+        completed (int): Pedidos respondidos.
+        dropped (int): Pedidos sem resposta, respondidos com "busy" ou com erro.
+        discarded (int): Respostas do aquecimento, fora dos tempos de resposta.
+        duration (float): Tempo entre o primeiro envio e a última resposta, em segundos.
+        throughput (float): Pedidos respondidos por segundo.
+        mean_response_ms (float): Tempo de resposta médio, medido no cliente.
+        p99_response_ms (float): Percentil 99 do tempo de resposta.
+    """
+    users: int
+    completed: int
+    dropped: int
+    discarded: int
+    duration: float
+    throughput: float
+    mean_response_ms: float
+    p99_response_ms: float
+
+    def __str__(self) -> str:
+        return (
+            f"N={self.users}: {self.completed} respostas ({self.discarded} de aquecimento) "
+            f"e {self.dropped} descartes em {self.duration:.3f} s; "
+            f"vazão {self.throughput:.1f}/s, tempo de resposta médio {self.mean_response_ms:.3f} ms, "
+            f"p99 {self.p99_response_ms:.3f} ms"
+        )
+
+
+async def run_closed_loop(
+    users: int,
+    count: int,
+    request: Callable[[int], Awaitable[bool]],
+    think: Callable[[], float],
+    truncate: Optional[Callable[[List[float]], int]] = None,
+) -> ClosedLoopReport:
+    """
+    Executa envios em malha fechada: cada um dos `users` clientes envia um pedido, aguarda a resposta,
+    espera um tempo de pensamento e repete, até que `count` pedidos tenham sido enviados no total.
+    A taxa de chegada é, então, determinada pelo próprio sistema: cresce com o número de clientes até a saturação.
+    O tempo de resposta é medido em torno de `request`, sem o tempo de pensamento.
+    Com `truncate`, as respostas dos primeiros pedidos, na ordem de envio, são tratadas como aquecimento
+    e ficam fora do tempo de resposta; a vazão conta todas as respostas.
+
+    Args:
+        users (int): Número de clientes virtuais.
+        count (int): Número total de pedidos da rodada.
+        request (Callable[[int], Awaitable[bool]]): Envia o pedido de índice informado e indica se ele foi respondido.
+        think (Callable[[], float]): Retorna o próximo tempo de pensamento, em segundos.
+        truncate (Optional[Callable[[List[float]], int]]): Número de respostas do aquecimento, dados os tempos de resposta
+            na ordem de envio.
+    Returns:
+        ClosedLoopReport: Vazão e tempos de resposta da rodada.
+    """
+    # (índice do pedido, tempo de resposta), na ordem em que as respostas chegaram
+    samples: List[Tuple[int, float]] = []
+    dropped = 0
+    issued = 0
+    started = time.monotonic()
+    finished = started
+
+    async def user() -> None:
+        nonlocal dropped, issued, finished
+        while issued < count:
+            index = issued
+            issued += 1
+            sent = time.monotonic()
+            answered = await request(index)
+            finished = time.monotonic()
+            if answered:
+                samples.append((index, finished - sent))
+            else:
+                dropped += 1
+            if issued < count:
+                pause = think()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    response_times = [response_time for _, response_time in sorted(samples)]
+    completed = len(response_times)
+    duration = finished - started
+    discarded = truncate(response_times) if truncate is not None else 0
+    steady = response_times[discarded:]
+    ordered = sorted(steady)
+    return ClosedLoopReport(
+        users=users,
+        completed=completed,
+        dropped=dropped,
+        discarded=discarded,
+        duration=duration,
+        throughput=completed / duration if duration > 0 else 0.0,
+        mean_response_ms=sum(steady) / len(steady) * 1000 if steady else 0.0,
+        p99_response_ms=ordered[min(len(steady) - 1, int(0.99 * len(steady)))] * 1000 if steady else 0.0,
+    )
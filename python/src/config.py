@@ -17,7 +17,44 @@ def load_config() -> Dict[str, Any]:
         'mrts_from_model': [405597.23, 203892.96],
         'sdvs_from_model': [1245.97, 613.95],
         'qtd_services': [1, 2, 4],
+        'connection_pooling': True, # Reaproveita conexões entre pedidos (False: uma conexão por pedido)
+        'multiplexing': False, # Vários pedidos em andamento sobre uma única conexão com o load balancer
         'arrival_delay': 0.250, # Tempo de chegada dos clientes em segundos
+        # Processo de chegada: deterministic (a cada arrival_delay), poisson (intervalos exponenciais de média
+        # arrival_delay) ou trace (instantes de chegada lidos de arrival_trace, um por linha, em segundos)
+        'arrival_process': 'deterministic',
+        'arrival_rate': None, # Mensagens por segundo; None usa 1 / arrival_delay
+        'arrival_seed': None, # Semente do processo de Poisson: a mesma sequência de chegadas em todos os ciclos e execuções
+        'arrival_trace': None,
+        # Modo de carga: open (malha aberta, segundo arrival_process), closed (malha fechada: cada um de N clientes
+        # envia, aguarda a resposta, pensa por think_time_ms e repete; uma rodada para cada N em virtual_users por ciclo)
+        # ou saturation (busca da maior taxa sustentável, ver saturation)
+        'load_mode': 'open',
+        'virtual_users': [1, 2, 4, 8, 16],
+        'think_time_ms': 0, # Tempo de pensamento médio dos clientes em malha fechada (0: sem pensamento)
+        'think_time_distribution': 'exponential', # deterministic, exponential, erlang, lognormal ou empirical
+        'think_time_seed': None,
+        # Busca de saturação (load_mode 'saturation'): em cada ciclo, rodadas de max_considered_messages_expected
+        # mensagens em malha aberta com taxas crescentes, até que o tempo de resposta médio, o p99, a fração de
+        # descartes ou a vazão passe do limite (None: limite não verificado); registra a maior vazão sustentável de cada ciclo
+        'saturation': {
+            'search': 'step', # step (start_rate, start_rate + rate_step, ...) ou binary (dobra a taxa e divide o intervalo)
+            'start_rate': 10, # Mensagens por segundo
+            'rate_step': 10,
+            'max_rate': 1000,
+            'resolution': 5, # Largura do intervalo em que a busca binary termina, em mensagens por segundo
+            'max_mrt_ms': 1000,
+            'max_p99_ms': None,
+            'max_drop_rate': 0.01,
+            'min_throughput_ratio': 0.9, # Vazão mínima, como fração da taxa da rodada
+        },
+        # Aquecimento: as primeiras respostas de cada rodada (conexões sendo abertas, caches frios) ficam fora das
+        # mensagens consideradas e dos tempos de resposta; none, fixed (as primeiras warmup_messages respostas, enviadas
+        # além de max_considered_messages_expected) ou mser5 (ponto de truncamento escolhido pela regra MSER-5)
+        'warmup': 'none',
+        'warmup_messages': 0,
+        'max_in_flight': 1000, # Pedidos em andamento no Source ao mesmo tempo; os demais aguardam uma vaga (0: sem limite)
+        'request_timeout': 30, # Prazo de cada pedido do Source, em segundos; sem resposta, conta como descartado (0: sem prazo)
         #'arrival_delay_variation': 0.5, # Variação do tempo de chegada dos clientes em segundo
 
         # Configurações do Load Balancer
@@ -26,15 +63,81 @@ def load_config() -> Dict[str, Any]:
                 'name': 'Server1',
                 'port': 3000,
                 'queue_max_size': 100,
+                # Espera máxima, em segundos, de uma mensagem na fila antes de responder busy (0: sem limite)
+                'queue_timeout': 10.0,
                 'qtd_services': 4,
+                # Política de escolha: round_robin, least_outstanding, power_of_two ou weighted
+                'policy': 'round_robin',
+                # Pesos dos serviços, na ordem da linha de comando (apenas para a política weighted)
+                'weights': None,
+                # Próximo salto de uma cadeia (outros load balancers ou estágios, host:porta),
+                # usado quando a linha de comando não informa os serviços
+                'forward_to': None,
+                # Repassa as mensagens CONFIG ao próximo salto em vez de aplicá-las (load balancer intermediário)
+                'forward_config': False,
             },
             {
                 'name': 'Server2',
                 'port': 3100,
                 'queue_max_size': 100,
+                'queue_timeout': 10.0,
                 'qtd_services': 4,
+                'policy': 'round_robin',
+                'weights': None,
+                'forward_to': None,
+                'forward_config': False,
             }
         ],
+        # Configurações dos Services, pela porta em que escutam
+        # Carga de trabalho de cada atendimento: sleep (espera), cpu (laço calibrado), io (gravação com fsync) ou llm
+        # Distribuição dos tempos de serviço: deterministic, exponential, erlang (erlang_k), lognormal (sdv_ms)
+        # ou empirical (samples_file); seed torna a sequência de tempos reproduzível
+        'services': [
+            # {'port': 3001, 'workload': 'cpu'},
+            # {'port': 3002, 'workload': 'io', 'io_block_kb': 64},
+            # {'port': 3003, 'distribution': 'lognormal', 'sdv_ms': 50, 'seed': 42},
+        ],
+        # Modelo de IA consultado pela carga llm dos Services
+        'llm_base_url': None, # Endereço do serviço de chat-completions (ex.: 'http://mock_llm:8000'); None usa o Groq
+        'llm_model': 'llama-3.3-70b-versatile',
+        # Servidor simulado do modelo de IA (python main.py mock_llm <porta>)
+        'mock_llm': {
+            'latency_ms': 500,
+            # Distribuição das latências: deterministic, exponential, erlang, lognormal (sdv_ms) ou empirical (samples_file)
+            'distribution': 'lognormal',
+            'sdv_ms': 150,
+            'seed': None,
+            'max_concurrency': 0, # Pedidos processados ao mesmo tempo (0: sem limite)
+            'max_rps': 0, # Pedidos iniciados por segundo (0: sem limite)
+        },
         # Endereços dos loadbalancers em formato string, se necessário
         'loadbalancer_addresses': "loadbalance1:3000,loadbalance2:3100",
-    }
\ No newline at end of file
+    }
+
+def get_loadbalancer_config(port: int) -> Dict[str, Any]:
+    """
+    Retorna as configurações do load balancer que escuta na porta informada.
+
+    Args:
+        port (int): Porta do load balancer.
+    Returns:
+        Dict[str, Any]: Configurações do load balancer, ou um dicionário vazio se não houver nenhum na porta.
+    """
+    for loadbalancer in load_config()['loadbalancers']:
+        if loadbalancer['port'] == port:
+            return loadbalancer
+    return {}
+
+def get_service_config(port: int) -> Dict[str, Any]:
+    """
+    Retorna as configurações do serviço que escuta na porta informada.
+
+    Args:
+        port (int): Porta do serviço.
+    Returns:
+        Dict[str, Any]: Configurações do serviço, ou um dicionário vazio se não houver nenhum na porta.
+    """
+    for service in load_config()['services']:
+        if service['port'] == port:
+            return service
+    return {}
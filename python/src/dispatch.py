@@ -0,0 +1,447 @@
+import asyncio
+import random
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+Address = Tuple[str, int]
+
+
+class ServiceState:
+    """
+    Estado de um serviço, mantido localmente pelo LoadBalancer.
+
+    Args:
+        address (Address): Tupla (ip, porta) do serviço.
+        capacity (int): Número máximo de pedidos em andamento que o LoadBalancer envia ao serviço.
+    Returns:
+        None
+
+    Attributes:
+        outstanding (int): Pedidos despachados ao serviço que ainda não foram respondidos.
+        healthy (bool): Se o serviço respondeu à última verificação de saúde.
+        remote_busy (bool): Se o serviço informou estar ocupado na última verificação de saúde.
+    """
+    def __init__(self, address: Address, capacity: int):
+        self.address = address
+        self.capacity = capacity
+        self.outstanding = 0
+        self.healthy = True
+        self.remote_busy = False
+
+    def is_free(self) -> bool:
+        return self.healthy and not self.remote_busy and self.outstanding < self.capacity
+
+    def __repr__(self) -> str:
+        return f"ServiceState({self.address[0]}:{self.address[1]}, outstanding={self.outstanding}/{self.capacity})"
+
+
+class DispatchPolicy:
+    """
+    Interface das políticas de escolha de serviço do LoadBalancer.
+    `select` é sempre chamado pelo `ServiceTracker` com o seu lock adquirido,
+    então as políticas podem manter estado interno sem sincronização própria.
+    """
+    name = ""
+
+    def select(self, states: List[ServiceState]) -> Optional[ServiceState]:
+        """
+        Escolhe um serviço livre.
+
+        Args:
+            states (List[ServiceState]): Serviços conhecidos pelo LoadBalancer, na ordem configurada.
+        Returns:
+            Optional[ServiceState]: O serviço escolhido, ou None se nenhum estiver livre.
+        """
+        raise NotImplementedError
+
+    def accepts(self, addresses: List[Address]) -> bool:
+        """
+        Indica se a política consegue despachar para um novo conjunto de serviços.
+
+        Args:
+            addresses (List[Address]): Endereços (ip, porta) do novo conjunto de serviços.
+        Returns:
+            bool: True se o conjunto pode ser usado com esta política.
+        """
+        return True
+
+
+class RoundRobinPolicy(DispatchPolicy):
+    """
+    Percorre os serviços em ordem circular, pulando os que não estão livres.
+
+    Args:
+        start (int): Posição do primeiro serviço escolhido.
+    Returns:
+        None
+    """
+    name = "round_robin"
+
+    def __init__(self, start: int = 0):
+        self._current = start
+
+    def select(self, states: List[ServiceState]) -> Optional[ServiceState]:
+        count = len(states)
+        for offset in range(count):
+            state = states[(self._current + offset) % count]
+            if state.is_free():
+                self._current = (self._current + offset + 1) % count
+                return state
+        return None
+
+
+class LeastOutstandingPolicy(DispatchPolicy):
+    """
+    Escolhe o serviço livre com menos pedidos em andamento.
+    Em caso de empate, vence o primeiro na ordem configurada.
+    """
+    name = "least_outstanding"
+
+    def select(self, states: List[ServiceState]) -> Optional[ServiceState]:
+        free = [state for state in states if state.is_free()]
+        return min(free, key=lambda state: state.outstanding) if free else None
+
+
+class PowerOfTwoChoicesPolicy(DispatchPolicy):
+    """
+    Sorteia dois serviços livres e escolhe o que tem menos pedidos em andamento.
+    Aproxima o balanceamento do least-outstanding sem depender de uma visão exata de todos os serviços.
+
+    Args:
+        seed (Optional[int]): Semente do gerador de números aleatórios.
+    Returns:
+        None
+    """
+    name = "power_of_two"
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random = random.Random(seed)
+
+    def select(self, states: List[ServiceState]) -> Optional[ServiceState]:
+        free = [state for state in states if state.is_free()]
+        if len(free) < 2:
+            return free[0] if free else None
+        first, second = self._random.sample(free, 2)
+        return first if first.outstanding <= second.outstanding else second
+
+
+class WeightedPolicy(DispatchPolicy):
+    """
+    Round-robin ponderado suave: cada serviço livre recebe uma fração dos pedidos proporcional ao seu peso,
+    com os pedidos de um mesmo serviço intercalados com os dos demais.
+    Os pesos são fixados na criação: um novo conjunto de serviços só é aceito se todos tiverem peso definido.
+
+    Args:
+        weights (Dict[Address, int]): Peso de cada serviço, indexado pelo endereço (ip, porta).
+    Returns:
+        None
+    """
+    name = "weighted"
+
+    def __init__(self, weights: Dict[Address, int]):
+        self.weights = weights
+        self._current_weights: Dict[Address, int] = {}
+
+    def select(self, states: List[ServiceState]) -> Optional[ServiceState]:
+        free = [state for state in states if state.is_free()]
+        if not free:
+            return None
+        total = 0
+        for state in free:
+            weight = self.weights.get(state.address, 1)
+            self._current_weights[state.address] = self._current_weights.get(state.address, 0) + weight
+            total += weight
+        chosen = max(free, key=lambda state: self._current_weights[state.address])
+        self._current_weights[chosen.address] -= total
+        return chosen
+
+    def accepts(self, addresses: List[Address]) -> bool:
+        return all(address in self.weights for address in addresses)
+
+
+POLICIES = {
+    policy.name: policy
+    for policy in (RoundRobinPolicy, LeastOutstandingPolicy, PowerOfTwoChoicesPolicy, WeightedPolicy)
+}
+
+
+def create_policy(name: str, addresses: Optional[List[Address]] = None, weights: Optional[List[int]] = None) -> DispatchPolicy:
+    """
+    Cria uma política de escolha de serviço a partir do seu nome.
+
+    Args:
+        name (str): "round_robin", "least_outstanding", "power_of_two" ou "weighted".
+        addresses (Optional[List[Address]]): Endereços dos serviços, na mesma ordem de `weights`.
+        weights (Optional[List[int]]): Pesos dos serviços, usados apenas pela política "weighted".
+    Returns:
+        DispatchPolicy: A política criada.
+    """
+    if name not in POLICIES:
+        raise ValueError(f"Política desconhecida: {name}. Use {', '.join(POLICIES)}.")
+    if name == WeightedPolicy.name:
+        addresses = addresses or []
+        weights = weights or []
+        if len(weights) != len(addresses):
+            raise ValueError("A política 'weighted' exige um peso para cada serviço.")
+        return WeightedPolicy(dict(zip(addresses, weights)))
+    return POLICIES[name]()
+
+
+class Waiter:
+    """
+    Pedido aguardando na fila do LoadBalancer até que algum serviço fique livre.
+
+    Attributes:
+        queued (bool): Se o pedido foi aceito na fila de espera.
+    """
+    def __init__(self):
+        self.queued = False
+
+    def wake(self, state: ServiceState) -> bool:
+        """
+        Entrega ao pedido o serviço que ficou livre. Chamado pelo `ServiceTracker` com o seu lock adquirido.
+
+        Args:
+            state (ServiceState): Serviço reservado para o pedido.
+        Returns:
+            bool: False se o pedido já desistiu de esperar e o serviço deve ir para o próximo da fila.
+        """
+        raise NotImplementedError
+
+
+class ThreadWaiter(Waiter):
+    """
+    Espera bloqueante, para o LoadBalancer com uma thread por conexão.
+    """
+    def __init__(self):
+        super().__init__()
+        self.state: Optional[ServiceState] = None
+        self._abandoned = False
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+
+    def wake(self, state: ServiceState) -> bool:
+        with self._lock:
+            if self._abandoned:
+                return False
+            self.state = state
+            self._event.set()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[ServiceState]:
+        """
+        Aguarda o serviço reservado para o pedido.
+
+        Args:
+            timeout (Optional[float]): Espera máxima, em segundos; None para nenhum limite.
+        Returns:
+            Optional[ServiceState]: O serviço reservado, ou None se o prazo terminou antes;
+                nesse caso o pedido desiste e um serviço liberado depois vai para o próximo da fila.
+        """
+        if self._event.wait(timeout):
+            return self.state
+        with self._lock:
+            # O serviço pode ter sido entregue entre o fim da espera e a desistência
+            self._abandoned = self.state is None
+            return self.state
+
+
+class AsyncWaiter(Waiter):
+    """
+    Espera assíncrona, para o AsyncLoadBalancer. Deve ser acordada pela thread do event loop.
+
+    Args:
+        future (asyncio.Future): Future que recebe o serviço reservado.
+    Returns:
+        None
+    """
+    def __init__(self, future: asyncio.Future):
+        super().__init__()
+        self.future = future
+
+    def wake(self, state: ServiceState) -> bool:
+        if self.future.done():
+            return False
+        self.future.set_result(state)
+        return True
+
+
+class ServiceTracker:
+    """
+    Acompanha a ocupação dos serviços a partir dos pedidos que o próprio LoadBalancer despachou.
+    A escolha de um serviço livre é feita apenas com o estado local, sem nenhuma troca de mensagens:
+    cada pedido despachado incrementa o contador do serviço e cada resposta o decrementa.
+    A escolha entre os serviços com capacidade disponível é delegada a uma `DispatchPolicy` (round-robin por padrão).
+    Quando nenhum serviço está livre, até `queue_max_size` pedidos aguardam em uma fila FIFO e cada serviço
+    liberado é entregue diretamente ao pedido mais antigo da fila.
+    Todos os métodos são seguros para uso por várias threads.
+    Os contadores de `stats` registram os pedidos despachados, enfileirados, rejeitados, que desistiram da fila
+    por prazo e que falharam.
+
+    Args:
+        addresses (Iterable[Address]): Endereços (ip, porta) dos serviços.
+        capacity (int): Número máximo de pedidos em andamento por serviço.
+        policy (Optional[DispatchPolicy]): Política de escolha de serviço.
+        queue_max_size (int): Número máximo de pedidos aguardando um serviço livre. Se 0, não há espera.
+    Returns:
+        None
+    """
+    def __init__(
+        self,
+        addresses: Iterable[Address],
+        capacity: int = 10,
+        policy: Optional[DispatchPolicy] = None,
+        queue_max_size: int = 0,
+    ):
+        self.capacity = capacity
+        self.policy = policy or RoundRobinPolicy()
+        self.queue_max_size = queue_max_size
+        self.states: List[ServiceState] = [ServiceState(address, capacity) for address in addresses]
+        self._waiters: Deque[Waiter] = deque()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"dispatched": 0, "queued": 0, "rejected": 0, "expired": 0, "failed": 0}
+
+    @property
+    def addresses(self) -> List[Address]:
+        return [state.address for state in self.states]
+
+    def update(self, addresses: Iterable[Address]) -> None:
+        """
+        Substitui o conjunto de serviços, preservando o estado dos serviços que continuam no conjunto.
+
+        Args:
+            addresses (Iterable[Address]): Novos endereços (ip, porta) dos serviços.
+        Returns:
+            None
+        """
+        addresses = list(addresses)
+        with self._lock:
+            if addresses == [state.address for state in self.states]:
+                return
+            current = {state.address: state for state in self.states}
+            self.states = [current.get(address) or ServiceState(address, self.capacity) for address in addresses]
+            self._wake_waiters()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _select(self) -> Optional[ServiceState]:
+        state = self.policy.select(self.states)
+        if state is not None:
+            state.outstanding += 1
+        return state
+
+    def _wake_waiters(self) -> None:
+        # Entrega os serviços livres aos pedidos mais antigos da fila
+        while self._waiters:
+            state = self._select()
+            if state is None:
+                return
+            if self._waiters.popleft().wake(state):
+                self.stats["dispatched"] += 1
+            else:
+                state.outstanding -= 1
+
+    def acquire(self, waiter: Optional[Waiter] = None) -> Optional[ServiceState]:
+        """
+        Escolhe um serviço livre segundo a política e registra um pedido em andamento nele.
+        Se nenhum serviço estiver livre, ou se já houver pedidos esperando, o `waiter` informado entra na fila
+        (marcado com `queued = True`) e recebe o serviço por `Waiter.wake` quando chegar a sua vez.
+        Se a fila estiver cheia, o pedido é rejeitado.
+
+        Args:
+            waiter (Optional[Waiter]): Espera a ser enfileirada caso nenhum serviço esteja livre.
+        Returns:
+            Optional[ServiceState]: O serviço escolhido, ou None se o pedido foi enfileirado ou rejeitado.
+        """
+        with self._lock:
+            if not self._waiters:
+                state = self._select()
+                if state is not None:
+                    self.stats["dispatched"] += 1
+                    return state
+            if waiter is not None and len(self._waiters) < self.queue_max_size:
+                waiter.queued = True
+                self._waiters.append(waiter)
+                self.stats["queued"] += 1
+            else:
+                self.stats["rejected"] += 1
+            return None
+
+    def cancel(self, waiter: Waiter, expired: bool = False) -> None:
+        """
+        Remove da fila um pedido que desistiu de esperar.
+
+        Args:
+            waiter (Waiter): Espera enfileirada por `acquire`.
+            expired (bool): Se o pedido desistiu porque o prazo de espera terminou.
+        Returns:
+            None
+        """
+        with self._lock:
+            if expired:
+                self.stats["expired"] += 1
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self, state: ServiceState, failed: bool = False) -> None:
+        """
+        Registra que um pedido despachado ao serviço foi concluído e entrega a vaga ao próximo pedido da fila.
+
+        Args:
+            state (ServiceState): Serviço retornado por `acquire`.
+            failed (bool): Se o pedido terminou com erro.
+        Returns:
+            None
+        """
+        with self._lock:
+            state.outstanding -= 1
+            if failed:
+                self.stats["failed"] += 1
+            self._wake_waiters()
+
+    def has_capacity(self) -> bool:
+        """
+        Indica se um novo pedido seria aceito, por haver um serviço livre ou vaga na fila de espera.
+
+        Args:
+            None
+        Returns:
+            bool: True se um novo pedido seria aceito.
+        """
+        with self._lock:
+            return any(state.is_free() for state in self.states) or len(self._waiters) < self.queue_max_size
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Retorna uma cópia dos contadores de `stats`.
+
+        Args:
+            None
+        Returns:
+            Dict[str, int]: Os contadores de pedidos.
+        """
+        with self._lock:
+            return dict(self.stats)
+
+    def mark(self, address: Address, healthy: bool, busy: bool = False) -> None:
+        """
+        Atualiza o resultado da verificação de saúde de um serviço.
+
+        Args:
+            address (Address): Endereço (ip, porta) do serviço.
+            healthy (bool): Se o serviço respondeu à verificação.
+            busy (bool): Se o serviço informou estar ocupado.
+        Returns:
+            None
+        """
+        with self._lock:
+            for state in self.states:
+                if state.address == address:
+                    state.healthy = healthy
+                    state.remote_busy = busy
+            self._wake_waiters()
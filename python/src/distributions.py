@@ -0,0 +1,133 @@
+import threading
+from typing import Callable, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Amostras geradas de uma vez a cada reposição do bloco
+BLOCK_SIZE = 65536
+
+DISTRIBUTIONS = ("deterministic", "exponential", "erlang", "lognormal", "empirical")
+
+Seed = Optional[Union[int, Sequence[int]]]
+Sampler = Callable[[np.random.Generator, int], np.ndarray]
+
+
+class ServiceTimeDistribution:
+    """
+    Distribuição de tempos de serviço, em milissegundos, amostrada em blocos.
+    As amostras são geradas de forma vetorizada pelo NumPy, `block_size` de cada vez, e guardadas em uma lista;
+    obter uma amostra durante o atendimento é apenas a leitura da próxima posição. Quando o bloco se esgota,
+    um novo bloco é gerado pelo mesmo gerador, então a sequência de amostras depende apenas da semente.
+    Pode ser usada por vários servidores ao mesmo tempo.
+
+    Args:
+        name (str): Nome da distribuição.
+        sampler (Sampler): Gera um vetor de `n` amostras a partir do gerador.
+        seed (Seed): Semente do gerador (um inteiro ou uma sequência de inteiros); None usa uma semente aleatória.
+        block_size (int): Número de amostras geradas a cada reposição.
+    Returns:
+        None
+    """
+    def __init__(self, name: str, sampler: Sampler, seed: Seed = None, block_size: int = BLOCK_SIZE):
+        self.name = name
+        self.sampler = sampler
+        self.block_size = block_size
+        self.rng = np.random.default_rng(seed)
+        self._block: List[float] = []
+        self._index = 0
+        self._lock = threading.Lock()
+        self._refill()
+
+    def _refill(self) -> None:
+        # Tempos de serviço negativos não fazem sentido (apenas a distribuição empírica poderia produzi-los)
+        self._block = np.maximum(self.sampler(self.rng, self.block_size), 0.0).tolist()
+        self._index = 0
+
+    def sample(self) -> float:
+        """
+        Retorna o próximo tempo de serviço.
+
+        Args:
+            None
+        Returns:
+            float: O tempo de serviço em milissegundos.
+        """
+        with self._lock:
+            if self._index >= len(self._block):
+                self._refill()
+            value = self._block[self._index]
+            self._index += 1
+            return value
+
+
+def lognormal_params(mean_ms: float, sdv_ms: float) -> tuple:
+    """
+    Converte a média e o desvio padrão desejados nos parâmetros da normal subjacente da log-normal.
+
+    Args:
+        mean_ms (float): Média do tempo de serviço.
+        sdv_ms (float): Desvio padrão do tempo de serviço.
+    Returns:
+        tuple: (mu, sigma) da normal subjacente.
+    """
+    sigma2 = np.log1p((sdv_ms / mean_ms) ** 2)
+    return np.log(mean_ms) - sigma2 / 2, np.sqrt(sigma2)
+
+
+def load_samples(path: str) -> np.ndarray:
+    """
+    Lê tempos de serviço medidos, em milissegundos, de um arquivo com um valor por linha.
+
+    Args:
+        path (str): Caminho do arquivo.
+    Returns:
+        np.ndarray: Os valores lidos.
+    """
+    values = np.loadtxt(path, dtype=float, ndmin=1)
+    if values.size == 0:
+        raise ValueError(f"Arquivo de amostras vazio: {path}")
+    return values
+
+
+def create_distribution(
+    name: str,
+    mean_ms: float,
+    seed: Seed = None,
+    sdv_ms: Optional[float] = None,
+    erlang_k: int = 2,
+    samples_file: Optional[str] = None,
+    block_size: int = BLOCK_SIZE,
+) -> ServiceTimeDistribution:
+    """
+    Cria uma distribuição de tempos de serviço pelo nome.
+
+    Args:
+        name (str): deterministic, exponential, erlang, lognormal ou empirical.
+        mean_ms (float): Média do tempo de serviço (ignorada pela distribuição empírica).
+        seed (Seed): Semente do gerador; None usa uma semente aleatória.
+        sdv_ms (Optional[float]): Desvio padrão da log-normal (padrão: igual à média).
+        erlang_k (int): Número de fases da Erlang; o desvio padrão é mean_ms / sqrt(k).
+        samples_file (Optional[str]): Arquivo com os tempos medidos, para a distribuição empírica.
+        block_size (int): Número de amostras geradas a cada reposição.
+    Returns:
+        ServiceTimeDistribution: A distribuição.
+    """
+    if name == "deterministic":
+        sampler: Sampler = lambda rng, n: np.full(n, float(mean_ms))
+    elif name == "exponential":
+        sampler = lambda rng, n: rng.exponential(mean_ms, n)
+    elif name == "erlang":
+        if erlang_k < 1:
+            raise ValueError("erlang_k deve ser pelo menos 1.")
+        sampler = lambda rng, n: rng.gamma(erlang_k, mean_ms / erlang_k, n)
+    elif name == "lognormal":
+        mu, sigma = lognormal_params(mean_ms, mean_ms if sdv_ms is None else sdv_ms)
+        sampler = lambda rng, n: rng.lognormal(mu, sigma, n)
+    elif name == "empirical":
+        if samples_file is None:
+            raise ValueError("A distribuição empírica exige um arquivo de amostras.")
+        values = load_samples(samples_file)
+        sampler = lambda rng, n: rng.choice(values, n)
+    else:
+        raise ValueError(f"Distribuição desconhecida: {name}. Use {', '.join(DISTRIBUTIONS)}.")
+    return ServiceTimeDistribution(name, sampler, seed=seed, block_size=block_size)
@@ -1,27 +1,259 @@
-from decouple import config
-from groq import Groq
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
 
-GROQ_API_KEY = config("GROQ_API_KEY", default=None)
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
 
-class IAService:
-    
+# groq, decouple and sqlite3 are imported where they are used: importing this module
+# must stay cheap, since only the llm workload of a Service talks to the model.
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller runs the function
+    and the callers that arrive while it is running wait for its result instead of repeating the call.
+    """
     def __init__(self):
-        self.client = Groq(api_key=GROQ_API_KEY)
-        
-    
+        self.coalesced = 0
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], str]) -> str:
+        """
+        Run `fn` for `key`, or wait for the run already in flight for the same key.
+
+        Args:
+            key (str): The key that identifies the call.
+            fn (Callable[[], str]): The call.
+
+        Returns:
+            str: The result of the call.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value = fn()
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class ResponseCache:
+    """
+    Cache of model responses keyed by prompt.
+
+    Entries live in an in-memory LRU bounded by `max_entries` and expire after `ttl` seconds.
+    When `path` is given, responses are also stored in a SQLite database, so Service processes
+    on the same host share what any of them already asked.
+    Concurrent misses for the same prompt are collapsed into a single computation (`SingleFlight`).
+
+    Args:
+        max_entries (int): Maximum number of entries kept in memory.
+        ttl (float): Time to live of an entry, in seconds.
+        path (Optional[str]): Path of the shared on-disk cache, or None to keep it in memory only.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.stats: Dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0}
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        if path is not None:
+            import sqlite3
+
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (prompt TEXT PRIMARY KEY, response TEXT, created REAL)"
+            )
+            self._db.commit()
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, value = entry
+        if now - created > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_memory(self, key: str, value: str, created: float) -> None:
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_disk(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created, response FROM responses WHERE prompt = ? AND created >= ?", (key, now - self.ttl)
+            ).fetchone()
+        return row
+
+    def _put_disk(self, key: str, value: str, created: float) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (prompt, response, created) VALUES (?, ?, ?)", (key, value, created)
+            )
+            self._db.commit()
+
+    def get_or_compute(self, key: str, compute: Callable[[str], str]) -> str:
+        """
+        Return the cached response for `key`, computing and storing it on a miss.
+
+        Args:
+            key (str): The prompt.
+            compute (Callable[[str], str]): Function that produces the response for the prompt.
+
+        Returns:
+            str: The response.
+        """
+        with self._lock:
+            value = self._get_memory(key, time.time())
+            if value is not None:
+                self.stats["hits"] += 1
+                return value
+        return self._flights.do(key, lambda: self._load(key, compute))
+
+    def _load(self, key: str, compute: Callable[[str], str]) -> str:
+        now = time.time()
+        with self._lock:
+            # The previous flight may have stored the entry after our lookup
+            value = self._get_memory(key, now)
+            if value is not None:
+                self.stats["hits"] += 1
+                return value
+        row = self._get_disk(key, now)
+        if row is not None:
+            created, value = row
+            hit = "disk_hits"
+        else:
+            value = compute(key)
+            created = time.time()
+            self._put_disk(key, value, created)
+            hit = "misses"
+        with self._lock:
+            self.stats[hit] += 1
+            self._put_memory(key, value, created)
+        return value
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Return a copy of the hit/miss counters.
+
+        Returns:
+            Dict[str, int]: hits, disk_hits, misses and coalesced.
+        """
+        with self._lock:
+            return dict(self.stats, coalesced=self._flights.coalesced)
+
+
+class IAService:
+    """
+    Client of the IA model. The Groq client, and its dependencies, are loaded when the service is created.
+
+    A single client, and so a single pool of HTTP connections, is shared by all the threads of the service.
+    Concurrent requests for the same prompt share one model call (through the cache, when there is one),
+    and at most `max_concurrency` calls are in flight at once; the others wait for a free slot.
+
+    Args:
+        cache (Optional[ResponseCache]): Cache of responses; None asks the model every time.
+        base_url (Optional[str]): Address of the chat-completions endpoint, such as a local MockLLMServer;
+            None uses the Groq API. A local endpoint does not need GROQ_API_KEY.
+        model (str): Model asked by every call.
+        max_concurrency (int): Maximum number of model calls in flight; 0 for no limit.
+    """
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        base_url: Optional[str] = None,
+        model: str = DEFAULT_MODEL,
+        max_concurrency: int = 0,
+    ):
+        from decouple import config
+        from groq import Groq
+
+        api_key = config("GROQ_API_KEY", default=None)
+        if api_key is None and base_url is not None:
+            api_key = "local"
+        self.client = Groq(api_key=api_key, base_url=base_url)
+        self.model = model
+        self.cache = cache
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+
     def ask(self, prompt: str) -> str:
         """
-        Ask a question to the IA model and get the response.
-        
+        Ask a question to the IA model and get the response, using the cache when there is one.
+
         Args:
             prompt (str): The question to ask.
-        
+
         Returns:
             str: The response from the IA model.
         """
+        if self.cache is not None:
+            return self.cache.get_or_compute(prompt, self.ask_model)
+        return self._flights.do(prompt, lambda: self.ask_model(prompt))
+
+    def ask_model(self, prompt: str) -> str:
+        """
+        Ask a question to the IA model, bypassing the cache.
+
+        Args:
+            prompt (str): The question to ask.
+
+        Returns:
+            str: The response from the IA model.
+        """
+        if self._slots is None:
+            return self._complete(prompt)
+        with self._slots:
+            return self._complete(prompt)
+
+    def _complete(self, prompt: str) -> str:
+        with self._calls_lock:
+            self.calls += 1
         chat = self.client.chat.completions.create(
-            model="llama-3.3-70b-versatile", 
+            model=self.model,
             messages=[{"role": "user", "content": prompt}]
         )
-        
-        return chat.choices[0].message.content.strip().replace('*', '')
\ No newline at end of file
+
+        return chat.choices[0].message.content.strip().replace('*', '')
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Return the number of model calls made and of requests that joined a call already in flight.
+
+        Returns:
+            Dict[str, int]: calls and coalesced.
+        """
+        return {"calls": self.calls, "coalesced": self._flights.coalesced}
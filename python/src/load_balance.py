@@ -1,31 +1,119 @@
-import socket
 import threading
-from typing import List
+import time
+from typing import List, Optional
 
 from src.abstract_proxy import AbstractProxy
+from src.batching import BatchSender
+from src.dispatch import ServiceTracker, ThreadWaiter, create_policy
+from src.logger import WARNING
+from src.protocol import Frame, MessageType, decode_batch, encode_batch
 from src.utils import add_timestamp_to_message
 
+# Espera máxima padrão, em segundos, de uma mensagem na fila do LoadBalancer
+QUEUE_TIMEOUT = 10.0
+
+class Topologies(dict):
+    """
+    Configurações de serviços registradas, indexadas pela época.
+
+    Args:
+        None
+    Returns:
+        None
+    """
+    def discard_before(self, epoch: int) -> None:
+        """
+        Descarta as configurações de épocas anteriores à época ativada.
+
+        Args:
+            epoch (int): Época ativada.
+        Returns:
+            None
+        """
+        for old in [old for old in self if old < epoch]:
+            del self[old]
+
+
 class LoadBalancer(AbstractProxy):
     """
     Classe LoadBalancer que implementa um balanceador de carga simples.
     O LoadBalancer escuta em uma porta especificada e aceita conexões de clientes.
     Quando um cliente se conecta, cria uma nova thread para lidar com a conexão.
-    O LoadBalancer distribui as mensagens recebidas entre os serviços disponíveis de forma round-robin.
+    O LoadBalancer distribui as mensagens recebidas entre os serviços disponíveis segundo uma política de escolha:
+    round-robin (padrão), menos pedidos em andamento, duas escolhas aleatórias ou pesos estáticos.
+    A ocupação de cada serviço é acompanhada localmente, contando os pedidos despachados e ainda não respondidos,
+    então a escolha de um serviço livre não exige nenhuma consulta ao serviço.
     Se um serviço estiver ocupado, o LoadBalancer tenta o próximo serviço na lista.
-    Se não houver serviços disponíveis, responde com "busy".
+    Se não houver serviços disponíveis, a mensagem aguarda em uma fila FIFO de até `queue_max_size` mensagens
+    e é despachada assim que um serviço ficar livre; o LoadBalancer responde "busy" quando a fila está cheia
+    ou quando a mensagem passa `queue_timeout` segundos na fila sem que nenhum serviço fique livre.
+    Opcionalmente, uma verificação de saúde periódica envia PING aos serviços em segundo plano
+    e deixa de despachar para os que não respondem ou se declaram ocupados.
+    O conjunto de serviços pode ser trocado por mensagens CONFIG versionadas por uma época: cada configuração
+    fica guardada pela sua época e passa a valer quando chega a primeira mensagem de dados com essa época,
+    sem nenhum custo adicional para as mensagens seguintes.
+    O destino de um LoadBalancer pode ser outro LoadBalancer (ou um estágio de serviço), formando cadeias:
+    o LoadBalancer responde a PING conforme a sua própria capacidade, cada salto adiciona os seus timestamps
+    de chegada e de despacho e, com `forward_config`, as mensagens CONFIG são repassadas aos próximos saltos
+    em vez de alterar o conjunto de destinos, chegando assim ao último LoadBalancer da cadeia.
+    Opcionalmente, as mensagens despachadas a um mesmo serviço são agrupadas em lotes (mensagens BATCH)
+    de até `batch_size` mensagens, esperando no máximo `batch_linger_us` microssegundos pelo lote encher.
 
     Args:
         listen_port (int): A porta na qual o LoadBalancer irá escutar.
         service_addresses (List[tuple]): Lista de tuplas contendo endereços IP e portas dos serviços disponíveis.
         Cada tupla deve ser no formato (ip, port).
+        pooling (bool): Se True, reaproveita as conexões com os serviços entre pedidos.
+        multiplexing (bool): Se True, envia os pedidos a cada serviço por uma única conexão multiplexada.
+        service_capacity (int): Número máximo de pedidos em andamento por serviço.
+        probe_interval (float): Intervalo, em segundos, da verificação de saúde. Se 0, ela é desativada.
+        policy (str): Política de escolha: "round_robin", "least_outstanding", "power_of_two" ou "weighted".
+        weights (Optional[List[int]]): Pesos dos serviços, na ordem de `service_addresses`, para a política "weighted".
+        queue_max_size (int): Número máximo de mensagens aguardando um serviço livre. Se 0, responde "busy" imediatamente.
+        queue_timeout (float): Espera máxima, em segundos, de uma mensagem na fila; ao terminar, responde "busy".
+            Se 0, a espera não tem limite.
+        batch_size (int): Número máximo de mensagens por lote enviado a um serviço. Se 1, não há agrupamento.
+        batch_linger_us (int): Tempo máximo, em microssegundos, que uma mensagem aguarda o seu lote encher.
+        forward_config (bool): Se True, repassa as mensagens CONFIG aos destinos em vez de aplicá-las.
     Returns:
         None
     """
-    def __init__(self, listen_port: int, service_addresses: List[tuple]):
-        super().__init__()
+    def __init__(
+        self,
+        listen_port: int,
+        service_addresses: List[tuple],
+        pooling: bool = True,
+        multiplexing: bool = False,
+        service_capacity: int = 10,
+        probe_interval: float = 0,
+        policy: str = "round_robin",
+        weights: Optional[List[int]] = None,
+        queue_max_size: int = 0,
+        queue_timeout: float = QUEUE_TIMEOUT,
+        batch_size: int = 1,
+        batch_linger_us: int = 200,
+        forward_config: bool = False,
+    ):
+        super().__init__(pooling=pooling, multiplexing=multiplexing)
         self.listen_port = listen_port
         self.service_addresses = service_addresses
-        self.current = 0
+        self.epoch = 0
+        self.topologies = Topologies()
+        self._topology_lock = threading.Lock()
+        self.tracker = ServiceTracker(
+            service_addresses,
+            capacity=service_capacity,
+            policy=create_policy(policy, service_addresses, weights),
+            queue_max_size=queue_max_size,
+        )
+        self.queue_timeout = queue_timeout
+        self.probe_interval = probe_interval
+        self.batch_size = batch_size
+        self.batch_linger_us = batch_linger_us
+        self.batcher = BatchSender(self.send_batch, batch_size, batch_linger_us) if batch_size > 1 else None
+        self.forward_config = forward_config
+        # Habilitado quando vários processos do LoadBalancer escutam na mesma porta
+        self.reuse_port = False
 
     def start(self):
         """
@@ -41,88 +129,226 @@ class LoadBalancer(AbstractProxy):
         Returns:
             None
         """
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.bind(('0.0.0.0', self.listen_port))
-        server.listen()
-        self.sys_log(f"LoadBalancer listening on port {self.listen_port}")
+        server = self.listen(self.listen_port, self.reuse_port)
+        self.sys_log(f"LoadBalancer listening on port {self.listen_port} with policy {self.tracker.policy.name}")
+        if self.probe_interval > 0:
+            threading.Thread(target=self.probe_loop, daemon=True).start()
         while True:
             client_sock, _ = server.accept()
-            threading.Thread(target=self.handle_client, args=(client_sock,)).start()
+            # Daemon: uma conexão persistente ociosa não pode impedir o encerramento no SIGTERM
+            threading.Thread(target=self.handle_client, args=(client_sock,), daemon=True).start()
 
-    def handle_client(self, client_sock: socket.socket):
+    def handle_message(self, frame: Frame) -> str:
         """
-        Método para lidar com a conexão de um cliente.
-        Recebe uma mensagem do cliente, verifica se é uma configuração de serviços.
-        Se for, atualiza a lista de endereços dos serviços.
-        Se não for, adiciona um timestamp à mensagem e tenta enviar para um serviço livre.
-        Se um serviço estiver ocupado, tenta o próximo serviço na lista.
-        Se não houver serviços disponíveis, responde com "busy".
+        Trata uma mensagem recebida de um cliente e retorna a resposta a ser enviada.
+        Verifica se é uma configuração de serviços (mensagem CONFIG).
+        Se for, registra a configuração e responde com a confirmação (ou a repassa aos destinos, com `forward_config`).
+        Mensagens PING são respondidas com "free" ou "busy" conforme a capacidade do próprio LoadBalancer,
+        e as mensagens de um BATCH são tratadas individualmente.
+        Se não for, ativa a configuração da época indicada na mensagem, caso seja mais nova que a atual
+        (exceto com `forward_config`, em que a época é apenas repassada aos destinos), e adiciona o timestamp de chegada à mensagem e a envia para o próximo serviço livre segundo o estado local.
+        Se não houver serviços disponíveis, a mensagem aguarda na fila; se a fila estiver cheia, responde com "busy".
+        Ao sair da fila, a mensagem recebe o timestamp de despacho, separando a espera no LoadBalancer do tempo de serviço.
 
         Args:
-            client_sock (socket.socket): O socket do cliente conectado.
+            frame (Frame): A mensagem recebida.
         Returns:
-            None
+            str: A resposta para o cliente.
         """
+        data = frame.payload
+        if frame.kind == MessageType.CONFIG:
+            if self.forward_config:
+                return self.forward_configuration(data)
+            return self.configure(data)
+        if frame.kind == MessageType.PING:
+            return "free" if self.tracker.has_capacity() else "busy"
+        if frame.kind == MessageType.BATCH:
+            return self.handle_batch(frame)
+        # Com `forward_config`, as configurações valem para os próximos saltos, que recebem a época da mensagem
+        if frame.epoch > self.epoch and not self.forward_config:
+            self.activate(frame.epoch)
+
+        # Adiciona timestamp de chegada à mensagem
+        data = add_timestamp_to_message(data)
+
+        # Escolhe um service livre, segundo a política, a partir do estado local
+        waiter = ThreadWaiter()
+        state = self.tracker.acquire(waiter)
+        if state is None:
+            if not waiter.queued:
+                # Nenhum service está livre e a fila está cheia
+                return "busy"
+            state = waiter.wait(self.queue_timeout or None)
+            if state is None:
+                # Nenhum serviço ficou livre no prazo, por exemplo com todos marcados como indisponíveis
+                self.tracker.cancel(waiter, expired=True)
+                return "busy"
+
+        # Adiciona timestamp de despacho (saída da fila) à mensagem
+        data = add_timestamp_to_message(data)
+        failed = False
         try:
-            data = client_sock.recv(1024).decode()
-            # TODO: SE EU DESCOMENTAR ESTA LINHA, O SERVIÇO DE ORIGEM NÃO CONSEGUE ENVIAR MENSAGENS
-            if data.startswith("config;"):
-                # Exemplo: config;localhost:3000,localhost:3001
-                self.sys_log(f"CONFIGURAÇÃO RECEBIDA: {data}")
-                services = data.split(";")[1].split(",")
-                self.service_addresses = [(addr.split(":")[0], int(addr.split(":")[1])) for addr in services]
-                self.sys_log(f"Updated service addresses: {self.service_addresses}")
-                client_sock.sendall("ok".encode())
-                client_sock.close()
-                return
-            
-            # Adiciona timestamp de chegada à mensagem
-            data = add_timestamp_to_message(data)
-
-            # Tenta encontrar um service livre (round-robin)
-            for _ in range(len(self.service_addresses)):
-                ip, port = self.service_addresses[self.current]
-                self.current = (self.current + 1) % len(self.service_addresses)
-                # Verifica se o service está livre
-                if self.is_service_free(ip, port):
-
-                    # Envia a mensagem para o service
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                        s.connect((ip, port))
-                        s.sendall(data.encode())
-                        response = s.recv(1024)
-                    # Adiciona o timestamp de envio à mensagem
-                    data = add_timestamp_to_message(data)
-                    client_sock.sendall(response)
-                    break
-            else:
-                # Nenhum service está livre
-                client_sock.sendall("busy".encode())
-        except Exception as e:
-            print(f"Erro no LoadBalancer: {e}")
+            # Envia a mensagem para o service, sozinha ou no próximo lote
+            if self.batcher is not None:
+                return self.batcher.submit(state.address, data, frame.epoch)
+            return self.request(*state.address, data, epoch=frame.epoch)
+        except Exception:
+            failed = True
+            if self.probe_interval > 0:
+                # A verificação de saúde volta a habilitar o serviço quando ele responder
+                self.tracker.mark(state.address, healthy=False)
+            raise
         finally:
-            client_sock.close()
+            self.tracker.release(state, failed)
+
+    def handle_batch(self, frame: Frame) -> str:
+        """
+        Trata as mensagens de um BATCH recebido de um LoadBalancer anterior na cadeia.
+        Cada mensagem é despachada individualmente, em paralelo, e as respostas são agrupadas na mesma ordem.
+
+        Args:
+            frame (Frame): O lote recebido.
+        Returns:
+            str: As respostas agrupadas.
+        """
+        messages = decode_batch(frame.payload)
+        replies = ["error"] * len(messages)
+
+        def dispatch(index: int, data: str):
+            try:
+                replies[index] = self.handle_message(Frame(MessageType.DATA, data, epoch=frame.epoch))
+            except Exception as e:
+                print(f"Erro no LoadBalancer: {e}")
 
+        threads = [threading.Thread(target=dispatch, args=item) for item in enumerate(messages)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return encode_batch(replies)
 
-    def is_service_free(self, ip:str, port:int) -> bool:
+    def send_batch(self, address: tuple, payload: str, epoch: int = 0) -> str:
         """
-        Verifica se um serviço está livre enviando uma mensagem "ping".
-        Se o serviço responder com "free", considera-o livre.
-        
+        Envia um lote de mensagens a um serviço e aguarda as respostas agrupadas.
+
         Args:
-            ip (str): Endereço IP do serviço.
-            port (int): Porta do serviço.
+            address (tuple): Endereço (ip, porta) do serviço.
+            payload (str): As mensagens agrupadas.
+            epoch (int): Época da configuração de serviços do lote.
         Returns:
-            bool: True se o serviço estiver livre, False caso contrário.
+            str: As respostas agrupadas, na mesma ordem.
         """
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((ip, port))
-                s.sendall("ping".encode())
-                status = s.recv(1024).decode()
-                return status == "free"
-        except Exception:
-            return False
+        return self.request(*address, payload, MessageType.BATCH, epoch)
+
+    def forward_configuration(self, data: str) -> str:
+        """
+        Repassa uma mensagem CONFIG a todos os destinos, para que ela chegue ao último LoadBalancer da cadeia.
+
+        Args:
+            data (str): O conteúdo da mensagem CONFIG.
+        Returns:
+            str: A confirmação comum dos destinos, ou "error" se eles responderem de formas diferentes.
+        """
+        responses = {self.request(ip, port, data, MessageType.CONFIG) for ip, port in self.tracker.addresses}
+        return responses.pop() if len(responses) == 1 else "error"
+
+    def configure(self, data: str) -> str:
+        """
+        Trata uma mensagem CONFIG com a lista de endereços dos serviços.
+        Com época (`época;endereços`), a configuração é apenas registrada e passa a valer quando chegar
+        a primeira mensagem de dados com essa época; repetir a mesma configuração não tem efeito.
+        Uma época menor que a ativa indica que o Source foi reiniciado: as configurações registradas são descartadas.
+        Sem época, a configuração é aplicada imediatamente; com vários processos na mesma porta (`reuse_port`),
+        ela só chegaria ao processo escolhido pelo kernel e, por isso, é recusada.
+        Também é recusada a configuração que a política de escolha não consegue usar, como a política "weighted"
+        com um serviço sem peso definido.
+
+        Args:
+            data (str): Época opcional e endereços no formato host:porta separados por vírgula.
+                Exemplo: 3;localhost:3000,localhost:3001
+        Returns:
+            str: "ok;<época>" para uma configuração com época, "ok" para uma configuração sem época
+                e "error" para uma configuração recusada.
+        """
+        epoch, separator, services = data.rpartition(";")
+        addresses = [(addr.split(":")[0], int(addr.split(":")[1])) for addr in services.split(",")]
+        if not self.tracker.policy.accepts(addresses):
+            self.sys_log(f"Config rejected by policy {self.tracker.policy.name}: {services}", WARNING)
+            return "error"
+        if not separator:
+            if self.reuse_port:
+                self.sys_log(f"Config without epoch rejected by a multi-worker LoadBalancer: {services}", WARNING)
+                return "error"
+            self.sys_log(f"CONFIGURAÇÃO RECEBIDA: {services}")
+            with self._topology_lock:
+                self.apply(addresses)
+            return "ok"
+
+        epoch = int(epoch)
+        with self._topology_lock:
+            if self.topologies.get(epoch) == addresses:
+                return f"ok;{epoch}"
+            if epoch < self.epoch:
+                self.sys_log(f"Config epoch {epoch} is older than active epoch {self.epoch}: resetting")
+                self.topologies.clear()
+                self.epoch = 0
+            self.topologies[epoch] = addresses
+            if epoch == self.epoch:
+                self.apply(addresses)
+        self.sys_log(f"CONFIGURAÇÃO RECEBIDA (época {epoch}): {services}")
+        return f"ok;{epoch}"
+
+    def activate(self, epoch: int) -> None:
+        """
+        Ativa a configuração de serviços registrada para a época informada, se ela for mais nova que a ativa.
+        As configurações de épocas anteriores são descartadas.
+
+        Args:
+            epoch (int): Época indicada em uma mensagem de dados.
+        Returns:
+            None
+        """
+        with self._topology_lock:
+            if epoch <= self.epoch:
+                return
+            addresses = self.topologies.get(epoch)
+            if addresses is None:
+                self.sys_log(f"Unknown config epoch {epoch}, keeping epoch {self.epoch}", WARNING)
+                return
+            self.apply(addresses)
+            self.epoch = epoch
+            self.topologies.discard_before(epoch)
+        self.sys_log(f"Activated config epoch {epoch}: {addresses}")
+
+    def apply(self, addresses: List[tuple]) -> None:
+        """
+        Troca o conjunto de serviços usado no despacho. Chamado com `_topology_lock` adquirido.
+
+        Args:
+            addresses (List[tuple]): Endereços (ip, porta) dos serviços.
+        Returns:
+            None
+        """
+        self.service_addresses = addresses
+        self.tracker.update(addresses)
+
+    def probe_loop(self):
+        """
+        Executa a verificação de saúde dos serviços a cada `probe_interval` segundos.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        while True:
+            for ip, port in self.tracker.addresses:
+                try:
+                    status = self.request(ip, port, "", MessageType.PING)
+                    self.tracker.mark((ip, port), healthy=True, busy=status == "busy")
+                except Exception:
+                    self.tracker.mark((ip, port), healthy=False)
+            time.sleep(self.probe_interval)
 
 if __name__ == "__main__":
     service_addresses = [("localhost", 3001), ("localhost", 3002)]
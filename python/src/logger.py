@@ -0,0 +1,221 @@
+import atexit
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVELS = {
+    "debug": DEBUG,
+    "info": INFO,
+    "warning": WARNING,
+    "error": ERROR,
+}
+
+_level = LEVELS.get(os.environ.get("LOG_LEVEL", "info").lower(), INFO)
+_writers: Dict[str, "BufferedLogWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+def parse_level(name: str) -> int:
+    """
+    Converte o nome de um nível de log no valor numérico correspondente.
+
+    Args:
+        name (str): Nome do nível: "debug", "info", "warning" ou "error".
+    Returns:
+        int: O nível numérico.
+    """
+    try:
+        return LEVELS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Nível de log desconhecido: {name}. Use {', '.join(LEVELS)}.") from None
+
+
+def set_log_level(level: int) -> None:
+    """
+    Define o nível mínimo das mensagens registradas por todos os proxies do processo.
+
+    Args:
+        level (int): Nível mínimo, por exemplo `DEBUG` ou `INFO`.
+    Returns:
+        None
+    """
+    global _level
+    _level = level
+
+
+def log_enabled(level: int) -> bool:
+    """
+    Indica se mensagens do nível informado serão registradas.
+    Permite que o caminho crítico evite até a formatação de mensagens que seriam descartadas.
+
+    Args:
+        level (int): Nível da mensagem.
+    Returns:
+        bool: True se a mensagem deve ser registrada.
+    """
+    return level >= _level
+
+
+class BufferedLogWriter:
+    """
+    Escritor de arquivo de log com buffer em memória e uma thread dedicada à escrita.
+    As linhas são acumuladas em um buffer circular de capacidade fixa e gravadas em lote pela thread
+    de escrita sempre que o lote atinge `flush_size` linhas ou a cada `flush_interval` segundos.
+    Nenhuma linha é descartada: se o buffer estiver cheio, quem escreve aguarda a próxima gravação.
+    O arquivo permanece aberto enquanto o escritor existir.
+
+    Args:
+        path (str): Caminho do arquivo de log.
+        capacity (int): Número máximo de linhas mantidas no buffer.
+        flush_size (int): Número de linhas que dispara uma gravação imediata.
+        flush_interval (float): Intervalo máximo, em segundos, entre gravações.
+    Returns:
+        None
+    """
+    def __init__(self, path: str, capacity: int = 65536, flush_size: int = 512, flush_interval: float = 0.5):
+        self.path = path
+        self.capacity = capacity
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[str] = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._file = open(path, 'a')
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"log-writer:{path}", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> None:
+        """
+        Acrescenta uma linha ao buffer. Não faz chamadas de sistema no caminho comum.
+
+        Args:
+            line (str): Linha a ser registrada, sem a quebra de linha final.
+        Returns:
+            None
+        """
+        with self._cond:
+            while len(self._buffer) >= self.capacity and not self._closed:
+                self._cond.notify_all()
+                self._cond.wait()
+            self._buffer.append(line)
+            if len(self._buffer) >= self.flush_size:
+                self._cond.notify_all()
+
+    def _drain(self) -> None:
+        # O lote é retirado e gravado sob o mesmo lock, preservando a ordem das linhas
+        with self._write_lock:
+            with self._cond:
+                batch = list(self._buffer)
+                self._buffer.clear()
+                self._cond.notify_all()
+            if batch and not self._file.closed:
+                self._file.write("\n".join(batch) + "\n")
+                self._file.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._buffer) >= self.flush_size or self._closed,
+                    timeout=self.flush_interval,
+                )
+                closed = self._closed
+            self._drain()
+            if closed:
+                return
+
+    def flush(self) -> None:
+        """
+        Grava imediatamente todas as linhas pendentes no arquivo.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        self._drain()
+
+    def truncate(self) -> None:
+        """
+        Descarta as linhas pendentes e limpa o conteúdo do arquivo.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self._write_lock:
+            with self._cond:
+                self._buffer.clear()
+                self._cond.notify_all()
+            self._file.seek(0)
+            self._file.truncate()
+
+    def close(self) -> None:
+        """
+        Grava as linhas pendentes, encerra a thread de escrita e fecha o arquivo.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._drain()
+        self._file.close()
+
+
+def get_writer(path: str) -> BufferedLogWriter:
+    """
+    Retorna o escritor do arquivo informado, criando-o na primeira chamada.
+    Todos os proxies do processo que usam o mesmo arquivo compartilham um único escritor.
+
+    Args:
+        path (str): Caminho do arquivo de log.
+    Returns:
+        BufferedLogWriter: O escritor do arquivo.
+    """
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = BufferedLogWriter(path)
+            _writers[path] = writer
+        return writer
+
+
+def _reset_writers() -> None:
+    # Após um fork, as threads de escrita herdadas não existem no processo filho:
+    # o filho descarta os escritores herdados e cria os seus na primeira escrita
+    global _writers_lock
+    _writers.clear()
+    _writers_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_writers)
+
+
+@atexit.register
+def close_writers() -> None:
+    """
+    Grava as linhas pendentes e fecha todos os escritores. Executada ao final do processo.
+
+    Args:
+        None
+    Returns:
+        None
+    """
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
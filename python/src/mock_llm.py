@@ -0,0 +1,220 @@
+import asyncio
+import itertools
+import json
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from src.abstract_proxy import AbstractProxy
+
+if TYPE_CHECKING:
+    from src.distributions import ServiceTimeDistribution
+
+# Caminho usado pelo cliente do Groq para a API de chat-completions, relativo à base_url
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+# Tamanho máximo aceito para o corpo de um pedido
+MAX_BODY = 1024 * 1024
+
+
+class MockLLMServer(AbstractProxy):
+    """
+    Servidor HTTP local que substitui o modelo de IA em testes e experimentos sem rede.
+    Responde à mesma API de chat-completions usada pelo cliente do Groq, com uma resposta fixa,
+    depois de uma latência de `latency_ms` milissegundos ou amostrada de `distribution`.
+    A vazão pode ser limitada como a de um provedor real: no máximo `max_concurrency` pedidos são processados
+    ao mesmo tempo (os demais aguardam a sua vez) e no máximo `max_rps` pedidos começam a ser processados por segundo.
+    As conexões são persistentes (keep-alive), como as do cliente HTTP do Groq,
+    e os pedidos são atendidos de forma concorrente por um event loop.
+    Para usá-lo, o Service recebe a base_url `http://host:porta`.
+
+    Args:
+        listen_port (int): A porta na qual o servidor irá escutar.
+        latency_ms (float): Tempo de resposta de cada pedido, em milissegundos, sem uma distribuição.
+        distribution (Optional[ServiceTimeDistribution]): Distribuição das latências, em milissegundos.
+        max_concurrency (int): Pedidos processados ao mesmo tempo; 0 para nenhum limite.
+        max_rps (float): Pedidos iniciados por segundo; 0 para nenhum limite.
+        reply (str): Conteúdo das respostas.
+    Returns:
+        None
+
+    Attributes:
+        completed (int): Pedidos respondidos.
+        in_flight (int): Pedidos em processamento (depois da espera nos limites de vazão).
+        peak_in_flight (int): Maior número de pedidos em processamento ao mesmo tempo.
+    """
+    def __init__(
+        self,
+        listen_port: int,
+        latency_ms: float = 500.0,
+        distribution: Optional["ServiceTimeDistribution"] = None,
+        max_concurrency: int = 0,
+        max_rps: float = 0,
+        reply: str = "Resposta simulada.",
+    ):
+        super().__init__()
+        self.listen_port = listen_port
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.max_concurrency = max_concurrency
+        self.max_rps = max_rps
+        self.reply = reply
+        self.completed = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._ids = itertools.count(1)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._next_start = 0.0
+
+    def start(self):
+        """
+        Inicia o event loop do servidor e aguarda conexões indefinidamente.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        if self.max_concurrency > 0:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        server = await asyncio.start_server(self.handle_http, '0.0.0.0', self.listen_port, reuse_address=True)
+        latency = self.distribution.name if self.distribution is not None else f"{self.latency_ms} ms"
+        self.sys_log(
+            f"MockLLMServer listening on port {self.listen_port} with latency {latency}, "
+            f"max_concurrency {self.max_concurrency or '-'} and max_rps {self.max_rps or '-'}"
+        )
+        async with server:
+            await server.serve_forever()
+
+    async def read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """
+        Lê um pedido HTTP/1.1 da conexão.
+
+        Args:
+            reader (asyncio.StreamReader): Stream de leitura da conexão.
+        Returns:
+            Optional[Tuple[str, str, Dict[str, str], bytes]]: Método, caminho, cabeçalhos e corpo,
+            ou None se a conexão foi encerrada.
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY:
+            raise ValueError(f"Corpo do pedido com {length} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, headers, body
+
+    async def handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Atende os pedidos HTTP de uma conexão até o cliente encerrá-la.
+
+        Args:
+            reader (asyncio.StreamReader): Stream de leitura da conexão.
+            writer (asyncio.StreamWriter): Stream de escrita da conexão.
+        Returns:
+            None
+        """
+        try:
+            while True:
+                request = await self.read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if method != "POST" or path.split("?", 1)[0] != COMPLETIONS_PATH:
+                    status, response = 404, {"error": {"message": f"{method} {path} não encontrado"}}
+                else:
+                    status, response = 200, await self.complete(json.loads(body or b"{}"))
+                self.write_response(writer, status, response)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except Exception as e:
+            print(f"Erro no {type(self).__name__}: {e}")
+        finally:
+            writer.close()
+
+    async def pace(self) -> None:
+        """
+        Aguarda a vez do pedido no limite de `max_rps` pedidos iniciados por segundo.
+        Os inícios são espaçados de 1 / max_rps segundos, na ordem de chegada.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        if self.max_rps <= 0:
+            return
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + 1 / self.max_rps
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def complete(self, request: dict) -> dict:
+        """
+        Simula uma chamada de chat-completions: aguarda a vez nos limites de vazão e a latência e monta a resposta.
+
+        Args:
+            request (dict): Corpo do pedido.
+        Returns:
+            dict: Corpo da resposta, no formato da API de chat-completions.
+        """
+        latency_ms = self.distribution.sample() if self.distribution is not None else self.latency_ms
+        if self._slots is not None:
+            async with self._slots:
+                await self.process(latency_ms)
+        else:
+            await self.process(latency_ms)
+        self.completed += 1
+        return {
+            "id": f"chatcmpl-mock-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.reply},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    async def process(self, latency_ms: float) -> None:
+        """
+        Aguarda a vez do pedido no limite de `max_rps` e a latência, contando os pedidos em processamento.
+
+        Args:
+            latency_ms (float): Latência do pedido, em milissegundos.
+        Returns:
+            None
+        """
+        await self.pace()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(latency_ms / 1000)
+        finally:
+            self.in_flight -= 1
+
+    def write_response(self, writer: asyncio.StreamWriter, status: int, response: dict) -> None:
+        body = json.dumps(response).encode()
+        reason = "OK" if status == 200 else "Not Found"
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode() + body
+        )
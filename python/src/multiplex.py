@@ -0,0 +1,303 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from src.protocol import FrameReader, MessageType, encode_frame, read_frame_async, write_frame
+
+Address = Tuple[str, int]
+
+# Identificadores de pedido ocupam 4 bytes no cabeçalho; 0 é reservado para conexões não multiplexadas
+MAX_REQUEST_ID = 2 ** 32 - 1
+
+
+def next_request_id(current: int) -> int:
+    """
+    Retorna o identificador seguinte a `current`, voltando a 1 depois de `MAX_REQUEST_ID` (0 nunca é usado).
+
+    Args:
+        current (int): O último identificador usado, ou 0 se nenhum foi usado.
+    Returns:
+        int: O próximo identificador.
+    """
+    return current % MAX_REQUEST_ID + 1
+
+
+class MultiplexedConnection:
+    """
+    Conexão TCP única sobre a qual vários pedidos ficam em andamento ao mesmo tempo.
+    Cada pedido recebe um identificador no cabeçalho da mensagem; uma thread leitora recebe as respostas,
+    que podem chegar fora de ordem, e as entrega a quem fez o pedido correspondente.
+    Se a conexão cair, todos os pedidos pendentes falham com `ConnectionError`.
+
+    Args:
+        address (Address): Tupla (ip, porta) do destino.
+        connect_timeout (float): Tempo máximo, em segundos, para estabelecer a conexão.
+    Returns:
+        None
+    """
+    def __init__(self, address: Address, connect_timeout: float = 5.0):
+        self.address = address
+        self.sock = socket.create_connection(address, timeout=connect_timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.closed = False
+        self._pending: Dict[int, Future] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, name=f"mux-reader:{address}", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        reader = FrameReader(self.sock)
+        error: Exception = ConnectionError(f"Conexão com {self.address[0]}:{self.address[1]} encerrada")
+        try:
+            while True:
+                frame = reader.read_frame()
+                if frame is None:
+                    break
+                with self._lock:
+                    future = self._pending.pop(frame.request_id, None)
+                if future is not None:
+                    future.set_result(frame.payload)
+        except Exception as e:
+            error = e
+        finally:
+            self.close(error)
+
+    def request(
+        self, msg: str, kind: MessageType = MessageType.DATA, epoch: int = 0, timeout: Optional[float] = None
+    ) -> str:
+        """
+        Envia um pedido e aguarda a resposta com o mesmo identificador.
+
+        Args:
+            msg (str): Mensagem a ser enviada.
+            kind (MessageType): Tipo da mensagem.
+            epoch (int): Época da configuração de serviços.
+            timeout (Optional[float]): Tempo máximo de espera pela resposta, em segundos.
+        Returns:
+            str: Conteúdo da resposta.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self.closed:
+                raise ConnectionError(f"Conexão com {self.address[0]}:{self.address[1]} encerrada")
+            self._last_id = request_id = next_request_id(self._last_id)
+            self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self.sock.sendall(encode_frame(kind, msg, request_id, epoch))
+            return future.result(timeout)
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def close(self, error: Optional[Exception] = None) -> None:
+        """
+        Fecha a conexão e faz falhar os pedidos pendentes.
+
+        Args:
+            error (Optional[Exception]): Exceção entregue aos pedidos pendentes.
+        Returns:
+            None
+        """
+        with self._lock:
+            self.closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error or ConnectionError("Conexão encerrada"))
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class MultiplexedClient:
+    """
+    Mantém uma `MultiplexedConnection` por destino, reabrindo-a quando ela cai.
+    Pode ser compartilhado por todas as threads de um proxy.
+
+    Args:
+        connect_timeout (float): Tempo máximo, em segundos, para estabelecer uma conexão.
+    Returns:
+        None
+    """
+    def __init__(self, connect_timeout: float = 5.0):
+        self.connect_timeout = connect_timeout
+        self._connections: Dict[Address, MultiplexedConnection] = {}
+        self._lock = threading.Lock()
+
+    def connection(self, ip: str, port: int) -> MultiplexedConnection:
+        address = (ip, port)
+        with self._lock:
+            conn = self._connections.get(address)
+            if conn is None or conn.closed:
+                conn = MultiplexedConnection(address, self.connect_timeout)
+                self._connections[address] = conn
+            return conn
+
+    def request(self, ip: str, port: int, msg: str, kind: MessageType = MessageType.DATA, epoch: int = 0) -> str:
+        """
+        Envia um pedido ao destino pela sua conexão multiplexada e aguarda a resposta.
+
+        Args:
+            ip (str): Endereço IP do destino.
+            port (int): Porta do destino.
+            msg (str): Mensagem a ser enviada.
+            kind (MessageType): Tipo da mensagem.
+            epoch (int): Época da configuração de serviços.
+        Returns:
+            str: Conteúdo da resposta.
+        """
+        return self.connection(ip, port).request(msg, kind, epoch)
+
+    def close(self) -> None:
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+
+
+class AsyncMultiplexedConnection:
+    """
+    Versão assíncrona da `MultiplexedConnection`, para uso dentro de um único event loop.
+    Uma tarefa leitora entrega as respostas, pelo identificador, às corrotinas que fizeram os pedidos.
+
+    Args:
+        address (Address): Tupla (ip, porta) do destino.
+        reader (asyncio.StreamReader): Stream de leitura da conexão.
+        writer (asyncio.StreamWriter): Stream de escrita da conexão.
+    Returns:
+        None
+    """
+    def __init__(self, address: Address, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.address = address
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._last_id = 0
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def open(cls, ip: str, port: int, connect_timeout: float = 5.0) -> "AsyncMultiplexedConnection":
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout=connect_timeout)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls((ip, port), reader, writer)
+
+    async def _read_loop(self) -> None:
+        error: Exception = ConnectionError(f"Conexão com {self.address[0]}:{self.address[1]} encerrada")
+        try:
+            while True:
+                frame = await read_frame_async(self.reader)
+                if frame is None:
+                    break
+                future = self._pending.pop(frame.request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(frame.payload)
+        except Exception as e:
+            error = e
+        finally:
+            self.close(error)
+
+    async def request(self, msg: str, kind: MessageType = MessageType.DATA, epoch: int = 0) -> str:
+        """
+        Envia um pedido e aguarda a resposta com o mesmo identificador.
+
+        Args:
+            msg (str): Mensagem a ser enviada.
+            kind (MessageType): Tipo da mensagem.
+            epoch (int): Época da configuração de serviços.
+        Returns:
+            str: Conteúdo da resposta.
+        """
+        if self.closed:
+            raise ConnectionError(f"Conexão com {self.address[0]}:{self.address[1]} encerrada")
+        self._last_id = request_id = next_request_id(self._last_id)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            write_frame(self.writer, kind, msg, request_id, epoch)
+            await self.writer.drain()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def close(self, error: Optional[Exception] = None) -> None:
+        """
+        Fecha a conexão e faz falhar os pedidos pendentes.
+
+        Args:
+            error (Optional[Exception]): Exceção entregue aos pedidos pendentes.
+        Returns:
+            None
+        """
+        self.closed = True
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error or ConnectionError("Conexão encerrada"))
+        self.writer.close()
+
+
+class AsyncMultiplexedClient:
+    """
+    Mantém uma `AsyncMultiplexedConnection` por destino, reabrindo-a quando ela cai.
+
+    Args:
+        connect_timeout (float): Tempo máximo, em segundos, para estabelecer uma conexão.
+    Returns:
+        None
+    """
+    def __init__(self, connect_timeout: float = 5.0):
+        self.connect_timeout = connect_timeout
+        self._connections: Dict[Address, AsyncMultiplexedConnection] = {}
+        self._connecting: Dict[Address, asyncio.Future] = {}
+
+    async def connection(self, ip: str, port: int) -> AsyncMultiplexedConnection:
+        address = (ip, port)
+        conn = self._connections.get(address)
+        if conn is not None and not conn.closed:
+            return conn
+        # Uma única abertura por destino, mesmo com vários pedidos chegando ao mesmo tempo
+        opening = self._connecting.get(address)
+        if opening is None:
+            opening = asyncio.ensure_future(AsyncMultiplexedConnection.open(ip, port, self.connect_timeout))
+            self._connecting[address] = opening
+            try:
+                self._connections[address] = await opening
+            finally:
+                self._connecting.pop(address, None)
+            return self._connections[address]
+        return await asyncio.shield(opening)
+
+    async def request(self, ip: str, port: int, msg: str, kind: MessageType = MessageType.DATA, epoch: int = 0) -> str:
+        """
+        Envia um pedido ao destino pela sua conexão multiplexada e aguarda a resposta.
+
+        Args:
+            ip (str): Endereço IP do destino.
+            port (int): Porta do destino.
+            msg (str): Mensagem a ser enviada.
+            kind (MessageType): Tipo da mensagem.
+            epoch (int): Época da configuração de serviços.
+        Returns:
+            str: Conteúdo da resposta.
+        """
+        conn = await self.connection(ip, port)
+        return await conn.request(msg, kind, epoch)
+
+    def close(self) -> None:
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Dict
+
+
+class Occupancy:
+    """
+    Acompanha a ocupação dos servidores de um Service.
+    Conta os servidores ocupados e os atendimentos concluídos e integra no tempo o número de servidores ocupados,
+    obtendo a utilização média desde o início: tempo ocupado somado de todos os servidores / (servidores x tempo decorrido).
+    Todos os métodos são seguros para uso por várias threads.
+
+    Args:
+        servers (int): Número de servidores do serviço.
+    Returns:
+        None
+    """
+    def __init__(self, servers: int):
+        self.servers = servers
+        self.busy = 0
+        self.completed = 0
+        self._busy_time = 0.0
+        self._started_at = self._changed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _accumulate(self, now: float) -> None:
+        self._busy_time += self.busy * (now - self._changed_at)
+        self._changed_at = now
+
+    def begin(self) -> None:
+        """
+        Registra o início de um atendimento.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self._lock:
+            self._accumulate(time.monotonic())
+            self.busy += 1
+
+    def end(self) -> None:
+        """
+        Registra o fim de um atendimento.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self._lock:
+            self._accumulate(time.monotonic())
+            self.busy -= 1
+            self.completed += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Retorna a ocupação atual e a utilização média desde o início.
+
+        Args:
+            None
+        Returns:
+            Dict[str, float]: servers, busy, completed e utilization (entre 0 e 1).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._accumulate(now)
+            elapsed = now - self._started_at
+            utilization = self._busy_time / (self.servers * elapsed) if elapsed > 0 else 0.0
+            return {
+                "servers": self.servers,
+                "busy": self.busy,
+                "completed": self.completed,
+                "utilization": round(utilization, 4),
+            }
@@ -0,0 +1,395 @@
+import asyncio
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+from src.protocol import Frame, FrameReader, MessageType, read_frame_async, send_frame, write_frame
+
+Address = Tuple[str, int]
+
+
+class PooledConnection:
+    """
+    Conexão TCP gerenciada por um `ConnectionPool`.
+    Guarda o socket, seu leitor de mensagens, o endereço de destino e o instante do último uso,
+    permitindo que o pool decida quando reaproveitar ou descartar a conexão.
+
+    Args:
+        address (Address): Tupla (ip, porta) do destino.
+        sock (socket.socket): Socket já conectado ao destino.
+    Returns:
+        None
+    """
+    def __init__(self, address: Address, sock: socket.socket):
+        self.address = address
+        self.sock = sock
+        self.reader = FrameReader(sock)
+        self.last_used = time.monotonic()
+        self.reused = False
+
+    def send_frame(self, kind: MessageType, payload: str, epoch: int = 0) -> None:
+        send_frame(self.sock, kind, payload, epoch=epoch)
+
+    def read_frame(self) -> Optional[Frame]:
+        return self.reader.read_frame()
+
+    def is_alive(self) -> bool:
+        """
+        Verifica, sem bloquear, se a conexão ainda pode ser reutilizada.
+        Uma conexão ociosa saudável não tem nada para ler: se o par fechou a conexão
+        (leitura vazia) ou deixou bytes pendentes, no socket ou no buffer do leitor, ela é considerada inválida.
+
+        Args:
+            None
+        Returns:
+            bool: True se a conexão puder ser reutilizada, False caso contrário.
+        """
+        if self.reader.buffer:
+            return False
+        timeout = self.sock.gettimeout()
+        try:
+            self.sock.setblocking(False)
+            self.sock.recv(1, socket.MSG_PEEK)
+            return False
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            try:
+                self.sock.settimeout(timeout)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool:
+    """
+    Pool de conexões TCP persistentes indexado por (ip, porta).
+    Cada destino tem um limite de conexões simultâneas; conexões devolvidas ficam ociosas
+    e são reaproveitadas pelo próximo pedido ao mesmo destino, após uma verificação de saúde.
+    Conexões ociosas há mais de `idle_timeout` segundos são fechadas.
+    Com `enabled=False` o pool abre e fecha uma conexão por pedido, o que permite comparar
+    o modo persistente com o modo original.
+
+    Args:
+        enabled (bool): Se False, nenhuma conexão é reaproveitada.
+        max_connections_per_host (int): Número máximo de conexões abertas por destino.
+        idle_timeout (float): Tempo máximo, em segundos, que uma conexão pode ficar ociosa.
+        connect_timeout (float): Tempo máximo, em segundos, para estabelecer uma conexão.
+    Returns:
+        None
+    """
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_connections_per_host: int = 64,
+        idle_timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+    ):
+        self.enabled = enabled
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._idle: Dict[Address, Deque[PooledConnection]] = {}
+        self._slots: Dict[Address, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._last_eviction = time.monotonic()
+
+    def _slot(self, address: Address) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(address)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_connections_per_host)
+                self._slots[address] = slot
+            return slot
+
+    def _pop_idle(self, address: Address) -> Optional[PooledConnection]:
+        with self._lock:
+            idle = self._idle.get(address)
+            # LIFO: a conexão usada mais recentemente tem mais chance de estar viva
+            return idle.pop() if idle else None
+
+    def acquire(self, ip: str, port: int, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        Obtém uma conexão para o destino, reaproveitando uma conexão ociosa saudável
+        ou abrindo uma nova caso não haja nenhuma disponível.
+        Bloqueia enquanto o destino estiver com todas as suas conexões em uso.
+
+        Args:
+            ip (str): Endereço IP do destino.
+            port (int): Porta do destino.
+            timeout (Optional[float]): Tempo máximo de espera por uma conexão livre.
+        Returns:
+            PooledConnection: Conexão pronta para uso.
+        """
+        address = (ip, port)
+        slot = self._slot(address)
+        if not slot.acquire(timeout=timeout):
+            raise TimeoutError(f"Nenhuma conexão disponível para {ip}:{port}")
+        try:
+            now = time.monotonic()
+            while self.enabled:
+                conn = self._pop_idle(address)
+                if conn is None:
+                    break
+                if now - conn.last_used > self.idle_timeout or not conn.is_alive():
+                    conn.close()
+                    continue
+                conn.reused = True
+                return conn
+            sock = socket.create_connection(address, timeout=self.connect_timeout)
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return PooledConnection(address, sock)
+        except BaseException:
+            slot.release()
+            raise
+
+    def release(self, conn: PooledConnection, discard: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool.
+        Se `discard` for True ou o pool estiver desativado, a conexão é fechada.
+
+        Args:
+            conn (PooledConnection): Conexão obtida com `acquire`.
+            discard (bool): Indica se a conexão deve ser fechada em vez de reaproveitada.
+        Returns:
+            None
+        """
+        if discard or not self.enabled:
+            conn.close()
+        else:
+            conn.last_used = time.monotonic()
+            with self._lock:
+                self._idle.setdefault(conn.address, deque()).append(conn)
+        self._slot(conn.address).release()
+        if time.monotonic() - self._last_eviction > self.idle_timeout / 2:
+            self.evict_idle()
+
+    @contextmanager
+    def connection(self, ip: str, port: int) -> Iterator[PooledConnection]:
+        """
+        Gerenciador de contexto que obtém uma conexão e a devolve ao final.
+        Se ocorrer uma exceção durante o uso, a conexão é descartada.
+
+        Args:
+            ip (str): Endereço IP do destino.
+            port (int): Porta do destino.
+        Returns:
+            Iterator[PooledConnection]: A conexão obtida.
+        """
+        conn = self.acquire(ip, port)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+
+    def evict_idle(self) -> None:
+        """
+        Fecha as conexões ociosas há mais de `idle_timeout` segundos.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            self._last_eviction = now
+            for idle in self._idle.values():
+                # As conexões mais antigas ficam no início da fila
+                while idle and now - idle[0].last_used > self.idle_timeout:
+                    expired.append(idle.popleft())
+        for conn in expired:
+            conn.close()
+
+    def close(self) -> None:
+        """
+        Fecha todas as conexões ociosas do pool.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+
+class AsyncPooledConnection:
+    """
+    Conexão TCP assíncrona gerenciada por um `AsyncConnectionPool`.
+
+    Args:
+        address (Address): Tupla (ip, porta) do destino.
+        reader (asyncio.StreamReader): Stream de leitura da conexão.
+        writer (asyncio.StreamWriter): Stream de escrita da conexão.
+    Returns:
+        None
+    """
+    def __init__(self, address: Address, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.address = address
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.reused = False
+
+    async def send_frame(self, kind: MessageType, payload: str, epoch: int = 0) -> None:
+        write_frame(self.writer, kind, payload, epoch=epoch)
+        await self.writer.drain()
+
+    async def read_frame(self) -> Optional[Frame]:
+        return await read_frame_async(self.reader)
+
+    def is_alive(self) -> bool:
+        """
+        Verifica se a conexão ociosa ainda pode ser reutilizada:
+        o destino não pode ter encerrado a conexão nem deixado bytes pendentes.
+
+        Args:
+            None
+        Returns:
+            bool: True se a conexão puder ser reutilizada, False caso contrário.
+        """
+        if self.writer.is_closing() or self.reader.at_eof():
+            return False
+        return not self.reader._buffer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    """
+    Versão assíncrona do `ConnectionPool`, para uso dentro de um único event loop.
+    Mantém conexões persistentes indexadas por (ip, porta), com limite de conexões por destino,
+    verificação de saúde antes do reaproveitamento e descarte de conexões ociosas.
+
+    Args:
+        enabled (bool): Se False, nenhuma conexão é reaproveitada.
+        max_connections_per_host (int): Número máximo de conexões abertas por destino.
+        idle_timeout (float): Tempo máximo, em segundos, que uma conexão pode ficar ociosa.
+        connect_timeout (float): Tempo máximo, em segundos, para estabelecer uma conexão.
+    Returns:
+        None
+    """
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_connections_per_host: int = 256,
+        idle_timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+    ):
+        self.enabled = enabled
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._idle: Dict[Address, Deque[AsyncPooledConnection]] = {}
+        self._slots: Dict[Address, asyncio.Semaphore] = {}
+        self._last_eviction = time.monotonic()
+
+    def _slot(self, address: Address) -> asyncio.Semaphore:
+        slot = self._slots.get(address)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_connections_per_host)
+            self._slots[address] = slot
+        return slot
+
+    async def acquire(self, ip: str, port: int) -> AsyncPooledConnection:
+        """
+        Obtém uma conexão para o destino, reaproveitando uma conexão ociosa saudável
+        ou abrindo uma nova caso não haja nenhuma disponível.
+
+        Args:
+            ip (str): Endereço IP do destino.
+            port (int): Porta do destino.
+        Returns:
+            AsyncPooledConnection: Conexão pronta para uso.
+        """
+        address = (ip, port)
+        slot = self._slot(address)
+        await slot.acquire()
+        try:
+            now = time.monotonic()
+            idle = self._idle.get(address)
+            while self.enabled and idle:
+                conn = idle.pop()
+                if now - conn.last_used > self.idle_timeout or not conn.is_alive():
+                    conn.close()
+                    continue
+                conn.reused = True
+                return conn
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, port), timeout=self.connect_timeout
+            )
+            sock = writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return AsyncPooledConnection(address, reader, writer)
+        except BaseException:
+            slot.release()
+            raise
+
+    def release(self, conn: AsyncPooledConnection, discard: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool.
+        Se `discard` for True ou o pool estiver desativado, a conexão é fechada.
+
+        Args:
+            conn (AsyncPooledConnection): Conexão obtida com `acquire`.
+            discard (bool): Indica se a conexão deve ser fechada em vez de reaproveitada.
+        Returns:
+            None
+        """
+        if discard or not self.enabled:
+            conn.close()
+        else:
+            conn.last_used = time.monotonic()
+            self._idle.setdefault(conn.address, deque()).append(conn)
+        self._slot(conn.address).release()
+        if time.monotonic() - self._last_eviction > self.idle_timeout / 2:
+            self.evict_idle()
+
+    def evict_idle(self) -> None:
+        """
+        Fecha as conexões ociosas há mais de `idle_timeout` segundos.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        self._last_eviction = now
+        for idle in self._idle.values():
+            while idle and now - idle[0].last_used > self.idle_timeout:
+                idle.popleft().close()
+
+    def close(self) -> None:
+        """
+        Fecha todas as conexões ociosas do pool.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+        self._idle.clear()
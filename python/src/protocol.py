@@ -0,0 +1,217 @@
+import asyncio
+import socket
+import struct
+from enum import IntEnum
+from typing import List, NamedTuple, Optional
+
+# Cabeçalho: tamanho do payload (4 bytes, big-endian) + tipo da mensagem (1 byte)
+# + identificador do pedido (4 bytes; 0 quando a conexão não é multiplexada)
+# + época da configuração de serviços (4 bytes; 0 quando a mensagem não depende de uma configuração)
+HEADER = struct.Struct("!IBII")
+MAX_PAYLOAD_SIZE = 16 * 1024 * 1024
+RECV_SIZE = 64 * 1024
+
+
+class MessageType(IntEnum):
+    """
+    Tipos de mensagem trocados entre Source, LoadBalancer e Service.
+
+    Attributes:
+        DATA: Mensagem de dados com os timestamps do experimento.
+        PING: Consulta se o destino está livre.
+        CONFIG: Configuração dos serviços de um load balancer.
+        REPLY: Resposta a qualquer um dos tipos acima.
+        BATCH: Várias mensagens de dados agrupadas; a resposta traz uma resposta por mensagem, na mesma ordem.
+        STATS: Consulta a ocupação do destino; a resposta traz campos chave=valor separados por ponto e vírgula.
+    """
+    DATA = 1
+    PING = 2
+    CONFIG = 3
+    REPLY = 4
+    BATCH = 5
+    STATS = 6
+
+
+class Frame(NamedTuple):
+    """
+    Mensagem decodificada do protocolo.
+
+    Attributes:
+        kind (MessageType): Tipo da mensagem.
+        payload (str): Conteúdo da mensagem.
+        request_id (int): Identificador do pedido. As respostas repetem o identificador do pedido,
+            permitindo vários pedidos em andamento na mesma conexão. 0 indica um pedido por vez.
+        epoch (int): Época da configuração de serviços com que a mensagem deve ser tratada. 0 indica a configuração atual.
+    """
+    kind: MessageType
+    payload: str
+    request_id: int = 0
+    epoch: int = 0
+
+
+# Separador das mensagens dentro de um BATCH e da sua resposta
+BATCH_SEPARATOR = "\n"
+
+
+class ProtocolError(ConnectionError):
+    """
+    Erro levantado quando os bytes recebidos não formam uma mensagem válida.
+    A conexão em que ele ocorre não pode mais ser usada.
+    """
+
+
+def encode_frame(kind: MessageType, payload: str, request_id: int = 0, epoch: int = 0) -> bytes:
+    """
+    Codifica uma mensagem no formato do protocolo: tamanho + tipo + identificador + época + payload.
+
+    Args:
+        kind (MessageType): Tipo da mensagem.
+        payload (str): Conteúdo da mensagem.
+        request_id (int): Identificador do pedido.
+        epoch (int): Época da configuração de serviços.
+    Returns:
+        bytes: A mensagem codificada, pronta para envio.
+    """
+    data = payload.encode()
+    if len(data) > MAX_PAYLOAD_SIZE:
+        raise ProtocolError(f"Payload de {len(data)} bytes excede o limite de {MAX_PAYLOAD_SIZE}")
+    return HEADER.pack(len(data), kind, request_id, epoch) + data
+
+
+def encode_batch(messages: List[str]) -> str:
+    """
+    Agrupa mensagens no conteúdo de uma mensagem BATCH, ou respostas no conteúdo da sua resposta.
+
+    Args:
+        messages (List[str]): Mensagens a agrupar. Não podem conter o separador.
+    Returns:
+        str: O conteúdo agrupado.
+    """
+    return BATCH_SEPARATOR.join(messages)
+
+
+def decode_batch(payload: str) -> List[str]:
+    """
+    Separa o conteúdo de uma mensagem BATCH, ou da sua resposta, nas mensagens agrupadas.
+
+    Args:
+        payload (str): O conteúdo agrupado.
+    Returns:
+        List[str]: As mensagens, na ordem em que foram agrupadas.
+    """
+    return payload.split(BATCH_SEPARATOR)
+
+
+def send_frame(sock: socket.socket, kind: MessageType, payload: str, request_id: int = 0, epoch: int = 0) -> None:
+    """
+    Codifica e envia uma mensagem completa pelo socket.
+
+    Args:
+        sock (socket.socket): Socket conectado.
+        kind (MessageType): Tipo da mensagem.
+        payload (str): Conteúdo da mensagem.
+        request_id (int): Identificador do pedido.
+        epoch (int): Época da configuração de serviços.
+    Returns:
+        None
+    """
+    sock.sendall(encode_frame(kind, payload, request_id, epoch))
+
+
+class FrameReader:
+    """
+    Leitor de mensagens com buffer para um socket.
+    Acumula os bytes recebidos e extrai mensagens completas, tratando tanto leituras parciais
+    (uma mensagem dividida em vários `recv`) quanto leituras agrupadas (várias mensagens em um `recv`).
+    Deve existir um único leitor por socket, pois os bytes excedentes ficam no buffer para a próxima leitura.
+
+    Args:
+        sock (socket.socket): Socket de onde as mensagens serão lidas.
+    Returns:
+        None
+    """
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = bytearray()
+
+    def _parse(self) -> Optional[Frame]:
+        if len(self.buffer) < HEADER.size:
+            return None
+        size, kind, request_id, epoch = HEADER.unpack_from(self.buffer)
+        if size > MAX_PAYLOAD_SIZE:
+            raise ProtocolError(f"Payload de {size} bytes excede o limite de {MAX_PAYLOAD_SIZE}")
+        end = HEADER.size + size
+        if len(self.buffer) < end:
+            return None
+        try:
+            frame = Frame(MessageType(kind), self.buffer[HEADER.size:end].decode(), request_id, epoch)
+        except ValueError as e:
+            raise ProtocolError(f"Mensagem inválida: {e}") from e
+        del self.buffer[:end]
+        return frame
+
+    def read_frame(self) -> Optional[Frame]:
+        """
+        Lê a próxima mensagem completa do socket, bloqueando até que ela chegue.
+
+        Args:
+            None
+        Returns:
+            Optional[Frame]: A mensagem lida, ou None se a conexão foi encerrada entre mensagens.
+        """
+        while True:
+            frame = self._parse()
+            if frame is not None:
+                return frame
+            chunk = self.sock.recv(RECV_SIZE)
+            if not chunk:
+                if self.buffer:
+                    raise ProtocolError("Conexão encerrada no meio de uma mensagem")
+                return None
+            self.buffer += chunk
+
+
+async def read_frame_async(reader: asyncio.StreamReader) -> Optional[Frame]:
+    """
+    Lê a próxima mensagem completa de um `asyncio.StreamReader`.
+
+    Args:
+        reader (asyncio.StreamReader): Stream de onde a mensagem será lida.
+    Returns:
+        Optional[Frame]: A mensagem lida, ou None se a conexão foi encerrada entre mensagens.
+    """
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("Conexão encerrada no meio de uma mensagem") from e
+        return None
+    size, kind, request_id, epoch = HEADER.unpack(header)
+    if size > MAX_PAYLOAD_SIZE:
+        raise ProtocolError(f"Payload de {size} bytes excede o limite de {MAX_PAYLOAD_SIZE}")
+    try:
+        payload = await reader.readexactly(size)
+        return Frame(MessageType(kind), payload.decode(), request_id, epoch)
+    except asyncio.IncompleteReadError as e:
+        raise ProtocolError("Conexão encerrada no meio de uma mensagem") from e
+    except ValueError as e:
+        raise ProtocolError(f"Mensagem inválida: {e}") from e
+
+
+def write_frame(
+    writer: asyncio.StreamWriter, kind: MessageType, payload: str, request_id: int = 0, epoch: int = 0
+) -> None:
+    """
+    Codifica e enfileira uma mensagem em um `asyncio.StreamWriter`.
+    O chamador deve aguardar `writer.drain()` para respeitar o controle de fluxo.
+
+    Args:
+        writer (asyncio.StreamWriter): Stream onde a mensagem será escrita.
+        kind (MessageType): Tipo da mensagem.
+        payload (str): Conteúdo da mensagem.
+        request_id (int): Identificador do pedido.
+        epoch (int): Época da configuração de serviços.
+    Returns:
+        None
+    """
+    writer.write(encode_frame(kind, payload, request_id, epoch))
@@ -0,0 +1,169 @@
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+# Estratégias de busca da taxa de saturação
+SATURATION_SEARCHES = ("step", "binary")
+
+
+class SaturationStep(NamedTuple):
+    """
+    Resultado de uma rodada da busca de saturação, em uma taxa de chegada fixa.
+
+    Attributes:
+        rate (float): Taxa de chegada pedida, em mensagens por segundo.
+        sent (int): Mensagens enviadas.
+        completed (int): Mensagens respondidas (sem "busy"), incluindo as do aquecimento.
+        throughput (float): Mensagens respondidas por segundo, do primeiro envio à última resposta.
+        mean_response_ms (float): Tempo de resposta médio, medido no Source.
+        p99_response_ms (float): Percentil 99 do tempo de resposta.
+        drop_rate (float): Fração das mensagens sem resposta, respondidas com "busy" ou com erro.
+        sustainable (bool): Se a rodada ficou dentro de todos os limites.
+    """
+    rate: float
+    sent: int
+    completed: int
+    throughput: float
+    mean_response_ms: float
+    p99_response_ms: float
+    drop_rate: float
+    sustainable: bool
+
+    def __str__(self) -> str:
+        return (
+            f"taxa {self.rate:.1f}/s: {self.completed}/{self.sent} respostas, vazão {self.throughput:.1f}/s, "
+            f"tempo de resposta médio {self.mean_response_ms:.3f} ms, p99 {self.p99_response_ms:.3f} ms, "
+            f"descartes {self.drop_rate:.2%} ({'sustentável' if self.sustainable else 'saturado'})"
+        )
+
+
+class SaturationResult(NamedTuple):
+    """
+    Resultado da busca de saturação de uma configuração de serviços.
+
+    Attributes:
+        services (int): Quantidade de serviços.
+        best (Optional[SaturationStep]): Rodada sustentável de maior taxa; None se nenhuma foi sustentável.
+        steps (List[SaturationStep]): Todas as rodadas, na ordem em que foram executadas.
+    """
+    services: int
+    best: Optional[SaturationStep]
+    steps: List[SaturationStep]
+
+    def __str__(self) -> str:
+        if self.best is None:
+            return f"{self.services} serviços: nenhuma taxa sustentável em {len(self.steps)} rodadas"
+        return (
+            f"{self.services} serviços: vazão máxima sustentável {self.best.throughput:.1f}/s "
+            f"(taxa {self.best.rate:.1f}/s, tempo de resposta médio {self.best.mean_response_ms:.3f} ms, "
+            f"p99 {self.best.p99_response_ms:.3f} ms, {len(self.steps)} rodadas)"
+        )
+
+
+def measure_step(
+    rate: float,
+    sent: int,
+    response_times: List[float],
+    duration: float,
+    max_mrt_ms: Optional[float] = None,
+    max_p99_ms: Optional[float] = None,
+    max_drop_rate: Optional[float] = None,
+    min_throughput_ratio: Optional[float] = None,
+    discarded: int = 0,
+) -> SaturationStep:
+    """
+    Monta o resultado de uma rodada e o compara com os limites; um limite None não é verificado.
+
+    Args:
+        rate (float): Taxa de chegada pedida, em mensagens por segundo.
+        sent (int): Mensagens enviadas.
+        response_times (List[float]): Tempos de resposta das mensagens respondidas depois do aquecimento, em segundos.
+        duration (float): Tempo do primeiro envio à última resposta, em segundos.
+        max_mrt_ms (Optional[float]): Tempo de resposta médio máximo, em milissegundos.
+        max_p99_ms (Optional[float]): Percentil 99 máximo do tempo de resposta, em milissegundos.
+        max_drop_rate (Optional[float]): Fração máxima de mensagens sem resposta.
+        min_throughput_ratio (Optional[float]): Fração mínima da taxa pedida que a vazão deve alcançar;
+            abaixo dela, as mensagens se acumulam nas filas mais rápido do que são atendidas.
+        discarded (int): Mensagens respondidas durante o aquecimento; contam na vazão e nos descartes,
+            mas não nos tempos de resposta.
+    Returns:
+        SaturationStep: O resultado da rodada.
+    """
+    measured = len(response_times)
+    completed = measured + discarded
+    ordered = sorted(response_times)
+    mean_response_ms = sum(response_times) / measured * 1000 if measured else 0.0
+    p99_response_ms = ordered[min(measured - 1, int(0.99 * measured))] * 1000 if measured else 0.0
+    drop_rate = (sent - completed) / sent if sent else 0.0
+    throughput = completed / duration if duration > 0 else 0.0
+    sustainable = completed > 0 and not (
+        (max_mrt_ms is not None and mean_response_ms > max_mrt_ms)
+        or (max_p99_ms is not None and p99_response_ms > max_p99_ms)
+        or (max_drop_rate is not None and drop_rate > max_drop_rate)
+        or (min_throughput_ratio is not None and throughput < min_throughput_ratio * rate)
+    )
+    return SaturationStep(
+        rate=rate,
+        sent=sent,
+        completed=completed,
+        throughput=throughput,
+        mean_response_ms=mean_response_ms,
+        p99_response_ms=p99_response_ms,
+        drop_rate=drop_rate,
+        sustainable=sustainable,
+    )
+
+
+async def search_saturation(
+    trial: Callable[[float], Awaitable[SaturationStep]],
+    search: str = "step",
+    start_rate: float = 10.0,
+    rate_step: float = 10.0,
+    max_rate: float = 1000.0,
+    resolution: float = 5.0,
+) -> Optional[SaturationStep]:
+    """
+    Procura a maior taxa de chegada sustentável, executando uma rodada por taxa.
+    Com `step`, a taxa cresce de `rate_step` a partir de `start_rate` até a primeira rodada saturada.
+    Com `binary`, a taxa dobra a partir de `start_rate` até a primeira rodada saturada e o intervalo entre
+    a última taxa sustentável e ela é dividido ao meio até ficar menor que `resolution`.
+    Em ambos os casos a taxa não passa de `max_rate`.
+
+    Args:
+        trial (Callable[[float], Awaitable[SaturationStep]]): Executa uma rodada na taxa informada.
+        search (str): step ou binary.
+        start_rate (float): Primeira taxa, em mensagens por segundo.
+        rate_step (float): Incremento da taxa na busca step.
+        max_rate (float): Maior taxa experimentada.
+        resolution (float): Largura do intervalo em que a busca binary termina.
+    Returns:
+        Optional[SaturationStep]: Rodada sustentável de maior taxa; None se nenhuma foi sustentável.
+    """
+    if search not in SATURATION_SEARCHES:
+        raise ValueError(f"Busca de saturação desconhecida: {search}. Use {', '.join(SATURATION_SEARCHES)}.")
+    if start_rate <= 0:
+        raise ValueError(f"start_rate deve ser positiva: {start_rate}.")
+    if rate_step <= 0:
+        raise ValueError(f"rate_step deve ser positivo: {rate_step}.")
+    if max_rate < start_rate:
+        raise ValueError(f"max_rate ({max_rate}) deve ser pelo menos start_rate ({start_rate}).")
+    best: Optional[SaturationStep] = None
+    rate = start_rate
+    saturated_rate: Optional[float] = None
+    while True:
+        step = await trial(rate)
+        if not step.sustainable:
+            saturated_rate = rate
+            break
+        best = step
+        if rate >= max_rate:
+            break
+        rate = min(rate + rate_step if search == "step" else rate * 2, max_rate)
+    if search == "binary" and saturated_rate is not None:
+        low = best.rate if best is not None else 0.0
+        high = saturated_rate
+        while high - low > resolution:
+            step = await trial((low + high) / 2)
+            if step.sustainable:
+                best, low = step, step.rate
+            else:
+                high = step.rate
+    return best
@@ -1,102 +1,236 @@
-from queue import Queue
-import socket
+from concurrent.futures import Future
+from queue import Full, Queue
+import itertools
 import threading
-import time
+from typing import List, Optional
 
 from src.abstract_proxy import AbstractProxy
-from src.ia import IAService
+from src.logger import DEBUG
+from src.occupancy import Occupancy
+from src.protocol import Frame, MessageType, decode_batch, encode_batch
 from src.utils import add_timestamp_to_message
+from src.workload import SleepWorkload, Workload
 
 class Service(AbstractProxy):
     """
-    Classe Service que implementa um serviço de rede simples.
+    Classe Service que implementa um serviço de rede simples, organizado como uma estação de filas M/x/c.
     O serviço escuta em uma porta especificada e responde a mensagens de clientes.
     Quando recebe uma mensagem "ping", responde com "free" para indicar que está livre.
-    Para outras mensagens, simula um tempo de serviço e envia a mensagem de volta ao cliente.
+    Cada mensagem de dados recebe o timestamp de chegada e entra em uma fila limitada a `max_queue_size`;
+    se a fila estiver cheia, o serviço responde "busy". Um pool de `servers` threads consome a fila e cada
+    atendimento ocupa o servidor executando a carga de trabalho (`src.workload`), por padrão uma espera de `service_time_ms` milissegundos,
+    de modo que no máximo `servers` mensagens são atendidas ao mesmo tempo e as demais aguardam na fila.
+    Mensagens STATS são respondidas com a ocupação dos servidores e da fila.
+    Mensagens BATCH agrupam várias mensagens de dados, que são tratadas uma a uma, cada uma com os seus timestamps.
+    Com `next_hops`, o serviço é um estágio de um pipeline: depois de processada, a mensagem é encaminhada
+    ao próximo estágio (um Service ou um LoadBalancer, em round-robin) e a resposta dele é devolvida ao cliente.
     Args:
         listen_port (int): A porta na qual o serviço irá escutar.
-        service_time_ms (float): O tempo de serviço simulado em milissegundos.
+        service_time_ms (float): O tempo de serviço de cada mensagem em milissegundos.
+        max_queue_size (int): Número máximo de mensagens aguardando atendimento.
+        servers (int): Número de servidores (workers) que atendem mensagens em paralelo.
+        next_hops (Optional[List[tuple]]): Endereços (ip, porta) do próximo estágio do pipeline.
+        workload (Optional[Workload]): Carga de trabalho de cada atendimento (sleep, cpu, io ou llm); None usa a espera de `service_time_ms`.
     Returns:
         None
     """
-    def __init__(self, listen_port: int, service_time_ms: float, max_queue_size: int = 10):
+    def __init__(
+        self,
+        listen_port: int,
+        service_time_ms: float,
+        max_queue_size: int = 10,
+        servers: int = 1,
+        next_hops: Optional[List[tuple]] = None,
+        workload: Optional[Workload] = None,
+    ):
         super().__init__()
         self.listen_port = listen_port
         self.service_time_ms = service_time_ms
-        self.queue = Queue()
+        self.queue = Queue(maxsize=max_queue_size)
         self.max_queue_size = max_queue_size
-        self.ia_service = IAService()
+        self.servers = servers
+        self.occupancy = Occupancy(servers)
+        self.workload = workload or SleepWorkload(service_time_ms, servers)
+        self.next_hops = list(next_hops or [])
+        self._next_hop = itertools.cycle(self.next_hops)
+        self._next_hop_lock = threading.Lock()
+        # Pedidos multiplexados: uma thread para cada mensagem que o serviço pode aceitar (servidores e fila);
+        # as demais são respondidas com "busy", como quando a fila está cheia
+        self.mux_workers = servers + max_queue_size
+        self.mux_backlog = 0
 
     def start(self):
         """
-        Inicia o serviço, criando um socket que escuta na porta especificada.
+        Inicia o serviço: cria os `servers` workers e um socket que escuta na porta especificada.
         Aceita conexões de clientes e cria uma nova thread para cada cliente.
-        O serviço responde a mensagens "ping" com "free" para indicar que está livre.
-        Para outras mensagens, simula um tempo de serviço e envia a mensagem de volta ao cliente.
         Args:
             None
         Returns:
             None
         """
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.bind(('0.0.0.0', self.listen_port))
-        server.listen()
-        self.sys_log(f"Service listening on port {self.listen_port}")
-        while True:
-            # Aceita conexões de clientes
-            client_sock, _ = server.accept()
-            # Cria uma nova thread para lidar com o cliente
-            threading.Thread(target=self.handle_client, args=(client_sock,)).start()
+        # A carga é preparada antes das threads dos servidores (a carga cpu cria processos)
+        self.workload.start()
+        try:
+            for index in range(self.servers):
+                threading.Thread(target=self.worker, name=f"service-worker-{index}", daemon=True).start()
+            server = self.listen(self.listen_port)
+            self.sys_log(f"Service listening on port {self.listen_port} with {self.servers} servers ({self.workload.name})")
+            while True:
+                # Aceita conexões de clientes
+                client_sock, _ = server.accept()
+                # Cria uma nova thread para lidar com o cliente; daemon, para que uma conexão persistente
+                # ociosa não impeça o encerramento no SIGTERM
+                threading.Thread(target=self.handle_client, args=(client_sock,), daemon=True).start()
+        finally:
+            self.workload.close()
 
-    def handle_client(self, client_sock: socket.socket):
+    def worker(self):
         """
-        Lida com a conexão de um cliente.
-        Recebe uma mensagem do cliente, verifica se é um "ping" e responde com "free".
-        Se a mensagem não for "ping", processa a mensagem normalmente, adiciona timestamps e simula o tempo de serviço.
+        Servidor da estação: retira mensagens da fila, atende cada uma e entrega o resultado
+        à conexão que aguarda a resposta.
+
         Args:
-            client_sock (socket.socket): O socket do cliente conectado.
+            None
         Returns:
             None
         """
-        data = client_sock.recv(1024).decode()
+        while True:
+            data, future = self.queue.get()
+            try:
+                future.set_result(self.process(data))
+            except Exception as e:
+                future.set_exception(e)
 
-        self.sys_log(f"{client_sock.getsockname()} Received message: {data}")
-        
+    def handle_message(self, frame: Frame) -> str:
+        """
+        Trata uma mensagem recebida e retorna a resposta a ser enviada.
+        Verifica se é um PING e responde com "free" ou "busy" conforme a ocupação da fila.
+        Se a mensagem for de dados, coloca-a na fila e aguarda o seu atendimento por um dos servidores.
+        Args:
+            frame (Frame): A mensagem recebida.
+        Returns:
+            str: A resposta para o cliente.
+        """
+        data = frame.payload
+        if self.log_enabled(DEBUG):
+            self.sys_log(f"Received message: {frame.kind.name} {data}", DEBUG)
         # Verifica se a mensagem é "ping"
-        if data == "ping":
-            if self.queue.full():
-                print(f"Queue is full {self.queue.maxsize / self.max_queue_size} messages")
-                client_sock.sendall("busy".encode())
-            else:
-                print(f"Queue is free {self.queue.maxsize / self.max_queue_size} messages")
-                client_sock.sendall("free".encode())
-            client_sock.close()
-            return
-        if self.queue.full():
-            print(f"Queue is full {self.queue.maxsize / self.max_queue_size} messages")
-            client_sock.sendall("busy".encode())
-            client_sock.close()
-            return
-        self.queue.put(data)
-        
-        # Se não for "ping", processa a mensagem normalmente
-
-        # Adiciona timestamp de chegada à mensagem
-        data = add_timestamp_to_message(data)
+        if frame.kind == MessageType.PING:
+            status = "busy" if self.queue.full() else "free"
+            if self.log_enabled(DEBUG):
+                self.sys_log(f"Queue is {status} {self.queue.qsize()}/{self.max_queue_size} messages", DEBUG)
+            return status
+        if frame.kind == MessageType.STATS:
+            return self.stats(self.queue.qsize())
+        if frame.kind == MessageType.BATCH:
+            return self.handle_batch(decode_batch(data), frame.epoch)
+
+        future = self.enqueue(data)
+        if future is None:
+            if self.log_enabled(DEBUG):
+                self.sys_log(f"Queue is full {self.queue.qsize()}/{self.max_queue_size} messages", DEBUG)
+            return "busy"
+        return self.forward(future.result(), frame.epoch)
+
+    def enqueue(self, data: str) -> Optional[Future]:
+        """
+        Adiciona o timestamp de chegada à mensagem e a coloca na fila de atendimento.
+
+        Args:
+            data (str): A mensagem de dados.
+        Returns:
+            Optional[Future]: Future com o resultado do atendimento, ou None se a fila estiver cheia.
+        """
+        future: Future = Future()
+        try:
+            self.queue.put_nowait((add_timestamp_to_message(data), future))
+        except Full:
+            return None
+        return future
+
+    def stats(self, queued: int) -> str:
+        """
+        Monta a resposta de uma mensagem STATS com a ocupação dos servidores e da fila.
+
+        Args:
+            queued (int): Número de mensagens aguardando na fila.
+        Returns:
+            str: Campos chave=valor separados por ponto e vírgula.
+        """
+        stats = self.occupancy.snapshot()
+        stats["queued"] = queued
+        stats["max_queue_size"] = self.max_queue_size
+        stats.update(self.workload.stats())
+        return ";".join(f"{key}={value}" for key, value in stats.items())
+
+    def handle_batch(self, messages: List[str], epoch: int = 0) -> str:
+        """
+        Trata as mensagens de um BATCH e retorna as respostas agrupadas, na mesma ordem.
+        Todas as mensagens recebem o timestamp de chegada ao mesmo tempo; cada uma entra na fila individualmente
+        (ou é respondida com "busy" se a fila estiver cheia) e recebe o seu timestamp de saída ao ser atendida.
+
+        Args:
+            messages (List[str]): As mensagens de dados do lote.
+            epoch (int): Época da configuração de serviços indicada no lote, repassada ao próximo estágio.
+        Returns:
+            str: As respostas agrupadas.
+        """
+        futures = [self.enqueue(data) for data in messages]
+        replies: List[str] = []
+        for future in futures:
+            if future is None:
+                replies.append("busy")
+                continue
+            try:
+                replies.append(self.forward(future.result(), epoch))
+            except Exception as e:
+                print(f"Erro no Service: {e}")
+                replies.append("error")
+        return encode_batch(replies)
+
+    def forward(self, data: str, epoch: int = 0) -> str:
+        """
+        Encaminha uma mensagem já processada ao próximo estágio do pipeline, se houver,
+        e retorna a resposta dele, com os timestamps dos estágios seguintes.
+
+        Args:
+            data (str): A mensagem com os timestamps deste serviço.
+            epoch (int): Época da configuração de serviços indicada na mensagem, repassada ao próximo estágio.
+        Returns:
+            str: A resposta do próximo estágio, ou a própria mensagem se este for o último estágio.
+        """
+        if not self.next_hops:
+            return data
+        with self._next_hop_lock:
+            ip, port = next(self._next_hop)
+        return self.request(ip, port, data, epoch=epoch)
+
+    def process(self, data: str) -> str:
+        """
+        Executa o atendimento de uma mensagem que já recebeu o timestamp de chegada
+        e adiciona o timestamp de saída. O servidor fica ocupado enquanto executa a carga de trabalho.
+
+        Args:
+            data (str): A mensagem com o timestamp de chegada ao serviço.
+        Returns:
+            str: A mensagem com o timestamp de saída do serviço.
+        """
+        if self.log_enabled(DEBUG):
+            self.sys_log(f"Processing message: {data}", DEBUG)
 
-        print(f"Processing message: {data}")
+        self.occupancy.begin()
+        try:
+            result = self.workload.run(data)
+            if result is not None and self.log_enabled(DEBUG):
+                self.sys_log(result, DEBUG)
+        finally:
+            self.occupancy.end()
 
-        
-        print(
-            self.ia_service.ask("Por que sistemas distribuídos são complexos?")
-        )
-        
         # Adiciona timestamp de envio à mensagem
-        #time.sleep(3)
         data = add_timestamp_to_message(data)
 
-        print(f"Sending message: {data}")
+        if self.log_enabled(DEBUG):
+            self.sys_log(f"Sending message: {data}", DEBUG)
 
         # Envia a mensagem de volta ao cliente
-        client_sock.sendall(data.encode())
-        client_sock.close()
\ No newline at end of file
+        return data
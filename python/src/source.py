@@ -1,11 +1,20 @@
-import socket
-import threading
+import asyncio
+import itertools
 import time
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 
 from src.abstract_proxy import AbstractProxy
+from src.arrivals import ArrivalReport, create_arrivals, run_open_loop_async
+from src.closed_loop import ClosedLoopReport, run_closed_loop
+from src.logger import DEBUG
+from src.protocol import MessageType
+from src.saturation import SaturationResult, SaturationStep, measure_step, search_saturation
+from src.steady_state import WARMUP_METHODS, truncation_point
 from src.utils import get_current_timestamp
 
+# Modos de carga suportados pelo Source
+LOAD_MODES = ("open", "closed", "saturation")
+
 class Source(AbstractProxy):
     """
     Classe responsável por gerar e enviar mensagens para o sistema distribuído.
@@ -16,18 +25,52 @@ class Source(AbstractProxy):
     Args:
         config (Dict[str, Any]): Configurações para a classe Source, incluindo:
             - model_feeding_stage (bool): Indica se está no estágio de alimentação do modelo.
-            - arrival_delay (int): Atraso em milissegundos entre o envio de mensagens.
+            - arrival_delay (float): Intervalo médio, em segundos, entre as chegadas de mensagens.
+            - arrival_process (str): Processo de chegada: deterministic, poisson ou trace.
+            - arrival_rate (float): Taxa de chegada, em mensagens por segundo (padrão: 1 / arrival_delay).
+            - arrival_seed (int): Semente do processo de Poisson.
+            - arrival_trace (str): Arquivo com os instantes de chegada, para o processo trace.
+            - load_mode (str): open (malha aberta, segundo o processo de chegada), closed (clientes virtuais)
+              ou saturation (busca da maior taxa de chegada sustentável).
+            - virtual_users (List[int]): Números de clientes da malha fechada, uma rodada para cada um por ciclo.
+            - think_time_ms (float): Tempo de pensamento médio dos clientes, em milissegundos.
+            - think_time_distribution (str): Distribuição dos tempos de pensamento (ver `src.distributions`).
+            - think_time_seed (int): Semente dos tempos de pensamento.
+            - saturation (Dict[str, Any]): Estratégia, taxas e limites da busca de saturação.
+            - warmup (str): Descarte do aquecimento: none, fixed (as primeiras `warmup_messages` respostas) ou mser5.
+            - warmup_messages (int): Tamanho do aquecimento, para o método fixed.
+            - max_in_flight (int): Número máximo de pedidos em andamento; 0 para nenhum limite.
+            - request_timeout (float): Prazo de cada pedido, em segundos; 0 para nenhum prazo.
             - max_considered_messages_expected (int): Número máximo de mensagens consideradas por ciclo.
             - qtd_services (List[int]): Lista com a quantidade de serviços disponíveis.
             - target_ip (str): IP do destino para envio das mensagens.
             - target_port (int): Porta do destino para envio das mensagens.
+            - connection_pooling (bool): Se True, reaproveita as conexões com os load balancers.
+            - multiplexing (bool): Se True, usa uma única conexão multiplexada com o load balancer.
         Esta classe é responsável por enviar mensagens para um servidor de destino,
         gerenciar ciclos de envio e receber respostas, registrando logs das operações.
         Além disso, ela mantém o controle do estado dos ciclos e mensagens consideradas.
 
     Attributes:
         model_feeding_stage (bool): Indica se está no estágio de alimentação do modelo.
-        arrival_delay (int): Atraso em milissegundos entre o envio de mensagens.
+        arrival_delay (float): Intervalo médio, em segundos, entre as chegadas de mensagens.
+        arrival_process (str): Processo de chegada das mensagens de validação.
+        arrival_rate (float): Taxa de chegada, em mensagens por segundo.
+        arrival_reports (List[ArrivalReport]): Taxas alvo e alcançada e atrasos de envio de cada ciclo.
+        load_mode (str): Modo de carga: open, closed ou saturation.
+        virtual_users (List[int]): Números de clientes da malha fechada.
+        closed_loop_reports (Dict[int, List[ClosedLoopReport]]): Rodadas em malha fechada, pela quantidade de serviços.
+        saturation (Dict[str, Any]): Configuração da busca de saturação.
+        saturation_results (Dict[int, SaturationResult]): Resultado da busca de saturação, pela quantidade de serviços.
+        response_times (List[float]): Tempos de resposta, em segundos, das mensagens respondidas desde o início da rodada.
+        response_indexes (List[int]): Índice de envio da mensagem de cada tempo de resposta em `response_times`.
+        warmup (str): Método de descarte do aquecimento.
+        warmup_messages (int): Tamanho do aquecimento, para o método fixed.
+        warmup_discarded (List[int]): Respostas descartadas como aquecimento em cada ciclo.
+        max_in_flight (int): Número máximo de pedidos em andamento.
+        request_timeout (float): Prazo de cada pedido, em segundos.
+        throttled_count (int): Mensagens do ciclo atual que esperaram por uma vaga em `max_in_flight`.
+        timeout_count (int): Mensagens do ciclo atual sem resposta dentro do prazo.
         max_considered_messages_expected (int): Número máximo de mensagens consideradas por ciclo.
         source_current_index_message (int): Índice atual da mensagem a ser enviada.
         considered_messages (List[str]): Lista de mensagens consideradas.
@@ -42,21 +85,62 @@ class Source(AbstractProxy):
         run(): Inicia o processo de envio de mensagens.
         send_message_feeding_stage(): Envia mensagens no estágio de alimentação do modelo.
         send_messages_validation_stage(): Envia mensagens no estágio de validação.
+        service_addresses_for(lb_port: int): Retorna os endereços dos serviços de um load balancer.
         send_message_to_configure_server(config_message: str): Envia uma mensagem de configuração ao servidor.
         send(msg: str): Envia uma mensagem para o destino especificado.
-        send_and_receive(msg: str, cycle: int): Envia uma mensagem e aguarda a resposta do servidor.
+        configure_cycle(cycle: int): Envia a configuração de serviços do ciclo aos load balancers.
+        run_closed_loop_cycle(cycle: int, qts: int, epoch: int): Envia as mensagens de um ciclo em malha fechada.
+        run_saturation_cycle(cycle: int, qts: int, epoch: int): Procura a maior taxa de chegada sustentável de um ciclo.
+        round_messages(): Retorna o número de mensagens enviadas em cada rodada, incluindo o aquecimento fixo.
+        discard_warmup(start: int): Descarta as respostas do aquecimento da rodada atual.
+        send_and_receive_to_lb_async(ip: str, port: int, cycle: int, epoch: int): Envia uma mensagem e aguarda a resposta do load balancer.
     """
 
     def __init__(self, config: Dict[str, Any]) -> None:
-        super().__init__()
+        super().__init__(
+            pooling=config.get("connection_pooling", True),
+            multiplexing=config.get("multiplexing", False),
+        )
         self.model_feeding_stage: bool = config.get("model_feeding_stage", False)
-        self.arrival_delay: int = config.get("arrival_delay", 0)
+        self.arrival_delay: float = config.get("arrival_delay", 0)
+        self.arrival_process: str = config.get("arrival_process", "deterministic")
+        self.arrival_rate: float = config.get("arrival_rate") or (1 / self.arrival_delay if self.arrival_delay else 0)
+        self.arrival_seed: Optional[int] = config.get("arrival_seed")
+        self.arrival_trace: Optional[str] = config.get("arrival_trace")
+        self.arrival_reports: List[ArrivalReport] = []
+        self.load_mode: str = config.get("load_mode", "open")
+        if self.load_mode not in LOAD_MODES:
+            raise ValueError(f"Modo de carga desconhecido: {self.load_mode}. Use {', '.join(LOAD_MODES)}.")
+        self.virtual_users: List[int] = config.get("virtual_users", [1])
+        self.think_time_ms: float = config.get("think_time_ms", 0)
+        self.think_time_distribution: str = config.get("think_time_distribution", "exponential")
+        self.think_time_seed: Optional[int] = config.get("think_time_seed")
+        self.closed_loop_reports: Dict[int, List[ClosedLoopReport]] = {}
+        self.saturation: Dict[str, Any] = config.get("saturation", {})
+        self.saturation_results: Dict[int, SaturationResult] = {}
+        if self.load_mode == "saturation" and self.arrival_process == "trace":
+            raise ValueError("A busca de saturação exige um processo de chegada com taxa: deterministic ou poisson.")
+        self.response_times: List[float] = []
+        self.response_indexes: List[int] = []
+        self.warmup: str = config.get("warmup", "none")
+        if self.warmup not in WARMUP_METHODS:
+            raise ValueError(f"Método de aquecimento desconhecido: {self.warmup}. Use {', '.join(WARMUP_METHODS)}.")
+        self.warmup_messages: int = config.get("warmup_messages", 0)
+        self.warmup_discarded: List[int] = []
+        self.max_in_flight: int = config.get("max_in_flight", 0)
+        self.request_timeout: float = config.get("request_timeout", 0)
+        self.throttled_count: int = 0
+        self.timeout_count: int = 0
         self.max_considered_messages_expected: int = config.get("max_considered_messages_expected", 10)
         self.source_current_index_message: int = 0
         self.considered_messages: List[str] = []
         self.qtd_services: List[int] = config.get("qtd_services", [])
         self.cycles_completed: List[bool] = [False] * len(self.qtd_services)
         self.dropp_count: int = 0
+        self.target_ip: str = config.get("target_ip", "localhost")
+        self.target_port: int = config.get("target_port", 2000)
+        # Épocas crescentes entre execuções, para que o load balancer reconheça um Source reiniciado
+        self.config_epoch_base: int = int(time.time())
         self.loadbalancer_addresses = config.get("loadbalancer_addresses", "")
         if isinstance(self.loadbalancer_addresses, str):
             self.loadbalancer_addresses = [
@@ -113,13 +197,20 @@ class Source(AbstractProxy):
     def send_messages_validation_stage(self) -> None:
         """
         Envia mensagens no estágio de validação.
-        Neste estágio, as mensagens são enviadas em ciclos,
-        com um atraso definido entre cada envio.
-        O método `send_message_to_configure_server` é chamado para enviar a configuração do servidor.
-        O método `send_and_receive` é chamado para enviar mensagens e aguardar as respostas.
-        O índice da mensagem é incrementado a cada envio.
-        O método `get_current_timestamp` é utilizado para obter o timestamp atual
-        e incluir na mensagem enviada.
+        Neste estágio, as mensagens são enviadas em ciclos. Em malha aberta (`load_mode` open), cada mensagem é enviada
+        no seu instante de chegada (determinístico, de Poisson ou de um arquivo), contado de um início fixo,
+        sem esperar pelas respostas. Ao final de cada ciclo, a taxa alcançada e os atrasos de envio são registrados.
+        Em malha fechada (`load_mode` closed), cada ciclo tem uma rodada para cada número de clientes em `virtual_users`,
+        e a vazão e o tempo de resposta de cada rodada são registrados.
+        Na busca de saturação (`load_mode` saturation), cada ciclo tem rodadas em malha aberta com taxas crescentes,
+        até que um dos limites seja ultrapassado, e a maior vazão sustentável é registrada.
+        As primeiras respostas de cada rodada podem ser descartadas como aquecimento (`warmup`), em número fixo
+        ou pela regra MSER-5; só as seguintes entram nas mensagens consideradas e nos tempos de resposta.
+        Os envios de todos os ciclos são tarefas de um único event loop, e não threads; no máximo `max_in_flight`
+        pedidos ficam em andamento ao mesmo tempo e cada pedido tem o prazo de `request_timeout` segundos.
+        O método `send_message_to_configure_server` é chamado uma vez por ciclo e por load balancer
+        para enviar a configuração dos serviços, identificada pela época do ciclo.
+        O método `send_and_receive_to_lb_async` é chamado para enviar mensagens e aguardar as respostas.
 
         Args:
             None
@@ -127,71 +218,320 @@ class Source(AbstractProxy):
             None
         """
         self.sys_log(F"Validation Stage Started: TO {self.qtd_services} services")
-        for cycle, qts in enumerate(self.qtd_services):
-            self.source_current_index_message = 1
-            self.considered_messages.clear()
-
-            # Distribui as mensagens entre os load balancers
-            num_balancers = len(self.loadbalancer_addresses)
-            self.sys_log("Load Balances available: " + str(self.loadbalancer_addresses))
-            start_time = time.time()
-            #timeout = 10  # segundos
-            threads: list[threading.Thread] = []
-            self.sys_log(f"Starting cycle {cycle} with {qts} services")
-            self.sys_log(f"Max considered messages expected: {self.max_considered_messages_expected}")
-            for i in range(self.max_considered_messages_expected):
-                # Escolhe o load balancer de forma round-robin
-                lb_ip, lb_port = self.loadbalancer_addresses[i % num_balancers]
-                self.sys_log(f"Sending message to load balancer {lb_ip}:{lb_port} in cycle {cycle}")
-                # TODO: GAMBIARRA DNV, DESGRAAAA
-                if lb_port == 3000:
-                    service_addresses = [
-                        "service1:3001",
-                        "service2:3002",
-                        "service3:3003",
-                        "service4:3004"
-                    ]
-                elif lb_port == 3100:
-                    service_addresses = [
-                        "service11:3101",
-                        "service12:3102",
-                        "service13:3103",
-                        "service14:3104"
-                    ]
+        asyncio.run(self.run_validation_cycles())
+
+    async def run_validation_cycles(self) -> None:
+        """
+        Executa os ciclos do estágio de validação no event loop e fecha as conexões ao final.
+        Cada ciclo configura os load balancers e envia as suas mensagens em malha aberta ou fechada, conforme `load_mode`.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        slots = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight > 0 else None
+        try:
+            for cycle, qts in enumerate(self.qtd_services):
+                self.source_current_index_message = 1
+                self.considered_messages.clear()
+                self.response_times.clear()
+                self.response_indexes.clear()
+                self.throttled_count = 0
+                self.timeout_count = 0
+                self.sys_log("Load Balances available: " + str(self.loadbalancer_addresses))
+                self.sys_log(f"Starting cycle {cycle} with {qts} services")
+                self.sys_log(f"Max considered messages expected: {self.max_considered_messages_expected}")
+                epoch = self.configure_cycle(cycle)
+                if self.load_mode == "closed":
+                    discarded = await self.run_closed_loop_cycle(cycle, qts, epoch)
+                elif self.load_mode == "saturation":
+                    discarded = await self.run_saturation_cycle(cycle, qts, epoch, slots)
                 else:
-                    self.sys_log(f"Unsupported load balancer port: {lb_port}")
-                    raise ValueError(f"Unsupported load balancer port: {lb_port}")
-                config_message = "config;" + ",".join(service_addresses[0:cycle+1])
-                self.sys_log(f"Sending config message to {lb_ip}:{lb_port}: {config_message}")
+                    await self.run_validation_cycle(cycle, epoch, slots)
+                    discarded = self.discard_warmup()
+                self.warmup_discarded.append(discarded)
+                self.cycles_completed[cycle] = True
+                self.log(
+                    f"Ciclo {cycle} finalizado: {len(self.considered_messages)} respostas, "
+                    f"{discarded} descartadas como aquecimento ({self.warmup}), "
+                    f"{self.throttled_count} mensagens aguardaram vaga em max_in_flight, "
+                    f"{self.timeout_count} sem resposta no prazo."
+                )
+        finally:
+            self.async_pool.close()
+            if self.async_mux is not None:
+                self.async_mux.close()
+        if self.load_mode == "closed":
+            self.log("Vazão e tempo de resposta por número de clientes (malha fechada):")
+            for qts, reports in self.closed_loop_reports.items():
+                for report in reports:
+                    self.log(f"  {qts} serviços, {report}")
+        if self.load_mode == "saturation":
+            self.log("Vazão máxima sustentável por quantidade de serviços:")
+            for result in self.saturation_results.values():
+                self.log(f"  {result}")
+
+    def configure_cycle(self, cycle: int) -> int:
+        """
+        Envia a configuração de serviços do ciclo uma única vez a cada load balancer, com a época do ciclo;
+        as mensagens de dados levam a época e o load balancer troca o conjunto na primeira delas.
+        O envio bloqueia o event loop, mas nenhum pedido está em andamento entre os ciclos.
+
+        Args:
+            cycle (int): Índice do ciclo.
+        Returns:
+            int: A época do ciclo.
+        """
+        epoch = self.config_epoch_base + cycle
+        for lb_ip, lb_port in dict.fromkeys(self.loadbalancer_addresses):
+            config_message = ",".join(self.service_addresses_for(lb_port)[0:cycle+1])
+            self.send_message_to_configure_server(f"{epoch};{config_message}", lb_ip, lb_port)
+        return epoch
+
+    async def run_validation_cycle(
+        self, cycle: int, epoch: int, slots: Optional[asyncio.Semaphore], rate: Optional[float] = None
+    ) -> ArrivalReport:
+        """
+        Envia as mensagens de um ciclo em malha aberta e aguarda todas as respostas.
+
+        Args:
+            cycle (int): Índice do ciclo.
+            epoch (int): Época da configuração de serviços do ciclo.
+            slots (Optional[asyncio.Semaphore]): Vagas de pedidos em andamento; None para nenhum limite.
+            rate (Optional[float]): Taxa de chegada, em mensagens por segundo; None usa `arrival_rate`.
+        Returns:
+            ArrivalReport: Taxas alvo e alcançada e atrasos de envio.
+        """
+        # Distribui as mensagens entre os load balancers
+        num_balancers = len(self.loadbalancer_addresses)
+        tasks: List[asyncio.Task] = []
+
+        def send(i: int) -> None:
+            # Escolhe o load balancer de forma round-robin
+            lb_ip, lb_port = self.loadbalancer_addresses[i % num_balancers]
+            if self.log_enabled(DEBUG):
+                self.sys_log(f"Sending message to load balancer {lb_ip}:{lb_port} in cycle {cycle}", DEBUG)
+            tasks.append(asyncio.create_task(self.send_and_receive_to_lb_async(lb_ip, lb_port, cycle, epoch, slots)))
+
+        arrival_rate = self.arrival_rate if rate is None else rate
+        arrivals = create_arrivals(self.arrival_process, arrival_rate, self.arrival_seed, self.arrival_trace)
+        report = await run_open_loop_async(arrivals, self.round_messages(), send)
+        self.arrival_reports.append(report)
+        self.log(f"Ciclo {cycle} ({self.arrival_process}): {report}")
+
+        await asyncio.gather(*tasks)
+        return report
+
+    async def run_closed_loop_cycle(self, cycle: int, qts: int, epoch: int) -> int:
+        """
+        Envia as mensagens de um ciclo em malha fechada, uma rodada para cada número de clientes em `virtual_users`.
+        Cada rodada envia `max_considered_messages_expected` mensagens, mais o aquecimento fixo; os clientes escolhem
+        o load balancer de forma round-robin pelo índice da mensagem e esperam um tempo de pensamento entre uma resposta
+        e o próximo envio. O aquecimento de cada rodada fica fora dos seus tempos de resposta.
+
+        Args:
+            cycle (int): Índice do ciclo.
+            qts (int): Quantidade de serviços do ciclo.
+            epoch (int): Época da configuração de serviços do ciclo.
+        Returns:
+            int: Respostas descartadas como aquecimento, somadas as rodadas.
+        """
+        num_balancers = len(self.loadbalancer_addresses)
+        think = self.think_time_sampler()
+
+        async def request(i: int) -> bool:
+            lb_ip, lb_port = self.loadbalancer_addresses[i % num_balancers]
+            response = await self.exchange_with_lb(lb_ip, lb_port, cycle, epoch)
+            return response is not None and response != "busy"
+
+        reports = self.closed_loop_reports.setdefault(qts, [])
+        discarded = 0
+        for users in self.virtual_users:
+            # O aquecimento é escolhido sobre os tempos de resposta da rodada registrados pelo Source, na ordem de envio,
+            # a mesma em que run_closed_loop ordena os seus, e sai também das mensagens consideradas
+            start = len(self.considered_messages)
+            self.response_times.clear()
+            self.response_indexes.clear()
+            truncate = lambda response_times: self.discard_warmup(start)
+            report = await run_closed_loop(users, self.round_messages(), request, think, truncate)
+            reports.append(report)
+            discarded += report.discarded
+            self.log(f"Ciclo {cycle} (closed, {qts} serviços): {report}")
+        return discarded
+
+    async def run_saturation_cycle(self, cycle: int, qts: int, epoch: int, slots: Optional[asyncio.Semaphore]) -> int:
+        """
+        Procura a maior taxa de chegada sustentável do ciclo com a estratégia de `saturation` (step ou binary).
+        Cada rodada envia `max_considered_messages_expected` mensagens em malha aberta, mais o aquecimento fixo,
+        na taxa da rodada, e é sustentável se o tempo de resposta médio, o p99, a fração de descartes e a vazão
+        ficam dentro dos limites. O aquecimento de cada rodada fica fora dos seus tempos de resposta.
+
+        Args:
+            cycle (int): Índice do ciclo.
+            qts (int): Quantidade de serviços do ciclo.
+            epoch (int): Época da configuração de serviços do ciclo.
+            slots (Optional[asyncio.Semaphore]): Vagas de pedidos em andamento; None para nenhum limite.
+        Returns:
+            int: Respostas descartadas como aquecimento, somadas as rodadas.
+        """
+        steps: List[SaturationStep] = []
+        discarded = 0
+
+        async def trial(rate: float) -> SaturationStep:
+            nonlocal discarded
+            self.response_times.clear()
+            self.response_indexes.clear()
+            start = len(self.considered_messages)
+            started = time.monotonic()
+            report = await self.run_validation_cycle(cycle, epoch, slots, rate)
+            duration = time.monotonic() - started
+            warmup = self.discard_warmup(start)
+            discarded += warmup
+            step = measure_step(
+                rate,
+                report.sent,
+                self.response_times,
+                duration,
+                max_mrt_ms=self.saturation.get("max_mrt_ms"),
+                max_p99_ms=self.saturation.get("max_p99_ms"),
+                max_drop_rate=self.saturation.get("max_drop_rate"),
+                min_throughput_ratio=self.saturation.get("min_throughput_ratio"),
+                discarded=warmup,
+            )
+            steps.append(step)
+            self.log(f"Ciclo {cycle} (saturation, {qts} serviços): {step}")
+            return step
 
-                self.send_message_to_configure_server(config_message, lb_ip, lb_port)
+        best = await search_saturation(
+            trial,
+            search=self.saturation.get("search", "step"),
+            start_rate=self.saturation.get("start_rate", 10),
+            rate_step=self.saturation.get("rate_step", 10),
+            max_rate=self.saturation.get("max_rate", 1000),
+            resolution=self.saturation.get("resolution", 5),
+        )
+        result = SaturationResult(qts, best, steps)
+        self.saturation_results[qts] = result
+        self.log(f"Ciclo {cycle} (saturation): {result}")
+        return discarded
 
-                msg = f"{cycle};{self.source_current_index_message};{get_current_timestamp()}"
-                t = threading.Thread(target=self.send_and_receive_to_lb, args=(lb_ip, lb_port, msg, cycle))
-                t.start()
-                threads.append(t)
-                self.source_current_index_message += 1
-                time.sleep(self.arrival_delay)
+    def round_messages(self) -> int:
+        """
+        Retorna o número de mensagens enviadas em cada rodada: as consideradas mais o aquecimento, se ele for fixo.
+        Com MSER-5, o tamanho do aquecimento só é conhecido depois da rodada, e ele sai das consideradas.
+
+        Args:
+            None
+        Returns:
+            int: O número de mensagens.
+        """
+        if self.warmup == "fixed":
+            return self.max_considered_messages_expected + self.warmup_messages
+        return self.max_considered_messages_expected
+
+    def discard_warmup(self, start: int = 0) -> int:
+        """
+        Descarta as respostas do aquecimento da rodada atual, segundo `warmup`.
+        O ponto de truncamento é calculado sobre os tempos de resposta da rodada na ordem de envio das mensagens,
+        e não na ordem em que as respostas chegaram, em que respostas rápidas de mensagens tardias ultrapassam
+        as lentas do início. As respostas das primeiras mensagens enviadas saem de `response_times` e de
+        `considered_messages` (a partir de `start`); ao final, `response_times` fica na ordem de envio.
+
+        Args:
+            start (int): Posição em `considered_messages` da primeira resposta da rodada.
+        Returns:
+            int: Número de respostas descartadas.
+        """
+        order = sorted(range(len(self.response_times)), key=self.response_indexes.__getitem__)
+        self.response_times[:] = [self.response_times[k] for k in order]
+        self.response_indexes[:] = [self.response_indexes[k] for k in order]
+        discarded = truncation_point(self.response_times, self.warmup, self.warmup_messages)
+        if discarded == 0:
+            return 0
+        # As respostas que não são "busy" estão em `considered_messages` na ordem de chegada, a mesma de `order`
+        warmup = set(order[:discarded])
+        answered = itertools.count()
+        self.considered_messages[start:] = [
+            response for response in self.considered_messages[start:]
+            if response == "busy" or next(answered) not in warmup
+        ]
+        del self.response_times[:discarded]
+        del self.response_indexes[:discarded]
+        return discarded
 
-            for t in threads:
-                #t.join(timeout=max(0, timeout - (time.time() - start_time)))
-                t.join()
+    def think_time_sampler(self) -> Callable[[], float]:
+        """
+        Cria o gerador dos tempos de pensamento dos clientes em malha fechada.
+        Os tempos são amostrados de `think_time_distribution`, com média `think_time_ms`;
+        o NumPy só é carregado quando há tempo de pensamento.
 
-            self.cycles_completed[cycle] = True
-            self.log(f"Ciclo {cycle} finalizado.")
+        Args:
+            None
+        Returns:
+            Callable[[], float]: Retorna o próximo tempo de pensamento, em segundos.
+        """
+        if self.think_time_ms <= 0:
+            return lambda: 0.0
+        from src.distributions import create_distribution
+
+        distribution = create_distribution(self.think_time_distribution, self.think_time_ms, seed=self.think_time_seed)
+        return lambda: distribution.sample() / 1000
+
+    def service_addresses_for(self, lb_port: int) -> List[str]:
+        """
+        Retorna os endereços dos serviços atendidos pelo load balancer da porta informada.
+
+        Args:
+            lb_port (int): Porta do load balancer.
+        Returns:
+            List[str]: Endereços no formato host:porta.
+        """
+        # TODO: GAMBIARRA DNV, DESGRAAAA
+        if lb_port == 3000:
+            return [
+                "service1:3001",
+                "service2:3002",
+                "service3:3003",
+                "service4:3004"
+            ]
+        elif lb_port == 3100:
+            return [
+                "service11:3101",
+                "service12:3102",
+                "service13:3103",
+                "service14:3104"
+            ]
+        self.sys_log(f"Unsupported load balancer port: {lb_port}")
+        raise ValueError(f"Unsupported load balancer port: {lb_port}")
 
     def send_message_to_configure_server(self, config_message: str, ip: str, port: int) -> None:
+        """
+        Envia a configuração de serviços ao load balancer e confere a confirmação.
+        Com época (`época;endereços`), o load balancer confirma com `ok;época`.
+
+        Args:
+            config_message (str): Época opcional e endereços dos serviços no formato host:porta separados por vírgula.
+            ip (str): IP do load balancer.
+            port (int): Porta do load balancer.
+        Returns:
+            None
+        """
+        epoch, separator, _ = config_message.rpartition(";")
+        expected = f"ok;{epoch}" if separator else "ok"
+        if self.log_enabled(DEBUG):
+            self.sys_log(f"Sending config message to {ip}:{port}: {config_message}", DEBUG)
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((ip, port))
-                s.sendall(config_message.encode())
+            response = self.request(ip, port, config_message, MessageType.CONFIG)
+            if response != expected:
+                self.log(f"Configuração não confirmada por {ip}:{port}: {response}")
         except Exception as e:
             self.log(f"Erro ao enviar mensagem de configuração para {ip}:{port}: {e}")
 
     def send(self, msg: str) -> None:
         """
         Envia uma mensagem para o destino especificado.
-        O método utiliza um socket TCP para enviar a mensagem.
+        O método utiliza uma conexão do pool para enviar a mensagem e descarta a resposta.
         O IP e a porta do destino são definidos nas configurações da classe.
         O método `get_current_timestamp` é utilizado para obter o timestamp atual
         e incluir na mensagem enviada.
@@ -202,19 +542,65 @@ class Source(AbstractProxy):
             None
         """
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((self.target_ip, self.target_port))
-                s.sendall(msg.encode())
+            self.request(self.target_ip, self.target_port, msg)
         except Exception as e:
             self.log(f"Erro ao enviar mensagem: {e}")
 
-    def send_and_receive_to_lb(self, ip: str, port: int, msg: str, cycle: int) -> None:
+    async def send_and_receive_to_lb_async(
+        self, ip: str, port: int, cycle: int, epoch: int = 0, slots: Optional[asyncio.Semaphore] = None
+    ) -> None:
+        """
+        Envia uma mensagem de dados ao load balancer e aguarda a resposta, dentro do prazo `request_timeout`.
+        Com `slots`, o envio aguarda uma vaga de pedido em andamento; o índice e o timestamp da mensagem
+        só são definidos depois disso, então a espera no Source não entra no tempo de resposta medido.
+        Uma mensagem sem resposta no prazo é contada como descartada.
+
+        Args:
+            ip (str): IP do load balancer.
+            port (int): Porta do load balancer.
+            cycle (int): Índice do ciclo.
+            epoch (int): Época da configuração de serviços do ciclo.
+            slots (Optional[asyncio.Semaphore]): Vagas de pedidos em andamento; None para nenhum limite.
+        Returns:
+            None
+        """
+        if slots is None:
+            await self.exchange_with_lb(ip, port, cycle, epoch)
+            return
+        if slots.locked():
+            self.throttled_count += 1
+        async with slots:
+            await self.exchange_with_lb(ip, port, cycle, epoch)
+
+    async def exchange_with_lb(self, ip: str, port: int, cycle: int, epoch: int) -> Optional[str]:
+        """
+        Envia a próxima mensagem de dados do ciclo ao load balancer e aguarda a resposta, dentro do prazo `request_timeout`.
+
+        Args:
+            ip (str): IP do load balancer.
+            port (int): Porta do load balancer.
+            cycle (int): Índice do ciclo.
+            epoch (int): Época da configuração de serviços do ciclo.
+        Returns:
+            Optional[str]: A resposta, ou None se não houve resposta no prazo ou o envio falhou.
+        """
+        index = self.source_current_index_message
+        msg = f"{cycle};{index};{get_current_timestamp()}"
+        self.source_current_index_message += 1
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((ip, port))
-                s.sendall(msg.encode())
-                response = s.recv(1024).decode()
-                self.considered_messages.append(response)
-                self.log(f"Recebido de {ip}:{port} no ciclo {cycle}: {response}")
+            sent = time.monotonic()
+            request = self.request_async(ip, port, msg, epoch=epoch)
+            response = await (asyncio.wait_for(request, self.request_timeout) if self.request_timeout > 0 else request)
+            if response != "busy":
+                self.response_times.append(time.monotonic() - sent)
+                self.response_indexes.append(index)
+            self.considered_messages.append(response)
+            self.log(f"Recebido de {ip}:{port} no ciclo {cycle}: {response}")
+            return response
+        except asyncio.TimeoutError:
+            self.timeout_count += 1
+            self.dropp_count += 1
+            self.log(f"Sem resposta de {ip}:{port} no ciclo {cycle} em {self.request_timeout} s: {msg}")
         except Exception as e:
             self.log(f"Erro ao enviar/receber mensagem para {ip}:{port}: {e}")
+        return None
@@ -0,0 +1,57 @@
+from typing import List
+
+# Métodos de descarte do aquecimento suportados pelo Source
+WARMUP_METHODS = ("none", "fixed", "mser5")
+
+
+def mser_truncation(values: List[float], batch_size: int = 5) -> int:
+    """
+    Ponto de truncamento pela regra MSER (Marginal Standard Error Rule) com médias de lotes de `batch_size`
+    observações (MSER-5, por padrão).
+    Para cada número d de lotes descartados do início, calcula o erro padrão marginal das médias restantes,
+    soma dos quadrados dos desvios / (k - d)², e escolhe o d que o minimiza. Apenas a primeira metade da série
+    é considerada, como na regra original, para que o descarte não se apoie em um final curto demais.
+    Observações que não completam um lote no final da série são ignoradas no cálculo.
+
+    Args:
+        values (List[float]): Observações, na ordem em que ocorreram.
+        batch_size (int): Número de observações de cada lote.
+    Returns:
+        int: Número de observações a descartar do início (múltiplo de `batch_size`).
+    """
+    batches = len(values) // batch_size
+    if batches < 2:
+        return 0
+    means = [sum(values[i * batch_size:(i + 1) * batch_size]) / batch_size for i in range(batches)]
+    # Somas dos sufixos, para calcular o erro de todos os pontos de truncamento em uma única passada
+    total = sum(means)
+    squares = sum(mean * mean for mean in means)
+    best_d, best_error = 0, float("inf")
+    for d in range(batches // 2 + 1):
+        remaining = batches - d
+        error = (squares - total * total / remaining) / (remaining * remaining)
+        if error < best_error:
+            best_d, best_error = d, error
+        total -= means[d]
+        squares -= means[d] * means[d]
+    return best_d * batch_size
+
+
+def truncation_point(values: List[float], method: str = "none", warmup_messages: int = 0) -> int:
+    """
+    Número de observações do início da série que pertencem ao aquecimento.
+
+    Args:
+        values (List[float]): Observações, na ordem em que ocorreram.
+        method (str): none (nenhum descarte), fixed (as primeiras `warmup_messages`) ou mser5 (regra MSER-5).
+        warmup_messages (int): Tamanho do aquecimento, para o método fixed.
+    Returns:
+        int: Número de observações a descartar.
+    """
+    if method == "none":
+        return 0
+    if method == "fixed":
+        return min(warmup_messages, len(values))
+    if method == "mser5":
+        return mser_truncation(values)
+    raise ValueError(f"Método de aquecimento desconhecido: {method}. Use {', '.join(WARMUP_METHODS)}.")
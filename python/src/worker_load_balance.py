@@ -0,0 +1,265 @@
+import copy
+import json
+import multiprocessing
+import queue
+import signal
+import sys
+from typing import Dict, Iterator, List, Optional
+
+from src.abstract_proxy import AbstractProxy
+from src.dispatch import RoundRobinPolicy
+from src.load_balance import LoadBalancer
+from src.logger import WARNING, close_writers
+
+STATS_TIMEOUT = 5
+# Espera, em segundos, pelo fim de um worker depois do SIGTERM, antes de encerrá-lo com SIGKILL
+WORKER_EXIT_TIMEOUT = 5
+
+
+class SharedTopologies:
+    """
+    Configurações de serviços por época, compartilhadas entre os processos workers do LoadBalancer.
+    Substitui o dicionário `LoadBalancer.topologies`: uma configuração recebida por um worker
+    fica visível para os demais, que a ativam quando recebem a primeira mensagem de dados com a sua época.
+    As configurações são guardadas como JSON em um bloco de memória compartilhada criado antes do fork.
+    Cada worker usa a sua visão (`worker`), que registra a época ativa do worker: uma época só é descartada
+    quando todos os workers já ativaram uma época mais nova, pois os demais ainda podem precisar dela.
+
+    Args:
+        context (multiprocessing.context.BaseContext): Contexto de multiprocessing usado para criar os workers.
+        workers (int): Número de workers.
+        size (int): Tamanho, em bytes, do bloco de memória compartilhada.
+    Returns:
+        None
+    """
+    def __init__(self, context, workers: int = 1, size: int = 64 * 1024):
+        self.size = size
+        self.index = 0
+        self._buffer = context.Array('c', size)
+        # Época ativa de cada worker, protegida pelo lock de `_buffer`
+        self._active = context.Array('q', workers, lock=False)
+
+    def worker(self, index: int) -> "SharedTopologies":
+        """
+        Visão das configurações compartilhadas usada pelo worker de índice informado.
+
+        Args:
+            index (int): Índice do worker.
+        Returns:
+            SharedTopologies: Visão que compartilha as configurações e registra a época ativa do worker.
+        """
+        view = copy.copy(self)
+        view.index = index
+        return view
+
+    def _load(self) -> Dict[int, List[tuple]]:
+        raw = self._buffer.value
+        if not raw:
+            return {}
+        return {int(epoch): [tuple(address) for address in addresses] for epoch, addresses in json.loads(raw).items()}
+
+    def _store(self, topologies: Dict[int, List[tuple]]) -> None:
+        raw = json.dumps(topologies).encode()
+        if len(raw) >= self.size:
+            raise ValueError(f"Configurações de serviços excedem {self.size} bytes")
+        self._buffer.value = raw
+
+    def get(self, epoch: int, default: Optional[List[tuple]] = None) -> Optional[List[tuple]]:
+        with self._buffer.get_lock():
+            return self._load().get(epoch, default)
+
+    def __setitem__(self, epoch: int, addresses: List[tuple]) -> None:
+        with self._buffer.get_lock():
+            topologies = self._load()
+            topologies[epoch] = addresses
+            self._store(topologies)
+
+    def __delitem__(self, epoch: int) -> None:
+        with self._buffer.get_lock():
+            topologies = self._load()
+            del topologies[epoch]
+            self._store(topologies)
+
+    def __iter__(self) -> Iterator[int]:
+        with self._buffer.get_lock():
+            return iter(list(self._load()))
+
+    def discard_before(self, epoch: int) -> None:
+        """
+        Registra a época ativada por este worker e descarta as configurações de épocas anteriores
+        à mais antiga ainda ativa entre os workers.
+
+        Args:
+            epoch (int): Época ativada por este worker.
+        Returns:
+            None
+        """
+        with self._buffer.get_lock():
+            self._active[self.index] = epoch
+            oldest = min(self._active)
+            topologies = self._load()
+            if any(old < oldest for old in topologies):
+                self._store({old: addresses for old, addresses in topologies.items() if old >= oldest})
+
+    def clear(self) -> None:
+        with self._buffer.get_lock():
+            self._buffer.value = b""
+            for index in range(len(self._active)):
+                self._active[index] = 0
+
+
+def partition(total: int, workers: int, index: int) -> int:
+    """
+    Divide um limite global entre os workers, distribuindo o resto entre os primeiros.
+
+    Args:
+        total (int): O limite global.
+        workers (int): Número de workers.
+        index (int): Índice do worker.
+    Returns:
+        int: A parte do limite que cabe ao worker.
+    """
+    return total // workers + (1 if index < total % workers else 0)
+
+
+def run_worker(index: int, lb: LoadBalancer, stats_queue) -> None:
+    """
+    Corpo de um processo worker: atende conexões até ser encerrado e então publica os seus contadores.
+
+    Args:
+        index (int): Índice do worker.
+        lb (LoadBalancer): O LoadBalancer do worker, criado pelo processo principal antes do fork.
+        stats_queue (multiprocessing.Queue): Fila onde os contadores do worker são publicados ao final.
+    Returns:
+        None
+    """
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        lb.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        stats_queue.put((index, lb.tracker.snapshot()))
+        # Processos do multiprocessing terminam sem executar os handlers de atexit
+        close_writers()
+
+
+class LoadBalancerWorkers(AbstractProxy):
+    """
+    Executa o LoadBalancer em vários processos, contornando o limite de um único núcleo imposto pelo GIL.
+    Cada worker é um processo com o seu próprio LoadBalancer (com threads ou asyncio), todos escutando
+    na mesma porta com SO_REUSEPORT, de modo que o kernel distribui as conexões entre eles.
+    O estado de despacho é particionado: cada worker recebe uma fração disjunta da capacidade de cada serviço
+    e da fila de espera, então os limites globais continuam valendo sem coordenação entre os processos.
+    No round-robin, cada worker começa em um serviço diferente, espalhando as primeiras escolhas.
+    Pela mesma razão, os pedidos em andamento e a fila vistos por least_outstanding e power_of_two são os do
+    próprio worker, não a carga global de cada serviço: com poucos workers a escolha segue próxima da global,
+    mas um serviço pode estar livre para um worker e ocupado pelos pedidos de outro.
+    As configurações de serviços com época são compartilhadas entre os workers por memória compartilhada,
+    e uma época só é descartada depois que todos os workers ativaram uma mais nova.
+    Configurações sem época chegariam apenas ao worker escolhido pelo kernel e, por isso, são recusadas.
+    Ao encerrar, os contadores de cada worker são coletados e registrados, junto com o total.
+
+    Args:
+        workers (int): Número de processos workers.
+        lb_class (type): Classe do LoadBalancer de cada worker (LoadBalancer ou AsyncLoadBalancer).
+        **kwargs: Argumentos do LoadBalancer (listen_port, service_addresses, service_capacity, queue_max_size, ...).
+    Returns:
+        None
+    """
+    def __init__(self, workers: int, lb_class: type = LoadBalancer, **kwargs):
+        super().__init__()
+        service_capacity = kwargs.get("service_capacity", 10)
+        if workers < 1:
+            raise ValueError("O número de workers deve ser pelo menos 1.")
+        if service_capacity < workers:
+            raise ValueError(f"service_capacity ({service_capacity}) deve ser pelo menos o número de workers ({workers}).")
+        self.workers = workers
+        self.listen_port = kwargs["listen_port"]
+        self.context = multiprocessing.get_context("fork")
+        self.topologies = SharedTopologies(self.context, workers)
+        self.stats_queue = self.context.Queue()
+        self.balancers: List[LoadBalancer] = []
+        for index in range(workers):
+            worker_kwargs = dict(
+                kwargs,
+                service_capacity=partition(service_capacity, workers, index),
+                queue_max_size=partition(kwargs.get("queue_max_size", 0), workers, index),
+            )
+            lb = lb_class(**worker_kwargs)
+            lb.reuse_port = True
+            lb.topologies = self.topologies.worker(index)
+            if isinstance(lb.tracker.policy, RoundRobinPolicy):
+                lb.tracker.policy = RoundRobinPolicy(start=index)
+            self.balancers.append(lb)
+
+    def start(self):
+        """
+        Inicia os workers e aguarda o seu término. Ao ser encerrado (SIGTERM ou Ctrl+C),
+        encerra os workers e registra os contadores de cada um e o total.
+        Um worker que não termina em `WORKER_EXIT_TIMEOUT` segundos depois do SIGTERM é encerrado com SIGKILL.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+        processes = [
+            self.context.Process(target=run_worker, args=(index, lb, self.stats_queue), name=f"lb-worker-{index}")
+            for index, lb in enumerate(self.balancers)
+        ]
+        for process in processes:
+            process.start()
+        self.sys_log(f"LoadBalancer started {self.workers} workers on port {self.listen_port}")
+        try:
+            for process in processes:
+                process.join()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            self.log_stats(self.collect_stats())
+            for process in processes:
+                process.join(WORKER_EXIT_TIMEOUT)
+                if process.is_alive():
+                    self.sys_log(f"LoadBalancer worker {process.name} did not exit after SIGTERM: killing it", WARNING)
+                    process.kill()
+                    process.join()
+
+    def collect_stats(self) -> Dict[int, Dict[str, int]]:
+        """
+        Coleta os contadores publicados pelos workers ao encerrar.
+
+        Args:
+            None
+        Returns:
+            Dict[int, Dict[str, int]]: Contadores de cada worker, indexados pelo índice do worker.
+        """
+        stats: Dict[int, Dict[str, int]] = {}
+        while len(stats) < self.workers:
+            try:
+                index, worker_stats = self.stats_queue.get(timeout=STATS_TIMEOUT)
+            except queue.Empty:
+                break
+            stats[index] = worker_stats
+        return stats
+
+    def log_stats(self, stats: Dict[int, Dict[str, int]]) -> None:
+        """
+        Registra os contadores de cada worker e a sua soma.
+
+        Args:
+            stats (Dict[int, Dict[str, int]]): Contadores de cada worker.
+        Returns:
+            None
+        """
+        total: Dict[str, int] = {}
+        for index in sorted(stats):
+            self.sys_log(f"LoadBalancer worker {index} stats: {stats[index]}")
+            for key, value in stats[index].items():
+                total[key] = total.get(key, 0) + value
+        missing = self.workers - len(stats)
+        suffix = f" ({missing} workers sem contadores)" if missing else ""
+        self.sys_log(f"LoadBalancer stats: {total}{suffix}")
@@ -0,0 +1,288 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from src.distributions import ServiceTimeDistribution
+    from src.ia import ResponseCache
+
+# Pergunta enviada ao modelo de IA em cada atendimento da carga "llm"
+LLM_PROMPT = "Por que sistemas distribuídos são complexos?"
+
+# Iterações usadas em cada medição da calibração da carga "cpu"
+CALIBRATION_ITERATIONS = 200_000
+
+
+def burn(iterations: int) -> int:
+    """
+    Ocupa a CPU por um número fixo de iterações de um gerador congruencial linear.
+
+    Args:
+        iterations (int): Número de iterações.
+    Returns:
+        int: O último valor gerado, para que o laço não seja descartado.
+    """
+    x = 1
+    for _ in range(iterations):
+        x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+    return x
+
+
+def calibrate(samples: int = 5) -> float:
+    """
+    Mede quantas iterações de `burn` cabem em um milissegundo neste processo.
+    Usa a medição mais rápida entre as amostras, a menos afetada por interrupções.
+
+    Args:
+        samples (int): Número de medições.
+    Returns:
+        float: Iterações por milissegundo.
+    """
+    best = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        burn(CALIBRATION_ITERATIONS)
+        best = min(best, time.perf_counter() - started)
+    return CALIBRATION_ITERATIONS / (best * 1000)
+
+
+class Workload:
+    """
+    Trabalho executado por um servidor do Service em cada atendimento.
+    As subclasses implementam `run`; `start` e `close` preparam e liberam os recursos da carga
+    e são chamados pelo Service antes de criar os seus servidores e ao encerrar.
+    Com uma distribuição, a duração alvo de cada atendimento é uma amostra dela, em vez de `service_time_ms`.
+
+    Args:
+        service_time_ms (float): Duração alvo de cada atendimento, em milissegundos.
+        servers (int): Número de servidores do serviço que executam a carga em paralelo.
+        distribution (Optional[ServiceTimeDistribution]): Distribuição dos tempos de serviço; None usa sempre `service_time_ms`.
+    Returns:
+        None
+    """
+    name = ""
+
+    def __init__(
+        self, service_time_ms: float, servers: int = 1, distribution: Optional["ServiceTimeDistribution"] = None
+    ):
+        self.service_time_ms = service_time_ms
+        self.servers = servers
+        self.distribution = distribution
+
+    def service_time(self) -> float:
+        """
+        Retorna a duração alvo do próximo atendimento.
+
+        Args:
+            None
+        Returns:
+            float: A duração em milissegundos.
+        """
+        if self.distribution is None:
+            return self.service_time_ms
+        return self.distribution.sample()
+
+    def start(self) -> None:
+        """
+        Prepara os recursos da carga.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+
+    def run(self, data: str) -> Optional[str]:
+        """
+        Executa o trabalho de um atendimento. Implementado pelas subclasses.
+
+        Args:
+            data (str): A mensagem atendida.
+        Returns:
+            Optional[str]: Um resultado a registrar no log de depuração, se houver.
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna contadores próprios da carga, incluídos na resposta de STATS do serviço.
+
+        Args:
+            None
+        Returns:
+            Dict[str, int]: Os contadores, vazio se a carga não tiver nenhum.
+        """
+        return {}
+
+    def close(self) -> None:
+        """
+        Libera os recursos da carga.
+
+        Args:
+            None
+        Returns:
+            None
+        """
+
+
+class SleepWorkload(Workload):
+    """
+    Atendimento limitado por latência: o servidor apenas espera o tempo de serviço, sem consumir CPU.
+    """
+    name = "sleep"
+
+    def run(self, data: str) -> Optional[str]:
+        time.sleep(self.service_time() / 1000)
+        return None
+
+
+class CpuWorkload(Workload):
+    """
+    Atendimento limitado por CPU: cada atendimento executa um laço calibrado para durar o tempo de serviço.
+    O laço roda em um pool de `servers` processos, fora do GIL, de modo que os servidores processam em paralelo
+    até o número de núcleos da máquina. A calibração é feita em um processo do pool ao iniciar.
+    Os processos são criados com forkserver, seguro mesmo com as threads do serviço já em execução.
+    """
+    name = "cpu"
+
+    def __init__(
+        self, service_time_ms: float, servers: int = 1, distribution: Optional["ServiceTimeDistribution"] = None
+    ):
+        super().__init__(service_time_ms, servers, distribution)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.iterations_per_ms = 0.0
+
+    def start(self) -> None:
+        context = multiprocessing.get_context("forkserver")
+        self.executor = ProcessPoolExecutor(max_workers=self.servers, mp_context=context)
+        # Cria todos os processos do pool antes do primeiro atendimento
+        for future in [self.executor.submit(burn, 0) for _ in range(self.servers)]:
+            future.result()
+        self.iterations_per_ms = self.executor.submit(calibrate).result()
+
+    def run(self, data: str) -> Optional[str]:
+        self.executor.submit(burn, int(self.iterations_per_ms * self.service_time())).result()
+        return None
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class IoWorkload(Workload):
+    """
+    Atendimento com E/S de disco: cada atendimento grava um bloco de `block_kb` KB em um arquivo temporário
+    e força a gravação com fsync; o restante do tempo de serviço, se houver, é espera.
+    O disco é um recurso compartilhado pelos servidores, então o tempo de atendimento cresce com a contenção.
+
+    Args:
+        service_time_ms (float): Duração mínima de cada atendimento, em milissegundos.
+        servers (int): Número de servidores do serviço.
+        distribution (Optional[ServiceTimeDistribution]): Distribuição dos tempos de serviço.
+        block_kb (int): Tamanho do bloco gravado em cada atendimento, em KB.
+    Returns:
+        None
+    """
+    name = "io"
+
+    def __init__(
+        self,
+        service_time_ms: float,
+        servers: int = 1,
+        distribution: Optional["ServiceTimeDistribution"] = None,
+        block_kb: int = 64,
+    ):
+        super().__init__(service_time_ms, servers, distribution)
+        self.block = os.urandom(block_kb * 1024)
+        self.fd: Optional[int] = None
+        self.path = ""
+
+    def start(self) -> None:
+        self.fd, self.path = tempfile.mkstemp(prefix="service-io-")
+
+    def run(self, data: str) -> Optional[str]:
+        started = time.monotonic()
+        # pwrite na posição 0 mantém o arquivo pequeno e dispensa um lock entre os servidores
+        os.pwrite(self.fd, self.block, 0)
+        os.fsync(self.fd)
+        remaining = self.service_time() / 1000 - (time.monotonic() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        return None
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            os.unlink(self.path)
+            self.fd = None
+
+
+class LlmWorkload(Workload):
+    """
+    Atendimento por uma consulta ao modelo de IA; a duração é a da consulta e o tempo de serviço é ignorado.
+    O cliente do modelo (e o groq) só é carregado quando esta carga é criada.
+
+    Args:
+        service_time_ms (float): Não utilizado.
+        servers (int): Número de servidores do serviço.
+        distribution (Optional[ServiceTimeDistribution]): Não utilizado.
+        cache (Optional[ResponseCache]): Cache das respostas do modelo; None consulta o modelo a cada atendimento.
+        base_url (Optional[str]): Endereço do serviço de chat-completions; None usa a API do Groq.
+        model (Optional[str]): Modelo consultado; None usa o modelo padrão do IAService.
+        max_concurrency (int): Número máximo de consultas ao modelo em andamento; 0 para nenhum limite.
+    Returns:
+        None
+    """
+    name = "llm"
+
+    def __init__(
+        self,
+        service_time_ms: float,
+        servers: int = 1,
+        distribution: Optional["ServiceTimeDistribution"] = None,
+        cache: Optional["ResponseCache"] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        max_concurrency: int = 0,
+    ):
+        from src.ia import DEFAULT_MODEL, IAService
+
+        super().__init__(service_time_ms, servers, distribution)
+        self.ia_service = IAService(
+            cache=cache, base_url=base_url, model=model or DEFAULT_MODEL, max_concurrency=max_concurrency
+        )
+
+    def run(self, data: str) -> Optional[str]:
+        return self.ia_service.ask(LLM_PROMPT)
+
+    def stats(self) -> Dict[str, int]:
+        stats = {f"llm_{key}": value for key, value in self.ia_service.snapshot().items()}
+        if self.ia_service.cache is not None:
+            stats.update({f"cache_{key}": value for key, value in self.ia_service.cache.snapshot().items()})
+        return stats
+
+
+WORKLOADS: Dict[str, type] = {
+    workload.name: workload for workload in (SleepWorkload, CpuWorkload, IoWorkload, LlmWorkload)
+}
+
+
+def create_workload(name: str, service_time_ms: float, servers: int = 1, **kwargs) -> Workload:
+    """
+    Cria a carga de trabalho de um Service pelo nome.
+
+    Args:
+        name (str): sleep, cpu, io ou llm.
+        service_time_ms (float): Duração alvo de cada atendimento, em milissegundos.
+        servers (int): Número de servidores do serviço.
+        **kwargs: Argumentos da carga (distribution; block_kb para io; cache, base_url, model e max_concurrency para llm).
+    Returns:
+        Workload: A carga de trabalho.
+    """
+    workload_class = WORKLOADS.get(name)
+    if workload_class is None:
+        raise ValueError(f"Carga de trabalho desconhecida: {name}. Use {', '.join(WORKLOADS)}.")
+    return workload_class(service_time_ms, servers, **kwargs)
@@ -0,0 +1,51 @@
+import socket
+import threading
+import time
+from typing import Callable
+
+import pytest
+
+from src.logger import ERROR, set_log_level
+from src.mock_llm import MockLLMServer
+
+
+def free_port() -> int:
+    """
+    Porta TCP livre, escolhida pelo sistema operacional.
+
+    Args:
+        None
+    Returns:
+        int: O número da porta.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(autouse=True, scope="session")
+def quiet_logs() -> None:
+    # Os servidores registram a partida no sys_log.txt; os testes não devem escrever nele
+    set_log_level(ERROR)
+
+
+@pytest.fixture
+def mock_llm() -> Callable[..., MockLLMServer]:
+    """
+    Inicia um MockLLMServer em uma porta livre, em uma thread daemon, e o retorna quando ele aceita conexões.
+    Os argumentos são repassados ao MockLLMServer.
+    """
+    def start(**kwargs) -> MockLLMServer:
+        server = MockLLMServer(free_port(), **kwargs)
+        threading.Thread(target=server.start, daemon=True).start()
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", server.listen_port), timeout=1).close()
+                return server
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    return start
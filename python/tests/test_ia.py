@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+
+from src.ia import ResponseCache, SingleFlight
+
+
+class Contador:
+    """
+    Função de cálculo das respostas que conta as suas chamadas e responde com o prompt em maiúsculas.
+
+    Args:
+        delay (float): Tempo de cada chamada, em segundos.
+    Returns:
+        None
+    """
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return prompt.upper()
+
+
+def run_concurrently(count: int, fn) -> list:
+    """
+    Executa `fn` em `count` threads ao mesmo tempo e aguarda todas.
+
+    Args:
+        count (int): Número de threads.
+        fn (Callable[[], Any]): Função executada por cada thread.
+    Returns:
+        list: Os resultados, na ordem em que as threads terminaram.
+    """
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fn())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_agrupa_chamadas_concorrentes():
+    flights = SingleFlight()
+    release = threading.Event()
+    compute = Contador()
+
+    def call() -> str:
+        # Mantém a chamada em andamento até que as demais se juntem a ela
+        release.wait(5)
+        return compute("prompt")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("prompt", call))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flights.coalesced < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["PROMPT"] * 5
+    assert compute.calls == 1
+    assert flights.coalesced == 4
+
+
+def test_single_flight_propaga_o_erro_e_esquece_a_chamada():
+    flights = SingleFlight()
+
+    def fail() -> str:
+        raise RuntimeError("modelo indisponível")
+
+    with pytest.raises(RuntimeError):
+        flights.do("prompt", fail)
+    # Uma chamada encerrada não fica registrada: a próxima é executada de novo
+    assert flights.do("prompt", lambda: "ok") == "ok"
+
+
+def test_cache_descarta_a_entrada_usada_ha_mais_tempo():
+    cache = ResponseCache(max_entries=2)
+    compute = Contador()
+    cache.get_or_compute("a", compute)
+    cache.get_or_compute("b", compute)
+    cache.get_or_compute("a", compute)
+    cache.get_or_compute("c", compute)
+    assert compute.calls == 3
+    cache.get_or_compute("a", compute)
+    assert compute.calls == 3
+    cache.get_or_compute("b", compute)
+    assert compute.calls == 4
+    assert cache.snapshot() == {"hits": 2, "disk_hits": 0, "misses": 4, "coalesced": 0}
+
+
+def test_cache_expira_as_entradas_depois_do_ttl():
+    cache = ResponseCache(ttl=0.05)
+    compute = Contador()
+    cache.get_or_compute("a", compute)
+    cache.get_or_compute("a", compute)
+    assert compute.calls == 1
+    time.sleep(0.1)
+    cache.get_or_compute("a", compute)
+    assert compute.calls == 2
+
+
+def test_cache_agrupa_faltas_concorrentes():
+    cache = ResponseCache()
+    compute = Contador(delay=0.1)
+    assert run_concurrently(5, lambda: cache.get_or_compute("a", compute)) == ["A"] * 5
+    assert compute.calls == 1
+
+
+def test_cache_compartilha_respostas_pelo_sqlite(tmp_path):
+    path = str(tmp_path / "responses.db")
+    compute = Contador()
+    assert ResponseCache(path=path).get_or_compute("a", compute) == "A"
+    other = ResponseCache(path=path)
+    assert other.get_or_compute("a", compute) == "A"
+    assert compute.calls == 1
+    assert other.snapshot()["disk_hits"] == 1
+
+
+def test_sqlite_expira_as_entradas_depois_do_ttl(tmp_path):
+    path = str(tmp_path / "responses.db")
+    compute = Contador()
+    ResponseCache(path=path, ttl=0.05).get_or_compute("a", compute)
+    time.sleep(0.1)
+    ResponseCache(path=path, ttl=0.05).get_or_compute("a", compute)
+    assert compute.calls == 2
+
+
+def test_ia_service_consulta_o_mock_uma_vez_por_prompt(mock_llm):
+    pytest.importorskip("groq")
+    pytest.importorskip("decouple")
+    from src.ia import IAService
+
+    server = mock_llm(latency_ms=300, reply="resposta simulada")
+    service = IAService(base_url=f"http://127.0.0.1:{server.listen_port}", max_concurrency=2)
+    assert run_concurrently(4, lambda: service.ask("mesmo prompt")) == ["resposta simulada"] * 4
+    assert service.snapshot()["calls"] == 1
+    assert server.completed == 1
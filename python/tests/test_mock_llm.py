@@ -0,0 +1,84 @@
+import http.client
+import json
+import threading
+import time
+
+from src.mock_llm import COMPLETIONS_PATH
+
+
+def ask(port: int, prompt: str = "pergunta", path: str = COMPLETIONS_PATH) -> tuple:
+    """
+    Envia um pedido de chat-completions ao MockLLMServer, por uma conexão própria.
+
+    Args:
+        port (int): Porta do servidor.
+        prompt (str): Conteúdo da mensagem do usuário.
+        path (str): Caminho do pedido.
+    Returns:
+        tuple: Status HTTP e corpo da resposta decodificado.
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        body = json.dumps({"model": "mock", "messages": [{"role": "user", "content": prompt}]})
+        connection.request("POST", path, body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def ask_concurrently(port: int, count: int) -> float:
+    """
+    Envia `count` pedidos ao mesmo tempo, cada um por uma conexão, e mede o tempo até a última resposta.
+
+    Args:
+        port (int): Porta do servidor.
+        count (int): Número de pedidos.
+    Returns:
+        float: Tempo decorrido, em segundos.
+    """
+    statuses = []
+    threads = [threading.Thread(target=lambda: statuses.append(ask(port)[0])) for _ in range(count)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * count
+    return time.monotonic() - started
+
+
+def test_responde_como_chat_completions(mock_llm):
+    server = mock_llm(latency_ms=0, reply="olá")
+    status, body = ask(server.listen_port)
+    assert status == 200
+    assert body["object"] == "chat.completion"
+    assert body["choices"][0]["message"]["content"] == "olá"
+
+
+def test_caminho_desconhecido_responde_404(mock_llm):
+    server = mock_llm(latency_ms=0)
+    status, body = ask(server.listen_port, path="/v1/outro")
+    assert status == 404
+    assert "error" in body
+
+
+def test_max_concurrency_enfileira_os_excedentes(mock_llm):
+    # 6 pedidos de 100 ms com 2 vagas precisam de pelo menos 3 levas
+    server = mock_llm(latency_ms=100, max_concurrency=2)
+    elapsed = ask_concurrently(server.listen_port, 6)
+    assert server.peak_in_flight == 2
+    assert elapsed >= 0.3
+    assert server.completed == 6
+
+
+def test_sem_limites_processa_em_paralelo(mock_llm):
+    server = mock_llm(latency_ms=300)
+    ask_concurrently(server.listen_port, 6)
+    assert server.peak_in_flight > 2
+
+
+def test_max_rps_espaca_os_inicios(mock_llm):
+    # 10 pedidos a 20 por segundo começam a cada 50 ms: o último começa pelo menos 450 ms depois do primeiro
+    server = mock_llm(latency_ms=0, max_rps=20)
+    assert ask_concurrently(server.listen_port, 10) >= 0.45